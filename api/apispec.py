@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Build the Swagger spec as a JSON file (precompiled at release time): with SWAGGER_SPEC_PATH the workers serve
+it without building it.
+
+    cd api/
+    python apispec.py apispec.json
+"""
+
+import argparse
+
+from config import create_app
+from config.default import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Swagger spec.")
+    parser.add_argument('output', help="JSON file")
+    args = parser.parse_args()
+
+    # Built from the YAML files, not from a previous file
+    Config.SWAGGER_ENABLED = True
+    Config.SWAGGER_SPEC_PATH = ''
+
+    response = create_app('config.default.Config').test_client().get('/apispec.json')
+
+    if response.status_code != 200:
+        raise SystemExit("Failed to build the spec: HTTP {}".format(response.status_code))
+
+    with open(args.output, 'wb') as file_object:
+        file_object.write(response.get_data())
+
+
+if __name__ == "__main__":
+    main()
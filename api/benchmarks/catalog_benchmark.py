@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Ingestion and query benchmark on synthetic catalogs (see catalog_generator).
+
+Each size runs in a new process. The stages are timed separately:
+
+- parse: read and split lines (DataProcess._read_lines, without hashing);
+- hash: hash of the keys and of the content (DataProcess._create_hash_line, _create_content_hash);
+- bulk: insert the rows (DataProcess._insert_bulk_database);
+- update: update the same rows (DataProcess._update_bulk_database);
+- query: retrieve by name, term, zip and name + zip (no query cache), latency percentiles;
+- exact: retrieve by name and zip, read by id and searched (fuzzy), latency percentiles and speedup.
+
+The memory backend is used by default, ElasticSearch (an empty index) with --backend elasticsearch.
+
+    PYTHONPATH=./api/ python api/benchmarks/catalog_benchmark.py --rows 10000 1000000 10000000 \\
+        --output benchmark.json [--baseline previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+
+from itertools import islice
+from multiprocessing import Pool
+from unittest import mock
+
+from benchmarks.catalog_generator import generate_catalog
+from integration.data_process import DataProcess
+from integration.query_cache import QueryCache
+from integration.rejected_rows import RejectedRows
+from integration.storage_backend import create_storage_backend
+
+
+def percentile(values, rank):
+    """
+    Percentile (nearest rank).
+
+    :param values: sorted values.
+    :param rank: percentile (0-100).
+    :return: value.
+    """
+    return values[max(int(round(rank / 100.0 * len(values))) - 1, 0)] if values else None
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+
+
+def stage(seconds, rows):
+    return {"seconds": round(seconds, 3), "rows_per_second": round(rows / seconds, 1) if seconds else None}
+
+
+def catalog_path(rows, seed, directory):
+    """
+    Catalog file (generated only once per rows and seed).
+
+    :return: File path.
+    """
+    path = os.path.join(directory, 'catalog_{}_{}.csv'.format(rows, seed))
+
+    if not os.path.exists(path):
+        generate_catalog(path + '.tmp', rows, seed)
+        os.rename(path + '.tmp', path)
+
+    return path
+
+
+def run(rows, backend_name, seed, queries, batch_size, directory):
+    """
+    Run the benchmark of a catalog size.
+
+    :return: result (stages, rows, rejected rows and peak RSS).
+    """
+    path = catalog_path(rows, seed, directory)
+    backend = create_storage_backend(backend_name)
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=backend)
+    data_process.bootstrap()
+
+    if data_process._count_database() > 0:
+        raise RuntimeError("The database is not empty.")
+
+    seconds = {"parse": 0.0, "hash": 0.0, "bulk": 0.0, "update": 0.0}
+    stride = max(rows // queries, 1)
+    samples = []
+    read = 0
+    rejected = RejectedRows()
+
+    with open(path, 'r', encoding='utf-8') as file_object, backend.bulk_load():
+        lines = data_process._read_lines(file_object, rejected)
+
+        while True:
+            start = time.perf_counter()
+
+            with mock.patch.object(DataProcess, '_create_hash_line', staticmethod(lambda keys: None)), \
+                    mock.patch.object(DataProcess, '_create_content_hash', staticmethod(lambda key, values: None)):
+                batch = list(islice(lines, batch_size))
+
+            seconds['parse'] += time.perf_counter() - start
+
+            if not batch:
+                break
+
+            start = time.perf_counter()
+
+            for row in batch:
+                row['hash_object'] = DataProcess._create_hash_line([row['name'], row['zip']])
+                row['content_hash'] = DataProcess._create_content_hash(
+                    'name;website;zip', [row['name'], row['website'] or '', row['zip']])
+
+            seconds['hash'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            data_process._insert_bulk_database(batch)
+            seconds['bulk'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            data_process._update_bulk_database(batch)
+            seconds['update'] += time.perf_counter() - start
+
+            samples.extend(row for item, row in enumerate(batch, read) if item % stride == 0)
+            read += len(batch)
+
+    result = {name: stage(value, read) for name, value in seconds.items()}
+    result['query'] = run_queries(data_process, samples[:queries])
+    result['exact'] = run_exact_queries(data_process, samples[:queries])
+
+    return {
+        "rows": rows,
+        "indexed": read,
+        "rejected": rejected.count,
+        "stages": result,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def latency(latencies):
+    """
+    :param latencies: list of latencies (ms).
+    :return: latency percentiles (ms) and queries per second.
+    """
+    total = sum(latencies)
+    latencies = sorted(latencies)
+
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 3) if latencies else None,
+        "queries_per_second": round(len(latencies) / total * 1000, 1) if total else None
+    }
+
+
+def run_exact_queries(data_process, samples):
+    """
+    Retrieve by name and zip: read by id and searched (fuzzy), in turns.
+
+    :return: latency percentiles of each path and speedup of the id path (p50).
+    """
+    latencies = {"id": [], "search": []}
+
+    for row in samples:
+        for path, fuzzy in (('id', False), ('search', True)):
+            start = time.perf_counter()
+            response = data_process.retrieve(row['name'], row['zip'], fuzzy=fuzzy)
+            latencies[path].append((time.perf_counter() - start) * 1000)
+
+            if response['path'] != path:
+                raise RuntimeError("Unexpected path: {}".format(response['path']))
+
+    result = {path: latency(values) for path, values in latencies.items()}
+
+    if samples:
+        result['speedup_p50'] = round(result['search']['p50_ms'] / result['id']['p50_ms'], 1)
+
+    return result
+
+
+def run_queries(data_process, samples):
+    """
+    Retrieve by full name, by a shared term of the name, by zip and by name and zip (in turns).
+
+    :return: latency percentiles (ms) and queries per second.
+    """
+    latencies = []
+
+    for item, row in enumerate(samples):
+        name, addresszip = [
+            (row['name'], None),
+            (row['name'].split()[0], None),
+            (None, row['zip']),
+            (row['name'], row['zip'])
+        ][item % 4]
+
+        start = time.perf_counter()
+        data_process.retrieve(name, addresszip)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latency(latencies)
+
+
+def commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except Exception as err:
+        return None
+
+
+def compare(results, baseline):
+    """
+    Print the change of each stage from a baseline (rows per second, query p95).
+    """
+    previous = {item['rows']: item for item in baseline['results']}
+
+    for item in results['results']:
+        old = previous.get(item['rows'])
+
+        if not old:
+            continue
+
+        for name, value in sorted(item['stages'].items()):
+            metric = 'p95_ms' if name == 'query' else 'rows_per_second'
+
+            if value.get(metric) and old['stages'].get(name, {}).get(metric):
+                change = (value[metric] / old['stages'][name][metric] - 1) * 100
+                print("{:>10} {:>7} {:>16}: {:+.1f}%".format(item['rows'], name, metric, change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion and query benchmark.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000])
+    parser.add_argument('--backend', default='memory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100000)
+    parser.add_argument('--directory', default=tempfile.gettempdir(), help="directory of the generated catalogs")
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--baseline', help="results of a previous run, to compare")
+    args = parser.parse_args()
+
+    results = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "seed": args.seed,
+        "created_at": time.time(),
+        "results": []
+    }
+
+    for rows in args.rows:
+        # A new process for each size (isolated peak RSS and database)
+        with Pool(1) as pool:
+            result = pool.apply(run, (rows, args.backend, args.seed, args.queries, args.batch_size, args.directory))
+
+        results['results'].append(result)
+        print(json.dumps(result))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file_object:
+            compare(results, json.load(file_object))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic catalog (name;addressZip;website CSV) generator. The same rows and seed always create the same file.
+
+    PYTHONPATH=./api/ python api/benchmarks/catalog_generator.py rows output.csv [seed]
+"""
+
+import random
+import sys
+
+WORDS = ('acme', 'global', 'group', 'foundation', 'holding', 'systems', 'labs', 'partners', 'tech', 'capital',
+         'services', 'solutions', 'industries', 'logistics', 'energy', 'health', 'media', 'foods', 'motors',
+         'consulting', 'yawoen', 'brasil', 'são paulo', 'café', 'north', 'south', 'east', 'west', 'united', 'first')
+
+SUFFIXES = ('inc', 'ltd', 'llc', 'corp', 'sa', 'co', '')
+
+
+def generate_rows(rows, seed=0, invalid_ratio=0.0):
+    """
+    Generate the lines of a catalog (header included).
+
+    :param rows: number of rows (after the header).
+    :param seed: random seed.
+    :param invalid_ratio: fraction of lines with a wrong number of columns.
+    :return: generator of lines.
+    """
+    generator = random.Random(seed)
+
+    yield "name;addressZip;website\n"
+
+    for row in range(rows):
+        # A unique token keeps the (name, zip) keys distinct, the other words are shared by many rows
+        words = generator.sample(WORDS, generator.randint(1, 3)) + ['c{}'.format(row)]
+        suffix = generator.choice(SUFFIXES)
+        name = ' '.join(words + [suffix] if suffix else words)
+        addresszip = '{:05d}'.format(generator.randint(0, 99999))
+
+        if invalid_ratio and generator.random() < invalid_ratio:
+            yield "{};{};http://www.c{}.com;invalid\n".format(name, addresszip, row)
+        elif generator.random() < 0.8:
+            yield "{};{};http://www.c{}.com\n".format(name, addresszip, row)
+        else:
+            yield "{};{};\n".format(name, addresszip)
+
+
+def generate_catalog(output_path, rows, seed=0, invalid_ratio=0.0):
+    """
+    Write a catalog file.
+
+    :param output_path: File path.
+    :param rows: number of rows (after the header).
+    :param seed: random seed.
+    :param invalid_ratio: fraction of lines with a wrong number of columns.
+    :return: File path.
+    """
+    with open(output_path, 'w', encoding='utf-8') as file_object:
+        file_object.writelines(generate_rows(rows, seed, invalid_ratio))
+
+    return output_path
+
+
+if __name__ == "__main__":
+    generate_catalog(sys.argv[2], int(sys.argv[1]), *[int(arg) for arg in sys.argv[3:]])
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Compression benchmark: bytes on the wire and wall time of each option (see integration.compression).
+
+- upload: the catalog uploaded raw, gzip, bz2 or zstd (zstandard package); time to compress (client side)
+  and to decompress and parse it (DataProcess._read_lines);
+- bulk: the bulk bodies sent to ElasticSearch, raw or gzip (ELASTICSEARCH_HTTP_COMPRESS);
+- response: a GET page of PAGE_SIZE_MAX objects, raw or gzip (RESPONSE_COMPRESSION_MIN_BYTES).
+
+The wall time adds the transfer time of the bytes at --bandwidth-mbps.
+
+    PYTHONPATH=./api/ python api/benchmarks/compression_benchmark.py --rows 100000 --output compression.json
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import os
+import tempfile
+import time
+
+from io import BytesIO
+
+from benchmarks.catalog_benchmark import catalog_path
+from config.default import Config
+from integration.compression import open_text
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+from integration.rejected_rows import RejectedRows
+
+
+def compressors():
+    """
+    :return: dict of compression -> function (bytes -> bytes).
+    """
+    result = {
+        "none": lambda data: data,
+        "gzip": lambda data: gzip.compress(data, 6),
+        "bz2": lambda data: bz2.compress(data, 9)
+    }
+
+    try:
+        import zstandard
+        result['zstd'] = zstandard.ZstdCompressor(level=3).compress
+    except ImportError:
+        pass
+
+    return result
+
+
+def option(raw_bytes, wire_bytes, seconds, bandwidth):
+    transfer = wire_bytes * 8 / (bandwidth * 1000000.0)
+
+    return {
+        "bytes": wire_bytes,
+        "ratio": round(raw_bytes / wire_bytes, 2) if wire_bytes else None,
+        "cpu_seconds": round(seconds, 4),
+        "wall_seconds": round(seconds + transfer, 4)
+    }
+
+
+def run_upload(content, bandwidth):
+    """
+    Compress the catalog, then decompress and parse it.
+    """
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+    result = {}
+
+    for name, compress in sorted(compressors().items()):
+        start = time.perf_counter()
+        compressed = compress(content)
+        compress_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = sum(1 for _ in data_process._read_lines(open_text(BytesIO(compressed)), RejectedRows()))
+        read_seconds = time.perf_counter() - start
+
+        result[name] = option(len(content), len(compressed), compress_seconds + read_seconds, bandwidth)
+        result[name].update(rows=rows, compress_seconds=round(compress_seconds, 4),
+                            read_seconds=round(read_seconds, 4))
+
+    return result
+
+
+def run_bulk(rows, chunk_size, bandwidth):
+    """
+    Build the bulk bodies (like the ElasticSearch bulk helpers) and compress them with gzip (as the client does).
+    """
+    bodies = []
+
+    for start in range(0, len(rows), chunk_size):
+        lines = []
+
+        for row in rows[start:start + chunk_size]:
+            lines.append(json.dumps({"index": {"_index": Config.ELASTICSEARCH_INDEX, "_id": row['hash_object']}}))
+            lines.append(json.dumps(row))
+
+        bodies.append(('\n'.join(lines) + '\n').encode('utf-8'))
+
+    raw_bytes = sum(len(body) for body in bodies)
+
+    start = time.perf_counter()
+    compressed_bytes = sum(len(gzip.compress(body)) for body in bodies)
+    seconds = time.perf_counter() - start
+
+    return {
+        "none": option(raw_bytes, raw_bytes, 0.0, bandwidth),
+        "gzip": option(raw_bytes, compressed_bytes, seconds, bandwidth)
+    }
+
+
+def run_response(rows, bandwidth):
+    """
+    Serialize a page of objects and compress it with gzip (as compress_response does).
+    """
+    page = {"count": len(rows), "cursor": None,
+            "data": [{"id": row['hash_object'], "name": row['name'], "zip": row['zip'], "website": row['website']}
+                     for row in rows]}
+    body = json.dumps(page).encode('utf-8')
+
+    start = time.perf_counter()
+    compressed = gzip.compress(body, Config.RESPONSE_COMPRESSION_LEVEL)
+    seconds = time.perf_counter() - start
+
+    return {
+        "none": option(len(body), len(body), 0.0, bandwidth),
+        "gzip": option(len(body), len(compressed), seconds, bandwidth)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compression benchmark.")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bandwidth-mbps', type=float, default=100.0)
+    parser.add_argument('--directory', default=tempfile.gettempdir(), help="directory of the generated catalogs")
+    parser.add_argument('--output', default='compression.json')
+    args = parser.parse_args()
+
+    path = catalog_path(args.rows, args.seed, args.directory)
+
+    with open(path, 'rb') as file_object:
+        content = file_object.read()
+
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+
+    with open(path, 'r', encoding='utf-8') as file_object:
+        rows = list(data_process._read_lines(file_object, RejectedRows()))
+
+    results = {
+        "rows": args.rows,
+        "file_bytes": os.path.getsize(path),
+        "bandwidth_mbps": args.bandwidth_mbps,
+        "upload": run_upload(content, args.bandwidth_mbps),
+        "bulk": run_bulk(rows, Config.ELASTICSEARCH_BULK_CHUNK_SIZE, args.bandwidth_mbps),
+        "response": run_response(rows[:Config.PAGE_SIZE_MAX], args.bandwidth_mbps)
+    }
+
+    print(json.dumps(results, indent=2))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrency benchmark: requests served per second by the WSGI stack (DataProcess, one worker thread per request
+in flight) and by the asyncio stack (AsyncDataProcess, one event loop), for a number of concurrent clients.
+
+Each client sends its requests one after the other (closed loop): by name and zip (read by id) and by name
+(searched), in turns, without query cache. The database is the memory backend with a fixed latency added to
+each request (--latency-ms, the round trip to ElasticSearch): the sync stack blocks a worker thread while it
+waits, the asyncio stack doesn't. The latencies include the time waiting for a worker.
+
+    PYTHONPATH=./api/ python api/benchmarks/concurrency_benchmark.py --rows 10000 --clients 1 8 32 128 \\
+        --workers 8 --output concurrency.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.catalog_benchmark import catalog_path, percentile
+from integration.async_backend import AsyncMemoryBackend
+from integration.async_data_process import AsyncDataProcess
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+from integration.rejected_rows import RejectedRows
+from integration.storage_backend import StorageBackend
+
+
+class LatencyBackend(StorageBackend):
+    """ Memory backend with a latency added to each read (blocks the thread). """
+
+    def __init__(self, backend, latency):
+        self._backend = backend
+        self._latency = latency
+
+    def get(self, document_id, fields=None):
+        time.sleep(self._latency)
+        return self._backend.get(document_id, fields)
+
+    def search(self, body, size):
+        time.sleep(self._latency)
+        return self._backend.search(body, size)
+
+
+class AsyncLatencyBackend(AsyncMemoryBackend):
+    """ Memory backend with a latency added to each read (waits in the event loop). """
+
+    def __init__(self, backend, latency):
+        super(AsyncLatencyBackend, self).__init__(backend)
+        self._latency = latency
+
+    async def get(self, document_id, fields=None):
+        await asyncio.sleep(self._latency)
+        return self.backend.get(document_id, fields)
+
+    async def search(self, body, size):
+        await asyncio.sleep(self._latency)
+        return self.backend.search(body, size)
+
+
+def queries(samples, clients, requests):
+    """
+    :return: list of queries (name, zip) of each client.
+    """
+    result = []
+
+    for client in range(clients):
+        result.append([])
+
+        for item in range(requests):
+            row = samples[(client * requests + item) % len(samples)]
+            result[-1].append((row['name'], row['zip']) if item % 2 == 0 else (row['name'], None))
+
+    return result
+
+
+def report(latencies, seconds):
+    """
+    :param latencies: list of latencies (ms).
+    :param seconds: wall time.
+    :return: requests per second and latency percentiles (ms).
+    """
+    latencies = sorted(latencies)
+
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3)
+    }
+
+
+def run_sync(backend, latency, workers, client_queries):
+    """
+    Clients in threads, requests served by a pool of worker threads (like a threaded WSGI server).
+    """
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=LatencyBackend(backend, latency))
+    latencies = []
+    lock = threading.Lock()
+
+    with ThreadPoolExecutor(max_workers=workers) as server:
+        def client(items):
+            for name, addresszip in items:
+                start = time.perf_counter()
+                server.submit(data_process.retrieve, name, addresszip).result()
+
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=client, args=(items,)) for items in client_queries]
+        start = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        seconds = time.perf_counter() - start
+
+    return report(latencies, seconds)
+
+
+def run_async(backend, latency, client_queries):
+    """
+    Clients in coroutines, requests served by the event loop.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    data_process = AsyncDataProcess(query_cache=QueryCache(max_entries=0),
+                                    backend=AsyncLatencyBackend(backend, latency))
+    latencies = []
+
+    async def client(items):
+        for name, addresszip in items:
+            start = time.perf_counter()
+            await data_process.retrieve(name, addresszip)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    try:
+        start = time.perf_counter()
+        loop.run_until_complete(asyncio.gather(*[client(items) for items in client_queries]))
+        seconds = time.perf_counter() - start
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    return report(latencies, seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency benchmark.")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--requests', type=int, default=20, help="requests per client")
+    parser.add_argument('--workers', type=int, default=8, help="worker threads of the sync stack")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="latency added to each database request")
+    parser.add_argument('--directory', default=tempfile.gettempdir(), help="directory of the generated catalogs")
+    parser.add_argument('--output', default='concurrency.json')
+    args = parser.parse_args()
+
+    backend = MemoryBackend()
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=backend)
+
+    with open(catalog_path(args.rows, args.seed, args.directory), 'r', encoding='utf-8') as file_object:
+        rows = list(data_process._read_lines(file_object, RejectedRows()))
+
+    for _ in backend.index_documents(rows):
+        pass
+
+    samples = random.Random(args.seed).sample(rows, min(len(rows), 1000))
+    latency = args.latency_ms / 1000.0
+    results = {"rows": args.rows, "workers": args.workers, "latency_ms": args.latency_ms, "clients": {}}
+
+    for clients in args.clients:
+        client_queries = queries(samples, clients, args.requests)
+        results['clients'][str(clients)] = {
+            "sync": run_sync(backend, latency, args.workers, client_queries),
+            "async": run_async(backend, latency, client_queries)
+        }
+        print(clients, json.dumps(results['clients'][str(clients)]))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+
+if __name__ == "__main__":
+    main()
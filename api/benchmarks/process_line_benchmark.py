@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of the line parser: the baseline parser (before the column plan: the header is a list of names,
+each line renames and selects the key columns field by field) and DataProcess._process_header/_process_line,
+timed in the same process, interleaved (baseline, plan, baseline, ...), best of --repeat runs.
+
+Both parsers return the same rows: the content hash (added after the column plan) is computed by the baseline
+like DataProcess, with the columns sorted once by header.
+
+    PYTHONPATH=./api/ python api/benchmarks/process_line_benchmark.py --rows 200000 --output process_line.json
+"""
+
+import argparse
+import json
+import time
+
+from integration.data_process import DataProcess
+
+HEADER = "name;addressZip;website\n"
+
+
+def baseline_process_header(line):
+    """
+    Process de header read from CSV file.
+
+    :param line: header line.
+    :return: values and the columns of the content hash (sorted once, like the column plan).
+    """
+    headers = [i.strip().lower() for i in line.split(';')]
+    content_columns = sorted(name if name != 'addresszip' else 'zip' for name in headers)
+
+    return headers, content_columns
+
+
+def baseline_process_line(line, header):
+    """
+    Process a line read from CSV file.
+
+    :param line: line from CSV file.
+    :param header: keys for result dict and the columns of the content hash
+    :return: values (dict)
+    """
+    headers, content_columns = header
+    fields = [i.strip() for i in line.split(';')]
+
+    if len(headers) == len(fields):
+        result = {}
+        keys = []
+
+        for item, field_name in enumerate(headers):
+
+            field_name_formatted = field_name.lower() if field_name.lower() != 'addresszip' else 'zip'
+            result[field_name_formatted] = fields[item]
+
+            if field_name.lower() in ['name', 'addresszip']:
+                keys.append(str(fields[item]))
+
+        content_values = [result[name] for name in content_columns]
+        result['website'] = result['website'] if result.get('website') else None
+        result['hash_object'] = DataProcess._create_hash_line(keys)
+        result['content_hash'] = DataProcess._create_content_hash(';'.join(content_columns), content_values)
+
+        return result
+
+    return None
+
+
+def run(process_header, process_line, lines):
+    """
+    :return: seconds to parse the lines.
+    """
+    start = time.perf_counter()
+    header = process_header(HEADER)
+
+    for line in lines:
+        process_line(line, header)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line parser benchmark (baseline and column plan).")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=7, help="runs of each parser (the best one is reported)")
+    parser.add_argument('--output', default='process_line.json')
+    args = parser.parse_args()
+
+    lines = ["company {} group;{:05d};http://www.company{}.com\n".format(item, item % 99999, item)
+             for item in range(args.rows)]
+    parsers = {
+        "baseline": (baseline_process_header, baseline_process_line),
+        "plan": (DataProcess._process_header, DataProcess._process_line)
+    }
+
+    # Same rows
+    for line in lines[:1000] + ["company;00001\n"]:
+        assert baseline_process_line(line, baseline_process_header(HEADER)) == \
+            DataProcess._process_line(line, DataProcess._process_header(HEADER))
+
+    best = {name: None for name in parsers}
+
+    for _ in range(args.repeat):
+        for name, (process_header, process_line) in parsers.items():
+            elapsed = run(process_header, process_line, lines)
+            best[name] = elapsed if best[name] is None else min(best[name], elapsed)
+
+    results = {"rows": args.rows, "repeat": args.repeat}
+    results.update((name, {"rows_per_second": round(args.rows / elapsed)}) for name, elapsed in best.items())
+    results['speedup'] = round(best['baseline'] / best['plan'], 3)
+
+    print(json.dumps(results, indent=2))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Serialization benchmark: time to format and serialize a GET page (PAGE_SIZE hits of a search), before and
+after the fast JSON representation (see integration.serialization and output_json):
+
+- baseline: the hit is formatted with a dict update and the page serialized with json.dumps (default separators,
+  like flask_restful);
+- json: the id is set in the _source (no update) and the page serialized with the compact json serializer;
+- orjson: same, serialized with orjson (when it's installed).
+
+    PYTHONPATH=./api/ python api/benchmarks/serialization_benchmark.py --pages 2000 --output serialization.json
+"""
+
+import argparse
+import copy
+import json
+import time
+
+from config.default import Config
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+from integration.serialization import create_dumps
+
+
+def search_result(size):
+    """
+    :return: search response of a page (hits with _id, _source and sort values).
+    """
+    backend = MemoryBackend()
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=backend)
+    data_process.restore(["name;addressZip;website\n"] + [
+        "company {} group;{:05d};http://www.company{}.com/locations/{}\n".format(item, item, item, item)
+        for item in range(size)
+    ])
+
+    return backend.search(data_process.get_search_dsl('company', None), size)
+
+
+def baseline_page(result):
+    data = []
+
+    for hit in result['hits']['hits']:
+        formatted = hit['_source']
+        formatted.update({'id': hit['_id']})
+        data.append(formatted)
+
+    return json.dumps({"data": data, "count": result['hits']['total'], "cursor": None, "path": "search"}).encode()
+
+
+def run(name, serialize, result, pages):
+    """
+    :return: microseconds per page and pages per second.
+    """
+    results = [copy.deepcopy(result) for _ in range(pages)]
+    start = time.perf_counter()
+
+    for item in results:
+        body = serialize(item)
+
+    seconds = time.perf_counter() - start
+
+    return {"serializer": name, "bytes": len(body), "us_per_page": round(seconds / pages * 1000000, 1),
+            "pages_per_second": round(pages / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization benchmark.")
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=Config.PAGE_SIZE)
+    parser.add_argument('--output', default='serialization.json')
+    args = parser.parse_args()
+
+    result = search_result(args.size)
+    data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+    results = {"page_size": args.size, "baseline": run('baseline', baseline_page, result, args.pages)}
+
+    for library in ('json', 'orjson'):
+        try:
+            name, dumps = create_dumps(library)
+        except ImportError:
+            continue
+
+        results[library] = run(name, lambda item: dumps(data_process.format_page(item, args.size)), result,
+                               args.pages)
+        results[library]['speedup'] = round(results['baseline']['us_per_page'] / results[library]['us_per_page'], 2)
+
+    print(json.dumps(results, indent=2))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark: time of a cold start (a new process, like a new worker) until create_app returns,
+and of the first and next requests of the Swagger spec (built, precompiled or cached).
+
+Each sample runs in a new process: imports (python -c with the application modules), create_app and
+GET /apispec.json. The memory backend is used (no ElasticSearch needed).
+
+    PYTHONPATH=./api/ python api/benchmarks/startup_benchmark.py --samples 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.catalog_benchmark import percentile
+
+SAMPLE = """
+import json, time
+start = time.perf_counter()
+from config import create_app
+imported = time.perf_counter()
+app = create_app('config.default.Config')
+created = time.perf_counter()
+client = app.test_client()
+status = client.get('/apispec.json').status_code
+first = time.perf_counter()
+client.get('/apispec.json')
+second = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "create_app_ms": (created - imported) * 1000,
+                  "first_spec_ms": (first - created) * 1000, "cached_spec_ms": (second - first) * 1000,
+                  "status": status}))
+"""
+
+
+def sample(environment):
+    """
+    :param environment: environment variables of the process.
+    :return: times (ms) of a cold start.
+    """
+    output = subprocess.check_output([sys.executable, '-c', SAMPLE], env=environment, stderr=subprocess.DEVNULL)
+
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run(samples, environment):
+    """
+    :return: p50 and max (ms) of each time.
+    """
+    results = [sample(environment) for _ in range(samples)]
+    summary = {"status": results[-1]['status']}
+
+    for name in ('import_ms', 'create_app_ms', 'first_spec_ms', 'cached_spec_ms'):
+        values = sorted(result[name] for result in results)
+        summary[name] = {"p50": round(percentile(values, 50), 2), "max": round(values[-1], 2)}
+
+    summary['startup_ms'] = round(summary['import_ms']['p50'] + summary['create_app_ms']['p50'], 2)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark.")
+    parser.add_argument('--samples', type=int, default=10)
+    parser.add_argument('--spec', help="precompiled spec (built with apispec.py), a new one by default")
+    parser.add_argument('--output', default='startup.json')
+    args = parser.parse_args()
+
+    environment = dict(os.environ, STORAGE_BACKEND='memory', PYTHONPATH=os.pathsep.join(sys.path))
+    spec_path = args.spec
+
+    if spec_path is None:
+        spec_path = os.path.join(tempfile.mkdtemp(), 'apispec.json')
+        subprocess.check_call([sys.executable, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'apispec.py'),
+                               spec_path], env=environment)
+
+    results = {
+        "samples": args.samples,
+        "built": run(args.samples, dict(environment, SWAGGER_SPEC_PATH='')),
+        "precompiled": run(args.samples, dict(environment, SWAGGER_SPEC_PATH=spec_path)),
+        "without_docs": run(args.samples, dict(environment, SWAGGER_ENABLED='false'))
+    }
+
+    print(json.dumps(results, indent=2))
+
+    with open(args.output, 'w', encoding='utf-8') as file_object:
+        json.dump(results, file_object, indent=2)
+
+
+if __name__ == "__main__":
+    main()
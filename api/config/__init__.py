@@ -4,9 +4,6 @@ from flask.app import Flask
 from flask_injector import FlaskInjector
 from injector import Injector
 
-from config.app_module import AppModule
-from config.doc_module import DocModule
-
 
 def create_app(config_name):
     """
@@ -16,6 +13,9 @@ def create_app(config_name):
     :return: Flask aplication
 
     """
+    # Imported here: the modules import the controllers, which import config.default
+    from config.app_module import AppModule
+    from config.doc_module import DocModule
 
     app = Flask(__name__)
     app.config.from_object(config_name)
@@ -24,3 +24,32 @@ def create_app(config_name):
     FlaskInjector(app=app, injector=injector)
 
     return app
+
+
+def create_async_app(data_process=None):
+    """
+    Create the asyncio application (read path: GET /data-integration and POST /data-integration/lookup),
+    served by run_async.py. Needs the aiohttp and elasticsearch-async packages.
+
+    :param data_process: AsyncDataProcess (created from the configuration by default).
+    :return: aiohttp application
+
+    """
+    from aiohttp import web
+
+    from controller.async_api_controller import AsyncDataApiController, error_middleware
+    from integration.async_data_process import AsyncDataProcess
+
+    data_process = data_process or AsyncDataProcess()
+    controller = AsyncDataApiController(data_process)
+
+    app = web.Application(middlewares=[error_middleware])
+    app.router.add_get('/data-integration', controller.get)
+    app.router.add_post('/data-integration/lookup', controller.lookup)
+
+    async def close(app):
+        await data_process.close()
+
+    app.on_cleanup.append(close)
+
+    return app
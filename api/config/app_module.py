@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
 
+import time
+
+from flask import g, request
 from flask_cors.extension import CORS
-from injector import Module
+from injector import Module, singleton
 from flask_restful import Api
 
-from controller.custom.custom_api_error import custom_errors
+from controller.custom.custom_api_error import custom_errors, ConnectionElasticSearchError
+from controller.custom.json_representation import output_json
+from controller.custom.response_compression import compress_response
 from controller.data_api_controller import DataApiController
+from controller.cache_api_controller import CacheApiController
+from controller.export_api_controller import ExportApiController
+from controller.job_api_controller import JobApiController
+from controller.lookup_api_controller import LookupApiController
+from controller.metrics_api_controller import MetricsApiController
+from integration.data_process import DataProcess
+from integration.job_manager import Job, JobManager
+from integration.metrics import REGISTRY, REQUEST_SECONDS, Gauge
+from integration.query_cache import QueryCache
 
 
 class AppModule(Module):
@@ -15,13 +29,65 @@ class AppModule(Module):
         self.app = app
         self.app.url_map.strict_slashes = False
         self.api = Api(app, errors=custom_errors)
+        self.api.representation('application/json')(output_json)
         CORS(self.app, resources={r"/*": {"origins": "*"}})
+        self.app.after_request(compress_response)
 
     def configure(self, binder):
+        self._configure_services(binder)
         self._configure_endpoints()
 
+    def _configure_services(self, binder):
+        """
+        Configure application scoped services (one storage backend, e.g. ElasticSearch client and connection pool,
+        per process).
+        The index is created once, at startup. If the database is unavailable it's created on first use.
+        """
+        query_cache = QueryCache()
+        data_process = DataProcess(query_cache=query_cache)
+
+        try:
+            data_process.bootstrap()
+        except ConnectionElasticSearchError:
+            self.app.logger.warning("ElasticSearch is unavailable, the index will be created on first use.")
+
+        job_manager = JobManager(data_process)
+
+        binder.bind(QueryCache, to=query_cache, scope=singleton)
+        binder.bind(DataProcess, to=data_process, scope=singleton)
+        binder.bind(JobManager, to=job_manager, scope=singleton)
+
+        self._configure_metrics(job_manager, query_cache)
+
+    def _configure_metrics(self, job_manager, query_cache):
+        """
+        Configure metrics: latency of each request and gauges of the services (read when the metrics are collected).
+        """
+        @self.app.before_request
+        def start_timer():
+            g.request_start = time.perf_counter()
+
+        @self.app.after_request
+        def observe_request(response):
+            if 'request_start' in g:
+                REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, request.method, response.status_code)
+
+            return response
+
+        states = (Job.PENDING, Job.RUNNING, Job.SUCCEEDED, Job.FAILED, Job.CANCELLED)
+
+        REGISTRY.register(Gauge('data_integration_jobs', 'Jobs by state.', ['state'],
+                                function=lambda: {(state,): job_manager.count(state) for state in states}))
+        REGISTRY.register(Gauge('data_integration_query_cache', 'Query cache counters.', ['counter'],
+                                function=lambda: {(name,): value for name, value in query_cache.stats().items()}))
+
     def _configure_endpoints(self):
         """
         Configure endpoints
         """
         self.api.add_resource(DataApiController, '/data-integration')
+        self.api.add_resource(JobApiController, '/data-integration/jobs/<string:job_id>')
+        self.api.add_resource(CacheApiController, '/data-integration/cache')
+        self.api.add_resource(LookupApiController, '/data-integration/lookup')
+        self.api.add_resource(ExportApiController, '/data-integration/export')
+        self.api.add_resource(MetricsApiController, '/metrics')
@@ -11,8 +11,64 @@ class Config:
     this class contains most of the variables and default values.
 
     """
+    ERROR_404_HELP = False
+
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'elasticsearch')
     ELASTICSEARCH_HOST = os.environ.get('ELASTICSEARCH_HOST', 'localhost')
     ELASTICSEARCH_PORT = os.environ.get('ELASTICSEARCH_PORT', '9200')
     ELASTICSEARCH_INDEX = os.environ.get('ELASTICSEARCH_INDEX', 'yawoen')
     ELASTICSEARCH_DOCUMENT_TYPE = os.environ.get('ELASTICSEARCH_DOCUMENT_TYPE', 'catalog')
-
+    ELASTICSEARCH_MAXSIZE = int(os.environ.get('ELASTICSEARCH_MAXSIZE', '25'))
+    ELASTICSEARCH_TIMEOUT = float(os.environ.get('ELASTICSEARCH_TIMEOUT', '10'))
+    ELASTICSEARCH_MAX_RETRIES = int(os.environ.get('ELASTICSEARCH_MAX_RETRIES', '3'))
+    ELASTICSEARCH_RETRY_ON_TIMEOUT = os.environ.get('ELASTICSEARCH_RETRY_ON_TIMEOUT', 'false').lower() == 'true'
+    ELASTICSEARCH_KEEP_ALIVE = os.environ.get('ELASTICSEARCH_KEEP_ALIVE', 'true').lower() == 'true'
+    ELASTICSEARCH_HTTP_COMPRESS = os.environ.get('ELASTICSEARCH_HTTP_COMPRESS', 'true').lower() == 'true'
+    ELASTICSEARCH_NUMBER_OF_SHARDS = int(os.environ.get('ELASTICSEARCH_NUMBER_OF_SHARDS', '5'))
+    ELASTICSEARCH_NUMBER_OF_REPLICAS = int(os.environ.get('ELASTICSEARCH_NUMBER_OF_REPLICAS', '1'))
+    ELASTICSEARCH_SORT_FIELD = os.environ.get('ELASTICSEARCH_SORT_FIELD', 'hash_object')
+    ELASTICSEARCH_BULK_LOAD_SETTINGS = os.environ.get('ELASTICSEARCH_BULK_LOAD_SETTINGS', 'true').lower() == 'true'
+    ELASTICSEARCH_BULK_CHUNK_SIZE = int(os.environ.get('ELASTICSEARCH_BULK_CHUNK_SIZE', '500'))
+    ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = int(os.environ.get('ELASTICSEARCH_BULK_MAX_CHUNK_BYTES', '10485760'))
+    ELASTICSEARCH_BULK_THREAD_COUNT = int(os.environ.get('ELASTICSEARCH_BULK_THREAD_COUNT', '4'))
+    ELASTICSEARCH_BULK_QUEUE_SIZE = int(os.environ.get('ELASTICSEARCH_BULK_QUEUE_SIZE', '4'))
+    UPLOAD_STREAMING = os.environ.get('UPLOAD_STREAMING', 'true').lower() == 'true'
+    UPLOAD_DIRECTORY = os.environ.get('UPLOAD_DIRECTORY', '/tmp/')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', '10'))
+    JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', '86400'))
+    PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', '1'))
+    PARSE_CHUNK_BYTES = int(os.environ.get('PARSE_CHUNK_BYTES', '4194304'))
+    REJECTED_ROWS_LIMIT = int(os.environ.get('REJECTED_ROWS_LIMIT', '100'))
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', '100'))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '1000'))
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', '5000'))
+    SCAN_SLICES = int(os.environ.get('SCAN_SLICES', os.environ.get('ELASTICSEARCH_NUMBER_OF_SHARDS', '5')))
+    SCAN_SLICES_MAX = int(os.environ.get('SCAN_SLICES_MAX', os.environ.get('ELASTICSEARCH_NUMBER_OF_SHARDS', '5')))
+    SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', '4'))
+    SCAN_QUEUE_SIZE = int(os.environ.get('SCAN_QUEUE_SIZE', '2'))
+    LOOKUP_MAX_ITEMS = int(os.environ.get('LOOKUP_MAX_ITEMS', '10000'))
+    LOOKUP_SIZE_MAX = int(os.environ.get('LOOKUP_SIZE_MAX', '10'))
+    LOOKUP_MGET_BATCH_SIZE = int(os.environ.get('LOOKUP_MGET_BATCH_SIZE', '1000'))
+    LOOKUP_MSEARCH_BATCH_SIZE = int(os.environ.get('LOOKUP_MSEARCH_BATCH_SIZE', '100'))
+    ASYNC_PORT = int(os.environ.get('ASYNC_PORT', '5001'))
+    SWAGGER_ENABLED = os.environ.get('SWAGGER_ENABLED', 'true').lower() == 'true'
+    SWAGGER_SPEC_PATH = os.environ.get('SWAGGER_SPEC_PATH', '')
+    JSON_LIBRARY = os.environ.get('JSON_LIBRARY', 'auto')
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '16384'))
+    RESPONSE_COMPRESSION_LEVEL = int(os.environ.get('RESPONSE_COMPRESSION_LEVEL', '6'))
+    DELTA_MODE = os.environ.get('DELTA_MODE', 'mget')
+    DELTA_BATCH_SIZE = int(os.environ.get('DELTA_BATCH_SIZE', '1000'))
+    DELTA_MANIFEST_PATH = os.environ.get('DELTA_MANIFEST_PATH', '/tmp/data_integration_manifest')
+    DEDUPE_POLICY = os.environ.get('DEDUPE_POLICY', 'none')
+    CHECKPOINT_DIRECTORY = os.environ.get('CHECKPOINT_DIRECTORY', '/tmp/data_integration_checkpoints')
+    CHECKPOINT_INTERVAL_ROWS = int(os.environ.get('CHECKPOINT_INTERVAL_ROWS', '10000'))
+    DEDUPE_EXACT_LIMIT = int(os.environ.get('DEDUPE_EXACT_LIMIT', '1000000'))
+    DEDUPE_BLOOM_CAPACITY = int(os.environ.get('DEDUPE_BLOOM_CAPACITY', '10000000'))
+    DEDUPE_BLOOM_ERROR_RATE = float(os.environ.get('DEDUPE_BLOOM_ERROR_RATE', '0.01'))
+    DEDUPE_PENDING_LIMIT = int(os.environ.get('DEDUPE_PENDING_LIMIT', '100000'))
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_DIRECTORY = os.environ.get('PROFILING_DIRECTORY', '/tmp/')
+    QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', '10000'))
+    QUERY_CACHE_MAX_BYTES = int(os.environ.get('QUERY_CACHE_MAX_BYTES', '67108864'))
+    QUERY_CACHE_TTL_SECONDS = float(os.environ.get('QUERY_CACHE_TTL_SECONDS', '60'))
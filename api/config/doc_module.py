@@ -1,16 +1,29 @@
 # -*- coding: utf-8 -*-
 
-from flasgger import Swagger
 from injector import Module
 
+from config.default import Config
+from controller.custom.api_spec import CachedApiSpec
+
 
 class DocModule(Module):
-    """Configure the Swagger Doc."""
+    """
+    Configure the Swagger Doc (SWAGGER_ENABLED).
+
+    flasgger is only imported here: the controllers record their YAML files without it (see swag_from), and
+    the spec is built on the first request (or loaded from SWAGGER_SPEC_PATH), then served from memory.
+    """
 
     def __init__(self, app):
         self.app = app
 
     def configure(self, binder):
+        if not Config.SWAGGER_ENABLED:
+            return
+
+        # Documentation only (it also imports yaml and jsonschema)
+        from flasgger import Swagger
+
         self.app.config['SWAGGER'] = {
             'title': 'Data API',
             'uiversion': 3
@@ -53,3 +66,7 @@ See DATA API - Online:
         }
 
         Swagger(self.app, template=template, config=swagger_config)
+
+        endpoint = 'flasgger.apispec'
+        self.app.view_functions[endpoint] = CachedApiSpec(self.app.view_functions[endpoint],
+                                                          Config.SWAGGER_SPEC_PATH).view
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from aiohttp import web
+from flask_restful import HTTPException
+
+from controller.custom.custom_api_error import custom_errors, InvalidLookupError
+from integration.metrics import REQUEST_SECONDS
+from integration.serialization import dumps
+
+
+def json_response(data, status=200):
+    """
+    JSON response, serialized like the WSGI application (see output_json).
+    """
+    return web.Response(body=dumps(data), status=status, content_type='application/json')
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    """
+    Render the errors like the WSGI application (see custom_errors) and measure the latency of each request.
+    """
+    start = time.perf_counter()
+
+    try:
+        response = await handler(request)
+    except HTTPException as err:
+        error = custom_errors.get(type(err).__name__, {'message': err.description, 'status': err.code})
+        response = json_response(error, status=error['status'])
+
+    REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, response.status)
+
+    return response
+
+
+class AsyncDataApiController:
+    """
+    Class responsible for the asyncio API (read path). Process HTTP requests.
+    """
+
+    def __init__(self, data_process):
+        """
+        :param data_process: AsyncDataProcess.
+        """
+        self._data_process = data_process
+
+    @staticmethod
+    def _is_enabled(request, name):
+        return request.query.get(name, '').lower() in ('true', '1')
+
+    async def get(self, request):
+        """
+        Retrieve objects from database (same arguments of DataApiController.get, without scroll).
+
+        :return: List of objects from the database.
+        """
+        size = request.query.get('size')
+
+        try:
+            size = int(size) if size else None
+        except ValueError:
+            return json_response({'message': {'size': "invalid literal for int() with base 10: '{}'".format(size)}},
+                                 status=400)
+
+        return json_response(await self._data_process.retrieve(request.query.get('name'),
+                                                               request.query.get('zip'),
+                                                               cursor=request.query.get('cursor'),
+                                                               size=size,
+                                                               fuzzy=self._is_enabled(request, 'fuzzy')))
+
+    async def lookup(self, request):
+        """
+        Look up many objects by name and zip (same body of LookupApiController.post).
+
+        :return: results in the order of the items and the number of results by match.
+        """
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+
+        if not isinstance(body, dict):
+            raise InvalidLookupError()
+
+        return json_response(await self._data_process.lookup(
+            body.get('items'), fuzzy=body.get('fuzzy', True) is not False,
+            size=body.get('size') if isinstance(body.get('size'), int) else None))
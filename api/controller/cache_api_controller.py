@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from flask_restful import Resource
+from injector import inject
+
+from controller.custom.api_spec import swag_from
+from integration.query_cache import QueryCache
+
+
+class CacheApiController(Resource):
+    """
+    Class responsible for API of the query cache. Process HTTP requests.
+    """
+
+    @inject
+    def __init__(self, query_cache: QueryCache):
+        self._query_cache = query_cache
+
+    @swag_from('swagger/cache_api_controller_get.yml')
+    def get(self):
+        """
+        Retrieve the counters of the query cache.
+
+        :return: entries, bytes, generation, hits, misses and evictions.
+        """
+        return self._query_cache.stats()
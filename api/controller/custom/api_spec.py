@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+
+from flask import Response, request
+
+from config.default import Config
+
+
+def swag_from(specs):
+    """
+    Document a request method with a Swagger YAML file, like flasgger.swag_from (file path only, without
+    validation) but without importing flasgger: the file is read when the spec is built (see CachedApiSpec).
+
+    :param specs: YAML file path (relative to the module of the method).
+    :return: decorator.
+    """
+    def decorator(function):
+        if not os.path.isabs(specs):
+            function.root_path = os.path.dirname(os.path.abspath(sys.modules[function.__module__].__file__))
+            function.swag_path = os.path.join(function.root_path, specs)
+        else:
+            function.swag_path = specs
+
+        function.swag_type = specs.split('.')[-1]
+
+        return function
+
+    return decorator
+
+
+class CachedApiSpec:
+    """
+    Swagger spec (/apispec.json) served as cached bytes with an ETag: it's built once, by the flasgger view
+    on the first request, or loaded from a precompiled JSON file (SWAGGER_SPEC_PATH, see apispec.py).
+    The gzip body is also built once (see compress_response).
+    """
+
+    def __init__(self, view, path=None, min_bytes=None, level=None):
+        """
+        :param view: flasgger view of the spec.
+        :param path: precompiled JSON file (optional, used when it exists).
+        :param min_bytes: minimum size of a compressed body (RESPONSE_COMPRESSION_MIN_BYTES by default).
+        :param level: gzip compression level (RESPONSE_COMPRESSION_LEVEL by default).
+        """
+        self._view = view
+        self._path = path
+        self._min_bytes = Config.RESPONSE_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+        self._level = level or Config.RESPONSE_COMPRESSION_LEVEL
+        self._lock = threading.Lock()
+        self._content = None
+        self._compressed = None
+        self._etag = None
+
+    def content(self):
+        """
+        :return: spec (JSON bytes) and its ETag.
+        """
+        if self._content is None:
+            with self._lock:
+                if self._content is None:
+                    content = self._load()
+                    self._etag = hashlib.sha1(content).hexdigest()
+
+                    if len(content) >= self._min_bytes:
+                        self._compressed = gzip.compress(content, self._level)
+
+                    self._content = content
+
+        return self._content, self._etag
+
+    def _load(self):
+        """
+        Read the precompiled spec or build it (the spec is not cached when the view fails).
+
+        :return: spec (JSON bytes).
+        """
+        if self._path and os.path.exists(self._path):
+            with open(self._path, 'rb') as file_object:
+                return file_object.read()
+
+        return self._view().get_data()
+
+    def view(self):
+        """
+        View of the spec (a method: flasgger reads the views of all the rules when it builds the spec).
+
+        :return: spec, or 304 when the ETag matches (If-None-Match).
+        """
+        content, etag = self.content()
+
+        if self._compressed is not None and request.accept_encodings['gzip']:
+            response = Response(self._compressed, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(etag + '-gzip')
+        else:
+            response = Response(content, mimetype='application/json')
+            response.set_etag(etag)
+
+        response.vary.add('Accept-Encoding')
+        # Cached by the clients, validated with the ETag (the spec changes with a new release)
+        response.headers['Cache-Control'] = 'no-cache'
+
+        return response.make_conditional(request)
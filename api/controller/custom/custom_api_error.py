@@ -15,6 +15,46 @@ class InitialImportError(HTTPException):
     code = 500
 
 
+class InvalidCursorError(HTTPException):
+    code = 400
+
+
+class JobNotFoundError(HTTPException):
+    code = 404
+
+
+class JobQueueFullError(HTTPException):
+    code = 503
+
+
+class UnsupportedCompressionError(HTTPException):
+    code = 415
+
+
+class CheckpointNotFoundError(HTTPException):
+    code = 404
+
+
+class InvalidImportIdError(HTTPException):
+    code = 400
+
+
+class InvalidLookupError(HTTPException):
+    code = 400
+
+
+class ManifestLockedError(HTTPException):
+    code = 409
+
+
+class InvalidSlicesError(HTTPException):
+    code = 400
+
+
+class InvalidLookupSizeError(HTTPException):
+    code = 400
+
+
 custom_errors = {
     'ConnectionElasticSearchError': {
         'message': "Error trying to connect to ElasticSearch.",
@@ -27,5 +67,46 @@ custom_errors = {
     'InitialImportError': {
         'message': "There is data in the database.",
         'status': 500,
+    },
+    'InvalidCursorError': {
+        'message': "Invalid cursor.",
+        'status': 400,
+    },
+    'JobNotFoundError': {
+        'message': "Job not found.",
+        'status': 404,
+    },
+    'JobQueueFullError': {
+        'message': "Too many pending jobs, try again later.",
+        'status': 503,
+    },
+    'UnsupportedCompressionError': {
+        'message': "Compression not supported (zstd needs the zstandard package).",
+        'status': 415,
+    },
+    'CheckpointNotFoundError': {
+        'message': "Checkpoint not found (resume needs the import_id of a previous import).",
+        'status': 404,
+    },
+    'InvalidImportIdError': {
+        'message': "Invalid import id (up to 64 letters, digits, '.', '_' or '-').",
+        'status': 400,
+    },
+    'InvalidLookupError': {
+        'message': "Invalid lookup: 'items' must be a list of objects with 'name' and optional 'zip' "
+                   "(LOOKUP_MAX_ITEMS at most).",
+        'status': 400,
+    },
+    'ManifestLockedError': {
+        'message': "Another import is using the content manifest, try again later.",
+        'status': 409,
+    },
+    'InvalidSlicesError': {
+        'message': "Invalid slices (from 1 to SCAN_SLICES_MAX).",
+        'status': 400,
+    },
+    'InvalidLookupSizeError': {
+        'message': "Invalid lookup size (LOOKUP_SIZE_MAX at most).",
+        'status': 400,
     }
 }
\ No newline at end of file
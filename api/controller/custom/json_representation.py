@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from flask import make_response
+
+from integration.serialization import dumps
+
+
+def output_json(data, code, headers=None):
+    """
+    JSON representation of the resources (replaces flask_restful.representations.json.output_json), serialized
+    with orjson when it's installed (see integration.serialization), without indentation.
+
+    :param data: response data.
+    :param code: HTTP status.
+    :param headers: response headers.
+    :return: Flask response.
+    """
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+
+    return response
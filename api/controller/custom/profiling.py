@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import os
+import time
+import uuid
+
+from functools import wraps
+
+from flask import request
+from flask_restful import unpack
+
+from config.default import Config
+from integration import profiling
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def profiled(method):
+    """
+    Profile a request method when profiling is enabled (PROFILING_ENABLED) and the request asks for it
+    with the X-Profile header:
+
+    - timing: Server-Timing header with the time of each stage;
+    - cprofile: also a cProfile (pstats) dump in PROFILING_DIRECTORY, the path is returned in X-Profile-Dump.
+
+    When profiling is disabled the method is returned as is.
+
+    :param method: request method.
+    :return: method.
+    """
+    if not Config.PROFILING_ENABLED:
+        return method
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        mode = request.headers.get(PROFILE_HEADER, '').lower()
+
+        if mode not in ('timing', 'cprofile'):
+            return method(*args, **kwargs)
+
+        profile = profiling.start_profile()
+        profiler = cProfile.Profile() if mode == 'cprofile' else None
+        start = time.perf_counter()
+
+        try:
+            if profiler:
+                profiler.enable()
+
+            result = method(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+
+            profiling.stop_profile()
+
+        profile.record('total', time.perf_counter() - start)
+        data, code, headers = unpack(result)
+        headers = dict(headers or {})
+        headers['Server-Timing'] = profile.server_timing()
+
+        if profiler:
+            headers['X-Profile-Dump'] = _dump(profiler)
+
+        return data, code, headers
+
+    return wrapper
+
+
+def _dump(profiler):
+    """
+    Save the statistics of a profiler (pstats format).
+
+    :param profiler: profiler.
+    :return: File path.
+    """
+    name = '{}-{}-{}.prof'.format(time.strftime('%Y%m%d%H%M%S'), request.method.lower(), uuid.uuid4().hex[:8])
+    path = os.path.join(Config.PROFILING_DIRECTORY, name)
+    profiler.dump_stats(path)
+
+    return path
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+
+from flask import request
+
+from config.default import Config
+
+
+def compress_response(response, min_bytes=None, level=None):
+    """
+    Compress the response body with gzip when the client accepts it (Accept-Encoding) and the body is
+    large (RESPONSE_COMPRESSION_MIN_BYTES); small bodies are sent as is, compressing them costs more than it saves.
+    Streamed responses are not compressed.
+
+    :param response: Flask response.
+    :param min_bytes: minimum body size (bytes).
+    :param level: gzip compression level (1-9).
+    :return: response.
+    """
+    min_bytes = Config.RESPONSE_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+
+    if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+        return response
+
+    if not request.accept_encodings['gzip'] or (response.content_length or 0) < min_bytes:
+        return response
+
+    response.set_data(gzip.compress(response.get_data(), level or Config.RESPONSE_COMPRESSION_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+
+    return response
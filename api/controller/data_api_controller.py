@@ -1,11 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import os
+import tempfile
 import werkzeug
 
-from flasgger import swag_from
+from contextlib import contextmanager
+
+from flask import request
+from werkzeug.utils import secure_filename
 from flask_restful import Resource, reqparse
+from injector import inject
 
+from config.default import Config
+from controller.custom.api_spec import swag_from
+from controller.custom.profiling import profiled
+from controller.upload_stream import read_upload_content, read_upload_lines
+from integration import profiling
 from integration.data_process import DataProcess
+from integration.deduplication import POLICIES
+from integration.job_manager import JobManager
 
 
 class DataApiController(Resource):
@@ -13,54 +26,132 @@ class DataApiController(Resource):
     Class responsible for API. Process HTTP requests.
     """
 
-    def __init__(self, directory='/tmp/'):
-        self._data_process = DataProcess()
+    @inject
+    def __init__(self, data_process: DataProcess, job_manager: JobManager, directory=Config.UPLOAD_DIRECTORY,
+                 streaming=Config.UPLOAD_STREAMING):
+        self._data_process = data_process
+        self._job_manager = job_manager
         self._directory = directory
+        self._streaming = streaming
 
     def _save_file(self, parse):
         """
-        Save file in file storage
+        Save file in file storage (with an unique name)
 
         :param parse: parse from request
-        :return: filename saved
+        :return: path of the file saved
         """
 
         parse.add_argument('file', type=werkzeug.FileStorage, location='files')
         args = parse.parse_args()
 
         csv_file = args['file']
-        csv_file.save(self._directory + csv_file.filename)
+        file_descriptor, path = tempfile.mkstemp(dir=self._directory,
+                                                 suffix='_' + secure_filename(csv_file.filename))
+        os.close(file_descriptor)
+
+        csv_file.save(path)
         csv_file.close()
 
-        return csv_file.filename
+        return path
+
+    @contextmanager
+    def _open_upload(self):
+        """
+        Open the uploaded file.
+
+        In streaming mode the lines are read from the request body while it's received (no intermediate file).
+        Otherwise the file is saved in file storage and removed after the process.
+
+        :return: iterable of lines or path of the file saved
+        """
+        if self._streaming:
+            yield read_upload_lines(request)
+            return
+
+        with profiling.stage('upload'):
+            path = self._save_file(reqparse.RequestParser())
+
+        try:
+            yield path
+        finally:
+            os.remove(path)
+
+    def _spool_upload(self):
+        """
+        Save the uploaded file in file storage (with an unique name), reading it from the request body.
+        Compressed files are saved as received (decompressed by the job).
+
+        :return: path of the file saved
+        """
+        with profiling.stage('upload'), \
+                tempfile.NamedTemporaryFile('wb', dir=self._directory, suffix='.upload', delete=False) as file_object:
+            file_object.writelines(read_upload_content(request))
+
+        return file_object.name
+
+    def _is_enabled(self, name):
+        """
+        Check if the client enabled an option (query string <name>=true).
+
+        :param name: option name (e.g. async).
+        :return: boolean
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument(name, type=str, location='args', required=False)
+        args = parser.parse_args()
+
+        return (args.get(name) or '').lower() in ('true', '1')
+
+    def _process(self, operation, **options):
+        """
+        Process the uploaded file, synchronously or as a background job (query string async=true).
+
+        :param operation: 'restore' or 'update'.
+        :param options: options of the operation.
+        :return: Operating result or the job created (HTTP 202).
+        """
+        if self._is_enabled('async'):
+            # Rejected before the upload is read and saved
+            self._job_manager.check_capacity()
+            job = self._job_manager.submit(operation, self._spool_upload(), **options)
+            return {'job': job.to_dict(), 'status': 202}, 202
+
+        with self._open_upload() as upload:
+            result = getattr(self._data_process, operation)(upload, **options)
+
+        result['status'] = 200
+
+        return result
 
     @swag_from('swagger/data_api_controller_post.yml')
+    @profiled
     def post(self):
         """
         Process data from CSV file (initial load data).
 
         :return Operating result.
         """
-        parse = reqparse.RequestParser()
-        filename = self._save_file(parse)
-        result = self._data_process.restore(self._directory + filename)
+        parser = reqparse.RequestParser()
+        parser.add_argument('dedupe', type=str, location='args', required=False, choices=POLICIES)
+        parser.add_argument('import_id', type=str, location='args', required=False)
+        args = parser.parse_args()
 
-        return {'message': result, 'status': 200}
+        return self._process('restore', dedupe=args.get('dedupe'), import_id=args.get('import_id'),
+                             resume=self._is_enabled('resume'))
 
     @swag_from('swagger/data_api_controller_put.yml')
+    @profiled
     def put(self):
         """
         Process data from CSV file (database update).
 
         :return Operating result.
         """
-        parse = reqparse.RequestParser()
-        filename = self._save_file(parse)
-        result = self._data_process.update(self._directory + filename)
-
-        return {'message': result, 'status': 200}
+        return self._process('update', delta=self._is_enabled('delta'))
 
     @swag_from('swagger/data_api_controller_get.yml')
+    @profiled
     def get(self):
         """
         Retrieve objects from database.
@@ -68,10 +159,19 @@ class DataApiController(Resource):
         :return: List of objects from the database.
         """
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('name', type=str, location='args', required=False)
-        parser.add_argument('zip', type=str, location='args', required=False)
-        parser.add_argument('scroll_id', type=str, location='args', required=False)
-        args = parser.parse_args()
-
-        return self._data_process.retrieve(args['name'], args['zip'], args.get('scroll_id'))
+        with profiling.stage('args'):
+            parser = reqparse.RequestParser()
+            parser.add_argument('name', type=str, location='args', required=False)
+            parser.add_argument('zip', type=str, location='args', required=False)
+            parser.add_argument('cursor', type=str, location='args', required=False)
+            parser.add_argument('size', type=int, location='args', required=False)
+            parser.add_argument('scroll', type=str, location='args', required=False)
+            parser.add_argument('scroll_id', type=str, location='args', required=False)
+            parser.add_argument('fuzzy', type=str, location='args', required=False)
+            args = parser.parse_args()
+
+        return self._data_process.retrieve(args['name'], args['zip'], args.get('scroll_id'),
+                                           cursor=args.get('cursor'),
+                                           size=args.get('size'),
+                                           scroll=(args.get('scroll') or '').lower() in ('true', '1'),
+                                           fuzzy=(args.get('fuzzy') or '').lower() in ('true', '1'))
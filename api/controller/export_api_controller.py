@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+
+from itertools import islice
+
+from flask import Response, stream_with_context
+from flask_restful import Resource, reqparse
+from injector import inject
+
+from controller.custom.api_spec import swag_from
+from integration.data_process import DataProcess
+from integration.serialization import dumps
+
+CSV_COLUMNS = ('id', 'name', 'zip', 'website')
+CSV_HEADER = ('id', 'name', 'addressZip', 'website')
+
+
+def ndjson_chunks(objects, chunk_size):
+    """
+    Write objects as NDJSON (one JSON object per line).
+
+    :param objects: iterable of objects.
+    :param chunk_size: number of objects of each chunk.
+    :return: generator of chunks (bytes).
+    """
+    objects = iter(objects)
+
+    while True:
+        chunk = list(islice(objects, chunk_size))
+
+        if not chunk:
+            return
+
+        yield b''.join(dumps(item) + b'\n' for item in chunk)
+
+
+def csv_chunks(objects, chunk_size):
+    """
+    Write objects as CSV (';' separated, the columns of the import and the id).
+
+    :param objects: iterable of objects.
+    :param chunk_size: number of objects of each chunk.
+    :return: generator of chunks (str).
+    """
+    objects = iter(objects)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';', lineterminator='\n')
+    writer.writerow(CSV_HEADER)
+
+    while True:
+        chunk = list(islice(objects, chunk_size))
+        writer.writerows([item.get(column) for column in CSV_COLUMNS] for item in chunk)
+
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if not chunk:
+            return
+
+
+class ExportApiController(Resource):
+    """
+    Class responsible for API of exports. Process HTTP requests.
+    """
+
+    FORMATS = {
+        'ndjson': ('application/x-ndjson', ndjson_chunks),
+        'csv': ('text/csv', csv_chunks)
+    }
+
+    CHUNK_SIZE = 1000
+
+    @inject
+    def __init__(self, data_process: DataProcess):
+        self._data_process = data_process
+
+    @swag_from('swagger/export_api_controller_get.yml')
+    def get(self):
+        """
+        Export all objects (or the objects of a search), streamed while they are read from the database.
+
+        :return: NDJSON or CSV response.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument('name', type=str, location='args', required=False)
+        parser.add_argument('zip', type=str, location='args', required=False)
+        parser.add_argument('format', type=str, location='args', required=False, default='ndjson',
+                            choices=tuple(self.FORMATS))
+        parser.add_argument('slices', type=int, location='args', required=False)
+        parser.add_argument('ordered', type=str, location='args', required=False)
+        args = parser.parse_args()
+
+        mimetype, write = self.FORMATS[args['format']]
+        objects = self._data_process.export(args['name'], args['zip'], slices=args['slices'],
+                                            ordered=(args['ordered'] or '').lower() in ('true', '1'))
+
+        return Response(stream_with_context(write(objects, self.CHUNK_SIZE)), mimetype=mimetype,
+                        headers={'Content-Disposition': 'attachment; filename=export.' + args['format']})
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from flask_restful import Resource
+from injector import inject
+
+from controller.custom.api_spec import swag_from
+from integration.job_manager import JobManager
+
+
+class JobApiController(Resource):
+    """
+    Class responsible for API of ingestion jobs. Process HTTP requests.
+    """
+
+    @inject
+    def __init__(self, job_manager: JobManager):
+        self._job_manager = job_manager
+
+    @swag_from('swagger/job_api_controller_get.yml')
+    def get(self, job_id):
+        """
+        Retrieve the status of a job.
+
+        :param job_id: job id.
+        :return: job status.
+        """
+        return self._job_manager.get(job_id).to_dict()
+
+    @swag_from('swagger/job_api_controller_delete.yml')
+    def delete(self, job_id):
+        """
+        Cancel a job.
+
+        :param job_id: job id.
+        :return: job status.
+        """
+        return self._job_manager.cancel(job_id).to_dict()
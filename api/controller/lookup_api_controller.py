@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from flask import request
+from flask_restful import Resource
+from injector import inject
+
+from controller.custom.api_spec import swag_from
+from controller.custom.custom_api_error import InvalidLookupError
+from controller.custom.profiling import profiled
+from integration.data_process import DataProcess
+
+
+class LookupApiController(Resource):
+    """
+    Class responsible for API of batch lookups. Process HTTP requests.
+    """
+
+    @inject
+    def __init__(self, data_process: DataProcess):
+        self._data_process = data_process
+
+    @swag_from('swagger/lookup_api_controller_post.yml')
+    @profiled
+    def post(self):
+        """
+        Look up many objects by name and zip.
+
+        :return: results in the order of the items and the number of results by match.
+        """
+        body = request.get_json(silent=True)
+
+        if not isinstance(body, dict):
+            raise InvalidLookupError()
+
+        return self._data_process.lookup(body.get('items'), fuzzy=body.get('fuzzy', True) is not False,
+                                         size=body.get('size') if isinstance(body.get('size'), int) else None)
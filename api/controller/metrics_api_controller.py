@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from flask import Response
+from flask_restful import Resource
+
+from controller.custom.api_spec import swag_from
+from integration.metrics import REGISTRY
+
+
+class MetricsApiController(Resource):
+    """
+    Class responsible for API of the metrics (Prometheus text format). Process HTTP requests.
+    """
+
+    @swag_from('swagger/metrics_api_controller_get.yml')
+    def get(self):
+        """
+        Retrieve the metrics of the process.
+
+        :return: metrics (text).
+        """
+        return Response(REGISTRY.render(), content_type=REGISTRY.CONTENT_TYPE)
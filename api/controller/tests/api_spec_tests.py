@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+""" Test Swagger spec cache """
+
+import gzip
+import json
+import os
+import tempfile
+
+from unittest import TestCase
+
+from flask import Flask, jsonify
+
+from controller.custom.api_spec import CachedApiSpec, swag_from
+
+SPEC = {"swagger": "2.0", "paths": {"/data-integration": {"get": {"summary": "Retrieve objects " * 100}}}}
+
+
+class ApiSpecTest(TestCase):
+    """Test Swagger spec cache"""
+
+    def setUp(self):
+        self._builds = 0
+        self._app = Flask(__name__)
+
+    def _build(self):
+        self._builds += 1
+        return jsonify(SPEC)
+
+    def _client(self, spec):
+        self._app.add_url_rule('/apispec.json', 'apispec', spec.view)
+        return self._app.test_client()
+
+    def test_built_once(self):
+        client = self._client(CachedApiSpec(self._build, min_bytes=1024))
+
+        first = client.get('/apispec.json')
+        second = client.get('/apispec.json')
+
+        self.assertEqual(1, self._builds)
+        self.assertEqual(SPEC, json.loads(first.data.decode('utf-8')))
+        self.assertEqual(first.data, second.data)
+        self.assertEqual('no-cache', first.headers['Cache-Control'])
+
+    def test_etag(self):
+        client = self._client(CachedApiSpec(self._build, min_bytes=1024))
+        etag = client.get('/apispec.json').headers['ETag']
+
+        response = client.get('/apispec.json', headers={'If-None-Match': etag})
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.data)
+        self.assertEqual(200, client.get('/apispec.json', headers={'If-None-Match': '"other"'}).status_code)
+
+    def test_gzip(self):
+        client = self._client(CachedApiSpec(self._build, min_bytes=1024))
+
+        response = client.get('/apispec.json', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual(SPEC, json.loads(gzip.decompress(response.data).decode('utf-8')))
+        self.assertNotEqual(client.get('/apispec.json').headers['ETag'], response.headers['ETag'])
+
+        small = Flask(__name__)
+        small.add_url_rule('/apispec.json', 'apispec', CachedApiSpec(self._build, min_bytes=10 ** 6).view)
+        response = small.test_client().get('/apispec.json', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_precompiled(self):
+        """ The precompiled spec is served, the spec is not built. """
+
+        file_descriptor, path = tempfile.mkstemp(suffix='.json')
+        os.close(file_descriptor)
+        self.addCleanup(os.remove, path)
+
+        with open(path, 'w', encoding='utf-8') as file_object:
+            json.dump({"swagger": "2.0", "paths": {}}, file_object)
+
+        response = self._client(CachedApiSpec(self._build, path)).get('/apispec.json')
+
+        self.assertEqual(0, self._builds)
+        self.assertEqual({"swagger": "2.0", "paths": {}}, json.loads(response.data.decode('utf-8')))
+
+    def test_failed_build_not_cached(self):
+        def build():
+            self._builds += 1
+
+            if self._builds == 1:
+                raise ValueError()
+
+            return jsonify(SPEC)
+
+        self._app.testing = True
+        client = self._client(CachedApiSpec(build))
+
+        with self.assertRaises(ValueError):
+            client.get('/apispec.json')
+
+        self.assertEqual(200, client.get('/apispec.json').status_code)
+        self.assertEqual(2, self._builds)
+
+    def test_swag_from(self):
+        @swag_from('swagger/data_api_controller_get.yml')
+        def get():
+            pass
+
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        self.assertEqual(os.path.join(directory, 'swagger', 'data_api_controller_get.yml'), get.swag_path)
+        self.assertEqual('yml', get.swag_type)
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 """ Test controller layer """
 
+import gzip
 import json
+import time
 
 from unittest import TestCase, mock
 
 from io import BytesIO
 
 from config import create_app
+from integration.query_cache import QueryCache
 
 app = create_app('config.default.Config')
 
@@ -20,11 +23,17 @@ class DataApiControllerTest(TestCase):
         cls._app = app.test_client()
         cls._headers = {'Content-Type': 'application/json'}
 
+    def setUp(self):
+        # The database is mocked differently by each test
+        patcher = mock.patch.object(QueryCache, 'enabled', new_callable=mock.PropertyMock, return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @mock.patch("integration.data_process.DataProcess._read_database")
     def test_get_all_results_success(self, mock_elasticsearch):
         mock_elasticsearch.return_value = {
             "count": 2,
-            "scroll": "next_page_hash",
+            "cursor": "next_page_cursor",
             "data": [
                 {
                     "id": "ffa4a5e5666b88c493a1a55a50f58ac16116b628e15a54d2e415d883bba82dfe",
@@ -52,7 +61,7 @@ class DataApiControllerTest(TestCase):
     def test_get_results_by_name_and_zip_success(self, mock_elasticsearch):
         mock_elasticsearch.return_value ={
             "count": 1,
-            "scroll": "next_page_hash",
+            "cursor": "next_page_cursor",
             "data": [
                 {
                     "id": "ffa4a5e5666b88c493a1a55a50f58ac16116b628e15a54d2e415d883bba82dfe",
@@ -74,7 +83,7 @@ class DataApiControllerTest(TestCase):
     def test_get_not_found(self, mock_elasticsearch):
         mock_elasticsearch.return_value = {
             "count": 0,
-            "scroll": "next_page_hash",
+            "cursor": "next_page_cursor",
             "data": []
         }
 
@@ -109,7 +118,7 @@ class DataApiControllerTest(TestCase):
     @mock.patch("integration.data_process.DataProcess._count_database")
     def test_post_success(self, mock_elasticsearch_count, mock_elasticsearch_insert):
         mock_elasticsearch_count.return_value = 0
-        mock_elasticsearch_insert.return_value = None
+        mock_elasticsearch_insert.return_value = (3, 0)
 
         f = open('/tmp/inputData.csv', 'w')
         f.write("name;addressZip\n")
@@ -123,15 +132,17 @@ class DataApiControllerTest(TestCase):
                                   data={'file': (BytesIO(b'my file contents'), 'inputData.csv')})
 
         response_json = json.loads(response.data.decode('utf-8'))
-        self.assertEqual(2, len(response_json))
+        self.assertEqual(5, len(response_json))
         self.assertEqual(200, response_json['status'])
         self.assertEqual("File successfully processed.", response_json['message'])
+        self.assertEqual(3, response_json['indexed'])
+        self.assertEqual(0, response_json['failed'])
 
-    @mock.patch("integration.data_process.DataProcess._update_database")
+    @mock.patch("integration.data_process.DataProcess._update_bulk_database")
     @mock.patch("integration.data_process.DataProcess._count_database")
     def test_put_success(self, mock_elasticsearch_count, mock_elasticsearch_update):
         mock_elasticsearch_count.return_value = 0
-        mock_elasticsearch_update.return_value = None
+        mock_elasticsearch_update.return_value = {"updated": 2, "not_found": 1, "failed": 0}
 
         f = open('/tmp/inputData.csv', 'w')
         f.write("name;addressZip\n")
@@ -145,6 +156,256 @@ class DataApiControllerTest(TestCase):
                                  data={'file': (BytesIO(b'my file contents'), 'inputData.csv')})
 
         response_json = json.loads(response.data.decode('utf-8'))
-        self.assertEqual(2, len(response_json))
+        self.assertEqual(7, len(response_json))
+        self.assertEqual(200, response_json['status'])
+        self.assertEqual("File successfully processed.", response_json['message'])
+        self.assertEqual(2, response_json['updated'])
+        self.assertEqual(1, response_json['not_found'])
+        self.assertEqual(0, response_json['failed'])
+
+    @mock.patch("integration.elasticsearch_backend.ElasticSearchBackend._execute_bulk")
+    @mock.patch("integration.data_process.DataProcess._count_database")
+    def test_post_streaming_upload(self, mock_elasticsearch_count, mock_elasticsearch_bulk):
+        mock_elasticsearch_count.return_value = 0
+        actions = []
+
+        def execute_bulk(bulk_actions):
+            actions.extend(bulk_actions)
+            return [(True, {}) for _ in actions]
+
+        mock_elasticsearch_bulk.side_effect = execute_bulk
+
+        response = self._app.post('/data-integration',
+                                  headers={'Content-Type': 'multipart/form-data'},
+                                  data={'file': (BytesIO(b'name;addressZip\ngroup;78229\nyawoen group;30078\n'),
+                                                 'inputData.csv')})
+
+        response_json = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(200, response_json['status'])
+        self.assertEqual(2, response_json['indexed'])
+        self.assertEqual(['group', 'yawoen group'], [action['_source']['name'] for action in actions])
+        self.assertEqual(['78229', '30078'], [action['_source']['zip'] for action in actions])
+
+    @mock.patch("integration.elasticsearch_backend.ElasticSearchBackend._execute_bulk")
+    @mock.patch("integration.data_process.DataProcess._count_database")
+    def test_post_duplicated_rows(self, mock_elasticsearch_count, mock_elasticsearch_bulk):
+        mock_elasticsearch_count.return_value = 0
+        actions = []
+
+        def execute_bulk(bulk_actions):
+            bulk_actions = list(bulk_actions)
+            actions.extend(bulk_actions)
+            return [(True, {}) for _ in bulk_actions]
+
+        mock_elasticsearch_bulk.side_effect = execute_bulk
+
+        response = self._app.post('/data-integration?dedupe=last',
+                                  headers={'Content-Type': 'multipart/form-data'},
+                                  data={'file': (BytesIO(b'name;addressZip;website\ngroup;78229;a.com\n'
+                                                         b'group;78229;b.com\nyawoen;30078;\n'),
+                                                 'inputData.csv')})
+
+        response_json = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(200, response_json['status'])
+        self.assertEqual(2, response_json['indexed'])
+        self.assertEqual({"policy": "last", "rows": 1, "ids": 1, "resent": 1}, response_json['duplicates'])
+        self.assertEqual(['a.com', None, 'b.com'], [action['_source']['website'] for action in actions])
+
+    @mock.patch("integration.elasticsearch_backend.ElasticSearchBackend._execute_bulk")
+    @mock.patch("integration.data_process.DataProcess._count_database")
+    def test_post_compressed_upload(self, mock_elasticsearch_count, mock_elasticsearch_bulk):
+        mock_elasticsearch_count.return_value = 0
+        mock_elasticsearch_bulk.side_effect = lambda actions: [(True, action) for action in actions]
+
+        response = self._app.post('/data-integration',
+                                  headers={'Content-Type': 'text/csv'},
+                                  data=gzip.compress(b'name;addressZip\ngroup;78229\nyawoen group;30078\n'))
+
+        response_json = json.loads(response.data.decode('utf-8'))
         self.assertEqual(200, response_json['status'])
-        self.assertEqual("File successfully processed.", response_json['message'])
\ No newline at end of file
+        self.assertEqual(2, response_json['indexed'])
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    @mock.patch("integration.data_process.DataProcess._count_database")
+    def test_post_raw_upload_parallel_bulk(self, mock_elasticsearch_count, mock_elasticsearch_bulk):
+        """
+        The rows are read by the threads of parallel_bulk (ELASTICSEARCH_BULK_THREAD_COUNT > 1, the default),
+        outside the request context.
+        """
+
+        mock_elasticsearch_count.return_value = 0
+        documents = []
+
+        def bulk(body, *args, **kwargs):
+            lines = [json.loads(line) for line in body.splitlines()]
+            documents.extend(lines[1::2])
+            return {"errors": False,
+                    "items": [{"index": {"_id": action['index']['_id'], "status": 201}} for action in lines[::2]]}
+
+        mock_elasticsearch_bulk.side_effect = bulk
+
+        for body in (b'name;addressZip\ngroup;78229\nyawoen group;30078\n',
+                     gzip.compress(b'name;addressZip\ngroup;78229\nyawoen group;30078\n')):
+            documents.clear()
+
+            response = self._app.post('/data-integration', headers={'Content-Type': 'text/csv'}, data=body)
+            response_json = json.loads(response.data.decode('utf-8'))
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(2, response_json['indexed'])
+            self.assertEqual(['group', 'yawoen group'], sorted(document['name'] for document in documents))
+
+    def test_post_unsupported_compression(self):
+        with mock.patch.dict('sys.modules', {'zstandard': None}):
+            response = self._app.post('/data-integration',
+                                      headers={'Content-Type': 'text/csv'},
+                                      data=b'\x28\xb5\x2f\xfd' + b'\x00' * 8)
+
+        self.assertEqual(415, response.status_code)
+
+    @mock.patch("integration.data_process.DataProcess._read_database")
+    def test_get_compressed_response(self, mock_elasticsearch):
+        rows = [{"id": str(item), "zip": "30078", "name": "group {}".format(item), "website": None}
+                for item in range(1000)]
+        mock_elasticsearch.return_value = {"count": 1000, "cursor": None, "data": rows}
+
+        response = self._app.get('/data-integration', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual(1000, len(json.loads(gzip.decompress(response.data).decode('utf-8'))['data']))
+
+        response = self._app.get('/data-integration')
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(1000, len(json.loads(response.data.decode('utf-8'))['data']))
+
+    def test_post_resume_without_checkpoint(self):
+        response = self._app.post('/data-integration?resume=true',
+                                  headers={'Content-Type': 'text/csv'},
+                                  data=b'name;addressZip\n')
+
+        self.assertEqual(404, response.status_code)
+
+    def test_post_invalid_dedupe_policy(self):
+        response = self._app.post('/data-integration?dedupe=any',
+                                  headers={'Content-Type': 'multipart/form-data'},
+                                  data={'file': (BytesIO(b'name;addressZip\n'), 'inputData.csv')})
+
+        self.assertEqual(400, response.status_code)
+
+    @mock.patch("integration.elasticsearch_backend.ElasticSearchBackend._execute_bulk")
+    @mock.patch("integration.data_process.DataProcess._count_database")
+    def test_post_async_job(self, mock_elasticsearch_count, mock_elasticsearch_bulk):
+        mock_elasticsearch_count.return_value = 0
+        mock_elasticsearch_bulk.side_effect = lambda actions: [(True, action) for action in actions]
+
+        response = self._app.post('/data-integration?async=true',
+                                  headers={'Content-Type': 'multipart/form-data'},
+                                  data={'file': (BytesIO(b'name;addressZip\ngroup;78229\nyawoen group;30078\n'),
+                                                 'inputData.csv')})
+
+        response_json = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(202, response_json['status'])
+
+        job_id = response_json['job']['id']
+
+        for _ in range(50):
+            response = self._app.get('/data-integration/jobs/' + job_id, headers=self._headers)
+            response_json = json.loads(response.data.decode('utf-8'))
+
+            if response_json['state'] not in ('pending', 'running'):
+                break
+
+            time.sleep(0.1)
+
+        self.assertEqual('succeeded', response_json['state'])
+        self.assertEqual(2, response_json['rows'])
+        self.assertEqual(2, response_json['result']['indexed'])
+
+    @mock.patch("controller.data_api_controller.DataApiController._spool_upload")
+    @mock.patch("integration.job_manager.JobManager.count")
+    def test_post_async_job_queue_full(self, mock_count, mock_spool_upload):
+        mock_count.return_value = 10 ** 6
+
+        response = self._app.post('/data-integration?async=true',
+                                  headers={'Content-Type': 'multipart/form-data'},
+                                  data={'file': (BytesIO(b'name;addressZip\ngroup;78229\n'), 'inputData.csv')})
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("Too many pending jobs, try again later.",
+                         json.loads(response.data.decode('utf-8'))['message'])
+        mock_spool_upload.assert_not_called()
+
+    def test_get_job_not_found(self):
+        response = self._app.get('/data-integration/jobs/unknown', headers=self._headers)
+        response_json = json.loads(response.data.decode('utf-8'))
+
+        self.assertEqual(404, response.status_code)
+        self.assertEqual("Job not found.", response_json['message'])
+
+    def test_get_cache_stats(self):
+        response = self._app.get('/data-integration/cache', headers=self._headers)
+        response_json = json.loads(response.data.decode('utf-8'))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['bytes', 'entries', 'evictions', 'generation', 'hits', 'misses'], sorted(response_json))
+
+    @mock.patch("integration.data_process.DataProcess.lookup")
+    def test_post_lookup(self, mock_lookup):
+        mock_lookup.return_value = {"results": [{"match": "miss", "data": []}],
+                                    "count": {"exact": 0, "fuzzy": 0, "miss": 1, "error": 0}}
+
+        response = self._app.post('/data-integration/lookup', headers=self._headers,
+                                  data=json.dumps({"items": [{"name": "group", "zip": "78229"}], "fuzzy": False}))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('miss', json.loads(response.data.decode('utf-8'))['results'][0]['match'])
+        mock_lookup.assert_called_once_with([{"name": "group", "zip": "78229"}], fuzzy=False, size=None)
+
+        response = self._app.post('/data-integration/lookup', headers=self._headers, data='invalid')
+        self.assertEqual(400, response.status_code)
+
+    @mock.patch("integration.data_process.DataProcess.export")
+    def test_get_export(self, mock_export):
+        objects = [{"id": str(item), "name": "group; {}".format(item), "zip": "78229", "website": None}
+                   for item in range(2500)]
+        mock_export.side_effect = lambda name, addresszip, slices, ordered: iter(objects)
+
+        response = self._app.get('/data-integration/export?name=group')
+        lines = response.data.decode('utf-8').splitlines()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/x-ndjson', response.mimetype)
+        self.assertEqual(objects, [json.loads(line) for line in lines])
+        mock_export.assert_called_with('group', None, slices=None, ordered=False)
+
+        response = self._app.get('/data-integration/export?format=csv')
+        lines = response.data.decode('utf-8').splitlines()
+
+        self.assertEqual('text/csv', response.mimetype)
+        self.assertEqual(2501, len(lines))
+        self.assertEqual('id;name;addressZip;website', lines[0])
+        self.assertEqual('0;"group; 0";78229;', lines[1])
+
+        self.assertEqual(400, self._app.get('/data-integration/export?format=xml').status_code)
+
+    @mock.patch("integration.data_process.DataProcess.bootstrap")
+    def test_get_export_invalid_slices(self, mock_bootstrap):
+        for slices in ('0', '-1', '5000'):
+            response = self._app.get('/data-integration/export?slices={}&ordered=true'.format(slices))
+
+            self.assertEqual(400, response.status_code)
+            self.assertEqual("Invalid slices (from 1 to SCAN_SLICES_MAX).",
+                             json.loads(response.data.decode('utf-8'))['message'])
+
+    def test_get_metrics(self):
+        self._app.get('/data-integration/cache', headers=self._headers)
+        response = self._app.get('/metrics')
+        text = response.data.decode('utf-8')
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('data_integration_request_seconds_count{method="GET",status="200"}', text)
+        self.assertIn('data_integration_jobs{state="running"}', text)
+        self.assertIn('data_integration_query_cache{counter="hits"}', text)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+""" Test request profiling """
+
+import os
+import pstats
+import tempfile
+
+from unittest import TestCase, mock
+
+from flask import Flask
+from flask_restful import Api, Resource
+
+from config.default import Config
+from controller.custom.profiling import profiled
+from integration import profiling
+
+
+def create_resource():
+    class ProfiledResource(Resource):
+
+        @profiled
+        def get(self):
+            with profiling.stage('query'):
+                pass
+
+            return {'status': 200}
+
+    return ProfiledResource
+
+
+class ProfilingTest(TestCase):
+    """Test Profiling"""
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        patcher = mock.patch.multiple(Config, PROFILING_ENABLED=True, PROFILING_DIRECTORY=self._directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = Flask(__name__)
+        Api(app).add_resource(create_resource(), '/profiled')
+        self._app = app.test_client()
+
+    def test_disabled(self):
+        """ The method is not wrapped when profiling is disabled. """
+
+        def get():
+            pass
+
+        with mock.patch.object(Config, 'PROFILING_ENABLED', False):
+            self.assertIs(get, profiled(get))
+
+    def test_not_requested(self):
+        response = self._app.get('/profiled')
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('Server-Timing', response.headers)
+
+    def test_server_timing(self):
+        response = self._app.get('/profiled', headers={'X-Profile': 'timing'})
+        stages = [item.split(';')[0] for item in response.headers['Server-Timing'].split(', ')]
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['query', 'total'], stages)
+        self.assertNotIn('X-Profile-Dump', response.headers)
+
+    def test_cprofile_dump(self):
+        response = self._app.get('/profiled', headers={'X-Profile': 'cprofile'})
+        path = response.headers['X-Profile-Dump']
+
+        self.assertEqual(self._directory, os.path.dirname(path))
+        self.assertTrue(pstats.Stats(path).total_calls > 0)
+
+    def test_stage_without_profile(self):
+        """ Stages outside a profiled request are not measured. """
+
+        with profiling.stage('query'):
+            profiling.record('parse', 1.0)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+""" Test upload stream """
+
+import gzip
+
+from unittest import TestCase
+
+from io import BytesIO
+
+from controller.custom.custom_api_error import ProcessFileError
+from controller.upload_stream import MultipartFileReader
+
+
+class MultipartFileReaderTest(TestCase):
+    """Test Multipart File Reader Class"""
+
+    def _body(self, content):
+        return BytesIO(b'--boundary\r\n'
+                       b'Content-Disposition: form-data; name="description"\r\n\r\n'
+                       b'catalog\r\n'
+                       b'--boundary\r\n'
+                       b'Content-Disposition: form-data; name="file"; filename="inputData.csv"\r\n'
+                       b'Content-Type: text/csv\r\n\r\n' +
+                       content +
+                       b'\r\n--boundary--\r\n')
+
+    def test_read_file_lines(self):
+        """ Reads only the lines of the file part. """
+
+        reader = MultipartFileReader(self._body(b'name;addressZip\ngroup;78229\nyawoen group;30078'), 'boundary')
+
+        self.assertEqual(['name;addressZip\n', 'group;78229\n', 'yawoen group;30078'], list(reader))
+        self.assertEqual('inputData.csv', reader.filename)
+
+    def test_read_file_lines_trailing_line_break(self):
+        """ The line break before the delimiter is not part of the file. """
+
+        reader = MultipartFileReader(self._body(b'name;addressZip\ngroup;78229\n'), 'boundary')
+
+        self.assertEqual(['name;addressZip\n', 'group;78229\n'], list(reader))
+
+    def test_without_file(self):
+        """ Body without file part. """
+
+        reader = MultipartFileReader(BytesIO(b'--boundary\r\n'
+                                             b'Content-Disposition: form-data; name="description"\r\n\r\n'
+                                             b'catalog\r\n'
+                                             b'--boundary--\r\n'), 'boundary')
+
+        with self.assertRaises(ProcessFileError):
+            list(reader)
+
+    def test_read_compressed_file_lines(self):
+        """ A compressed file is decompressed while it's read. """
+
+        reader = MultipartFileReader(self._body(gzip.compress(b'name;addressZip\ngroup;78229\n')), 'boundary')
+
+        self.assertEqual(['name;addressZip\n', 'group;78229\n'], list(reader))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+from werkzeug.http import parse_options_header
+
+from controller.custom.custom_api_error import ProcessFileError
+from integration.compression import ChunkStream, open_text
+
+
+class MultipartFileReader:
+    """
+    Read the lines of the file sent in a multipart/form-data body, while the body is received.
+    Only the first part with a filename is read, nothing is written to disk.
+    Compressed files (gzip, bz2, zstd) are decompressed while they are read.
+    """
+
+    def __init__(self, stream, boundary, encoding='utf-8'):
+        self._stream = stream
+        self._delimiter = b'--' + boundary.encode('latin-1')
+        self._encoding = encoding
+        self.filename = None
+
+    def __iter__(self):
+        return iter(open_text(ChunkStream(self.iter_content()), self._encoding))
+
+    def iter_content(self):
+        """
+        Read the content of the file part (bytes, as sent).
+
+        :return: generator of byte strings.
+        """
+        if not self._skip_to_file_part():
+            raise ProcessFileError()
+
+        previous = None
+
+        for line in iter(self._stream.readline, b''):
+            if line.startswith(self._delimiter):
+                break
+
+            if previous is not None:
+                yield previous
+
+            previous = line
+
+        # The line break before the delimiter belongs to the delimiter (RFC 2046)
+        if previous and previous.endswith(b'\r\n'):
+            previous = previous[:-2]
+
+        if previous:
+            yield previous
+
+    def _skip_to_file_part(self):
+        """
+        Skip the preamble and the parts without file.
+
+        :return: True when the stream is positioned at the body of the file part.
+        """
+        for line in iter(self._stream.readline, b''):
+            if not line.startswith(self._delimiter):
+                continue
+
+            if line.rstrip().endswith(b'--'):
+                return False
+
+            headers = self._read_part_headers()
+            _, options = parse_options_header(headers.get('content-disposition', ''))
+
+            if 'filename' in options:
+                self.filename = options['filename']
+                return True
+
+        return False
+
+    def _read_part_headers(self):
+        """
+        Read the headers of a part.
+
+        :return: headers (dict, lowercase names).
+        """
+        headers = {}
+
+        for line in iter(self._stream.readline, b''):
+            line = line.decode('latin-1').strip()
+
+            if not line:
+                break
+
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        return headers
+
+
+def read_upload_content(request):
+    """
+    Read the file uploaded in the request body (bytes, as sent: compressed files are not decompressed),
+    as it's received. Accepts multipart/form-data (field 'file') or the raw file as body.
+
+    :param request: Flask request.
+    :return: iterable of byte strings.
+    """
+    mimetype, options = parse_options_header(request.headers.get('Content-Type', ''))
+
+    if mimetype == 'multipart/form-data':
+        if 'boundary' not in options:
+            raise ProcessFileError()
+
+        return MultipartFileReader(request.stream, options['boundary']).iter_content()
+
+    # Bound once: the content may be read outside the request context (e.g. by the threads of parallel_bulk)
+    stream = request.stream
+
+    return iter(lambda: stream.read(65536), b'')
+
+
+def read_upload_lines(request, encoding='utf-8'):
+    """
+    Read the lines of the file uploaded in the request body, as they are received.
+    Accepts multipart/form-data (field 'file') or the raw file as body, compressed (gzip, bz2, zstd) or not.
+
+    :param request: Flask request.
+    :param encoding: file encoding.
+    :return: iterable of lines (str).
+    """
+    return open_text(ChunkStream(read_upload_content(request)), encoding)
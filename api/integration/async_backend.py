@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from config.default import Config
+from controller.custom.custom_api_error import ConnectionElasticSearchError
+from integration.connection import create_async_elasticsearch_client
+from integration.index_definition import get_index_definition
+
+
+class AsyncStorageBackend:
+    """
+    Database used by AsyncDataProcess: the read operations of StorageBackend as coroutines (same queries and
+    same results), so a request waiting on the database doesn't block the event loop.
+    """
+
+    async def bootstrap(self):
+        """
+        Create the index (if it doesn't exist).
+        """
+        pass
+
+    async def get(self, document_id, fields=None):
+        """
+        See StorageBackend.get.
+        """
+        raise NotImplementedError()
+
+    async def get_many(self, document_ids, fields=None):
+        """
+        See StorageBackend.get_many.
+        """
+        raise NotImplementedError()
+
+    async def search(self, body, size):
+        """
+        See StorageBackend.search.
+        """
+        raise NotImplementedError()
+
+    async def search_many(self, bodies, size):
+        """
+        See StorageBackend.search_many.
+        """
+        raise NotImplementedError()
+
+    async def close(self):
+        """
+        Close the connections.
+        """
+        pass
+
+
+class AsyncElasticSearchBackend(AsyncStorageBackend):
+    """
+    Objects stored in an ElasticSearch index, read with the asyncio client (elasticsearch-async).
+
+    At most ELASTICSEARCH_MAXSIZE requests are sent at the same time (like the connection pool of the
+    synchronous client), the other requests wait in the event loop before they are created: the client
+    starts a request as soon as its method is called.
+    """
+
+    def __init__(self, elastic_search=None):
+        """
+        :param elastic_search: asyncio ElasticSearch client (created from the configuration by default).
+        """
+        try:
+            self._elastic_search = elastic_search or create_async_elasticsearch_client()
+        except ImportError:
+            raise
+        except Exception as err:
+            raise ConnectionElasticSearchError()
+
+        self._document_type = Config.ELASTICSEARCH_DOCUMENT_TYPE
+        self._index = Config.ELASTICSEARCH_INDEX
+        self._maxsize = Config.ELASTICSEARCH_MAXSIZE
+        self._requests = None
+        self._index_ready = False
+
+    async def _send(self, method, **kwargs):
+        """
+        Send a request, waiting while ELASTICSEARCH_MAXSIZE requests are in flight.
+
+        :param method: method of the client (called when a request can be sent).
+        :param kwargs: arguments of the method.
+        :return: response.
+        """
+        if self._requests is None:
+            # Created in the event loop of the requests
+            self._requests = asyncio.Semaphore(self._maxsize)
+
+        async with self._requests:
+            return await method(**kwargs)
+
+    async def bootstrap(self):
+        if self._index_ready:
+            return
+
+        try:
+            await self._send(self._elastic_search.indices.create, index=self._index,
+                             body=get_index_definition(self._document_type), ignore=400)
+        except Exception as err:
+            raise ConnectionElasticSearchError()
+
+        self._index_ready = True
+
+    async def get(self, document_id, fields=None):
+        options = {"_source": fields} if fields is not None else {}
+        result = await self._send(self._elastic_search.get, index=self._index, doc_type=self._document_type,
+                                  id=document_id, ignore=404, **options)
+
+        return result if result.get('found') else None
+
+    async def get_many(self, document_ids, fields=None):
+        if not document_ids:
+            return {}
+
+        options = {"_source": fields} if fields is not None else {}
+        result = await self._send(self._elastic_search.mget, body={"ids": document_ids}, index=self._index,
+                                  doc_type=self._document_type, **options)
+
+        return {document['_id']: document.get('_source', {}) for document in result['docs'] if document.get('found')}
+
+    async def search(self, body, size):
+        return await self._send(self._elastic_search.search,
+                                index=self._index,
+                                doc_type=self._document_type,
+                                body=body,
+                                size=size)
+
+    async def search_many(self, bodies, size):
+        if not bodies:
+            return []
+
+        lines = []
+
+        for body in bodies:
+            # The index is in the URL: empty header
+            lines.append({})
+            lines.append(dict(body, size=size))
+
+        result = await self._send(self._elastic_search.msearch, body=lines, index=self._index,
+                                  doc_type=self._document_type)
+
+        return result['responses']
+
+    async def close(self):
+        await self._elastic_search.transport.close()
+
+
+class AsyncMemoryBackend(AsyncStorageBackend):
+    """
+    Objects stored in memory (see MemoryBackend): the queries run in the event loop (no I/O to wait on).
+    """
+
+    def __init__(self, backend=None):
+        """
+        :param backend: memory backend (a new one by default).
+        """
+        if backend is None:
+            from integration.memory_backend import MemoryBackend
+            backend = MemoryBackend()
+
+        self.backend = backend
+
+    async def get(self, document_id, fields=None):
+        return self.backend.get(document_id, fields)
+
+    async def get_many(self, document_ids, fields=None):
+        return self.backend.get_many(document_ids, fields)
+
+    async def search(self, body, size):
+        return self.backend.search(body, size)
+
+    async def search_many(self, bodies, size):
+        return self.backend.search_many(bodies, size)
+
+
+def create_async_storage_backend(name=None):
+    """
+    Create the asyncio storage backend from the configuration.
+
+    :param name: 'elasticsearch' or 'memory' (STORAGE_BACKEND by default).
+    :return: asyncio storage backend.
+    """
+    name = name or Config.STORAGE_BACKEND
+
+    if name == 'elasticsearch':
+        return AsyncElasticSearchBackend()
+
+    if name == 'memory':
+        return AsyncMemoryBackend()
+
+    raise ValueError("Unknown storage backend: {}".format(name))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from integration.async_backend import create_async_storage_backend
+from integration.data_process import DataProcess
+from integration.query_cache import QueryCache
+from integration.storage_backend import StorageBackend
+
+
+class AsyncDataProcess:
+    """
+    Read path of DataProcess (retrieve and lookup) on asyncio: while a request waits on the database the event
+    loop serves the other requests, so the number of requests in flight is not bounded by the number of
+    worker threads (see run_async.py).
+
+    The queries, the batches and the responses are built by the public helpers of a DataProcess (without
+    database), so both stacks share one implementation. The loads (restore and update) and the exports are not
+    supported: they are served by the WSGI application.
+
+    The query cache is disabled by default: the loads run in the WSGI process, they can't invalidate the cache
+    of this process (its results would be stale until the TTL).
+    """
+
+    def __init__(self, query_cache=None, backend=None):
+        """
+        :param query_cache: Cache of query results (disabled by default, see above).
+        :param backend: asyncio storage backend (created from the configuration by default).
+        """
+        self._backend = backend or create_async_storage_backend()
+        self._query_cache = query_cache or QueryCache(max_entries=0)
+        self._queries = DataProcess(query_cache=self._query_cache, backend=StorageBackend())
+
+    async def bootstrap(self):
+        """
+        Create the index in the database (see AsyncStorageBackend.bootstrap).
+        """
+        await self._backend.bootstrap()
+
+    async def close(self):
+        """
+        Close the connections to the database.
+        """
+        await self._backend.close()
+
+    async def retrieve(self, name, addresszip, cursor=None, size=None, fuzzy=False):
+        """
+        Retrieve objects from database (see DataProcess.retrieve, without scroll).
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param cursor: Next page (cursor returned by the previous page)
+        :param size: Page size
+        :param fuzzy: Search the query, even with name and zip
+
+        :return: List of objects from the database
+        """
+        await self.bootstrap()
+
+        exact = self._queries.is_exact(name, addresszip, cursor, fuzzy)
+
+        if not self._query_cache.enabled:
+            return await self._read_database(name, addresszip, cursor, size, exact)
+
+        key = QueryCache.key(name, addresszip, cursor, size, exact)
+        response = self._query_cache.get(key)
+
+        if response is None:
+            generation = self._query_cache.generation
+            response = await self._read_database(name, addresszip, cursor, size, exact)
+            self._query_cache.set(key, response, generation)
+
+        return response
+
+    async def lookup(self, items, fuzzy=True, size=1):
+        """
+        Look up many objects at once, by name and zip (see DataProcess.lookup). The batches are sent
+        at the same time.
+
+        :param items: list of dicts with name and zip (optional).
+        :param fuzzy: search the items not found by id.
+        :param size: maximum number of objects of each fuzzy match.
+        :return: results in the order of the items and the number of results by match.
+        """
+        queries = self._queries.get_lookup_queries(items)
+        size = self._queries.get_lookup_size(size)
+        results = [None] * len(queries)
+
+        await self.bootstrap()
+
+        ids = self._queries.get_lookup_ids(queries)
+        found = await asyncio.gather(*[self._backend.get_many(batch, ['name', 'zip', 'website'])
+                                       for batch in self._queries.get_id_batches(ids)])
+
+        for batch_found in found:
+            self._queries.set_exact_results(ids, batch_found, results)
+
+        if fuzzy:
+            missing = self._queries.get_lookup_missing(queries, results)
+            batches = self._queries.get_search_batches(missing)
+            responses = await asyncio.gather(*[self._backend.search_many(bodies, size) for _, bodies in batches])
+
+            for (keys, _), batch_responses in zip(batches, responses):
+                self._queries.set_fuzzy_results(keys, batch_responses, missing, results)
+
+        return self._queries.get_lookup_response(results)
+
+    async def _read_database(self, name, addresszip, cursor, size, exact=False):
+        """
+        Retrieve objects from database (see DataProcess._read_database).
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param cursor: Next page (cursor returned by the previous page)
+        :param size: Page size
+        :param exact: Read the object by id first (name and zip)
+
+        :return: List of objects from the database and the cursor of the next page (None on the last page)
+        """
+        if exact:
+            hit = await self._backend.get(self._queries.get_document_id(name, addresszip), ['name', 'zip', 'website'])
+
+            if hit is not None:
+                return self._queries.format_object(hit)
+
+        size = self._queries.get_page_size(size)
+        result = await self._backend.search(self._queries.get_search_dsl(name, addresszip, cursor), size)
+
+        return self._queries.format_page(result, size)
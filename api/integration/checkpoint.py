@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+import time
+
+from collections import deque
+
+from config.default import Config
+from controller.custom.custom_api_error import CheckpointNotFoundError, InvalidImportIdError
+
+IMPORT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+
+class CheckpointStore:
+    """
+    Checkpoints of the imports (one JSON file per import id), local to the host.
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory or Config.CHECKPOINT_DIRECTORY
+
+    def path(self, import_id):
+        """
+        :param import_id: import id.
+        :return: path of the checkpoint file.
+        """
+        if not IMPORT_ID_PATTERN.match(import_id or '') or import_id.startswith('.'):
+            raise InvalidImportIdError()
+
+        return os.path.join(self._directory, import_id + '.json')
+
+    def load(self, import_id):
+        """
+        :param import_id: import id.
+        :return: checkpoint (dict).
+        """
+        try:
+            with open(self.path(import_id), 'r', encoding='utf-8') as file_object:
+                return json.load(file_object)
+        except FileNotFoundError:
+            raise CheckpointNotFoundError()
+
+    def save(self, checkpoint):
+        """
+        Save a checkpoint (replaced atomically: a crash keeps the previous one).
+
+        :param checkpoint: checkpoint (dict with import_id).
+        """
+        path = self.path(checkpoint['import_id'])
+        os.makedirs(self._directory, exist_ok=True)
+
+        with open(path + '.tmp', 'w', encoding='utf-8') as file_object:
+            json.dump(checkpoint, file_object)
+
+        os.replace(path + '.tmp', path)
+
+
+class CheckpointTracker:
+    """
+    Record the line of the last acknowledged row of an import: the rows sent to the bulk are paired with
+    the line read when they were produced, and the bulk results are returned in the same order.
+
+    When an import is resumed the rows up to the line of the checkpoint are read again (the rejected rows and the
+    duplicates are the same) but not sent. The rows sent after the checkpoint was saved are sent again:
+    the ids are deterministic, they are overwritten.
+
+    The checkpoint stops before the first row not written (e.g. rejected by a full bulk queue, 429): a resume sends
+    it again, with all the rows after it. The counts of the checkpoint are the ones up to its line.
+    """
+
+    RUNNING = 'running'
+    FAILED = 'failed'
+    COMPLETED = 'completed'
+
+    def __init__(self, store, import_id, checkpoint=None, interval=None):
+        """
+        :param store: checkpoint store.
+        :param import_id: import id.
+        :param checkpoint: checkpoint to resume from (optional).
+        :param interval: number of acknowledged rows between checkpoints.
+        """
+        checkpoint = checkpoint or {}
+        store.path(import_id)
+        self._store = store
+        self._interval = interval or Config.CHECKPOINT_INTERVAL_ROWS
+        self._pending = deque()
+        self._since_save = 0
+        self._exhausted = False
+        self._extra = 0
+        self._stopped = False
+        self.import_id = import_id
+        self.resumed_from = checkpoint.get('line', 0)
+        self.line = 0
+        self.acknowledged_line = self.resumed_from
+        self.indexed = checkpoint.get('indexed', 0)
+        self.skipped = 0
+
+    def count_lines(self, lines):
+        """
+        :param lines: iterable of lines.
+        :return: generator of lines.
+        """
+        for line in lines:
+            self.line += 1
+            yield line
+
+        self._exhausted = True
+
+    def track(self, rows):
+        """
+        :param rows: iterable of rows (read from the lines, see count_lines).
+        :return: generator of rows to send (after the checkpoint).
+        """
+        for row in rows:
+            if self._exhausted:
+                # Rows produced after the last line (see Deduplicator.tail), numbered after it, in order
+                self._extra += 1
+                line = self.line + self._extra
+            else:
+                line = self.line
+
+            if line <= self.resumed_from:
+                self.skipped += 1
+                continue
+
+            self._pending.append(line)
+            yield row
+
+    def acknowledge(self, ok):
+        """
+        Result of the next row sent.
+
+        :param ok: the row was written.
+        """
+        line = self._pending.popleft()
+
+        if self._stopped:
+            return
+
+        if not ok:
+            # The rows from this one are sent again by a resume
+            self._stopped = True
+            return
+
+        self.acknowledged_line = line
+        self.indexed += 1
+        self._since_save += 1
+
+        if self._since_save >= self._interval:
+            self.save(CheckpointTracker.RUNNING)
+
+    def save(self, state):
+        """
+        Save the checkpoint.
+
+        :param state: running, failed or completed.
+        """
+        self._since_save = 0
+        self._store.save({
+            "import_id": self.import_id,
+            "state": state,
+            "line": self.acknowledged_line,
+            "indexed": self.indexed,
+            "updated_at": time.time()
+        })
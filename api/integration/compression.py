@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import bz2
+import gzip
+import io
+
+from controller.custom.custom_api_error import UnsupportedCompressionError
+
+# Magic bytes of the compressed formats
+MAGIC_NUMBERS = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd')
+)
+
+MAGIC_SIZE = 4
+
+
+def detect_compression(head):
+    """
+    Detect the compression of a file from its first bytes.
+
+    :param head: first bytes of the file (at least 4, unless the file is shorter).
+    :return: 'gzip', 'bz2', 'zstd' or None (not compressed).
+    """
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+class PrefixedStream(io.RawIOBase):
+    """
+    Binary stream of the bytes already read (prefix) followed by the rest of a stream.
+    """
+
+    def __init__(self, prefix, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+
+        return len(data)
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Binary stream of an iterable of byte strings.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._chunk = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._chunk:
+            self._chunk = next(self._chunks, None)
+
+            if self._chunk is None:
+                self._chunk = b''
+                return 0
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+
+        return size
+
+
+def decompress(stream, compression):
+    """
+    Decompress a binary stream while it's read (nothing is written to disk).
+
+    :param stream: binary stream.
+    :param compression: 'gzip', 'bz2' or 'zstd'.
+    :return: binary stream of the uncompressed data.
+    """
+    if compression == 'gzip':
+        # No file name: the stream is not read as a regular file (see DataProcess._read_rows)
+        return gzip.GzipFile(filename='', fileobj=stream, mode='rb')
+
+    if compression == 'bz2':
+        return bz2.BZ2File(stream, mode='rb')
+
+    try:
+        import zstandard
+    except ImportError:
+        raise UnsupportedCompressionError()
+
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream))
+
+
+def open_text(stream, encoding='utf-8', newline=''):
+    """
+    Open a binary stream as text, decompressing it when it's compressed (gzip, bz2 or zstd, detected
+    from the magic bytes).
+
+    :param stream: binary stream (file, request stream).
+    :param encoding: file encoding.
+    :param newline: see io.TextIOWrapper (by default the line breaks are not translated).
+    :return: text stream (iterable of lines).
+    """
+    head = b''
+
+    while len(head) < MAGIC_SIZE:
+        data = stream.read(MAGIC_SIZE - len(head))
+
+        if not data:
+            break
+
+        head += data
+
+    binary = io.BufferedReader(PrefixedStream(head, stream))
+    compression = detect_compression(head)
+
+    if compression:
+        binary = decompress(binary, compression)
+
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
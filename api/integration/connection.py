@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import socket
+
+from elasticsearch import Elasticsearch, Urllib3HttpConnection
+from urllib3.connection import HTTPConnection
+
+from config.default import Config
+from integration.metrics import ELASTICSEARCH_SECONDS, BULK_BATCH_DOCUMENTS
+
+
+class KeepAliveHttpConnection(Urllib3HttpConnection):
+    """
+    HTTP connection to ElasticSearch with TCP keep-alive enabled on the pooled sockets,
+    so idle connections kept by the pool are not dropped silently by firewalls/load balancers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(KeepAliveHttpConnection, self).__init__(*args, **kwargs)
+        self.pool.conn_kw['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+
+
+class InstrumentedElasticsearch(Elasticsearch):
+    """
+    ElasticSearch client that measures the latency of each request (see integration.metrics).
+    """
+
+    def search(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('search'):
+            return super(InstrumentedElasticsearch, self).search(*args, **kwargs)
+
+    def msearch(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('msearch'):
+            return super(InstrumentedElasticsearch, self).msearch(*args, **kwargs)
+
+    def scroll(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('scroll'):
+            return super(InstrumentedElasticsearch, self).scroll(*args, **kwargs)
+
+    def count(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('count'):
+            return super(InstrumentedElasticsearch, self).count(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('get'):
+            return super(InstrumentedElasticsearch, self).get(*args, **kwargs)
+
+    def mget(self, *args, **kwargs):
+        with ELASTICSEARCH_SECONDS.time('mget'):
+            return super(InstrumentedElasticsearch, self).mget(*args, **kwargs)
+
+    def bulk(self, body, *args, **kwargs):
+        """
+        Bulk request (sent by the bulk helpers, one per chunk of actions).
+        The operation (bulk or update) is read from the first action of the chunk.
+        """
+        operation = 'bulk'
+        documents = 0
+
+        if isinstance(body, str):
+            operation = 'update' if body.startswith('{"update"') else 'bulk'
+            # Two lines per action (action and document)
+            documents = body.count('\n') // 2
+
+        BULK_BATCH_DOCUMENTS.observe(documents, operation)
+
+        with ELASTICSEARCH_SECONDS.time(operation):
+            return super(InstrumentedElasticsearch, self).bulk(body, *args, **kwargs)
+
+
+def create_elasticsearch_client():
+    """
+    Create the ElasticSearch client (and its connection pool) from the configuration.
+
+    The client is thread safe and should be created once per process.
+
+    :return: ElasticSearch client.
+    """
+    options = {
+        "maxsize": Config.ELASTICSEARCH_MAXSIZE,
+        "timeout": Config.ELASTICSEARCH_TIMEOUT,
+        "max_retries": Config.ELASTICSEARCH_MAX_RETRIES,
+        "retry_on_timeout": Config.ELASTICSEARCH_RETRY_ON_TIMEOUT,
+        # gzip request bodies (bulk) and accept gzip responses
+        "http_compress": Config.ELASTICSEARCH_HTTP_COMPRESS
+    }
+
+    if Config.ELASTICSEARCH_KEEP_ALIVE:
+        options['connection_class'] = KeepAliveHttpConnection
+
+    hosts = [{'host': Config.ELASTICSEARCH_HOST, 'port': Config.ELASTICSEARCH_PORT}]
+
+    return InstrumentedElasticsearch(hosts, **options)
+
+
+def create_async_elasticsearch_client():
+    """
+    Create the asyncio ElasticSearch client (elasticsearch-async package, optional: only needed by
+    the asyncio entry point, see run_async.py) from the configuration.
+
+    The client must be created and used in the same event loop. The client has no option to bound its
+    requests: AsyncElasticSearchBackend sends at most ELASTICSEARCH_MAXSIZE at the same time.
+
+    :return: asyncio ElasticSearch client.
+    """
+    from elasticsearch_async import AsyncElasticsearch
+
+    hosts = [{'host': Config.ELASTICSEARCH_HOST, 'port': int(Config.ELASTICSEARCH_PORT)}]
+
+    return AsyncElasticsearch(hosts,
+                              timeout=Config.ELASTICSEARCH_TIMEOUT,
+                              max_retries=Config.ELASTICSEARCH_MAX_RETRIES,
+                              retry_on_timeout=Config.ELASTICSEARCH_RETRY_ON_TIMEOUT)
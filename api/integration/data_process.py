@@ -1,11 +1,32 @@
 # -*- coding: utf-8 -*-
 
+import base64
 import hashlib
+import json
+import os
+import time
 
-from elasticsearch import Elasticsearch, helpers
+from collections import namedtuple
+from contextlib import contextmanager
 
 from config.default import Config
-from controller.custom.custom_api_error import ProcessFileError, InitialImportError, ConnectionElasticSearchError
+from controller.custom.custom_api_error import ProcessFileError, InitialImportError, InvalidCursorError, \
+    UnsupportedCompressionError, CheckpointNotFoundError, InvalidLookupError, InvalidSlicesError, \
+    InvalidLookupSizeError
+from integration.checkpoint import CheckpointStore, CheckpointTracker
+from integration.compression import detect_compression, open_text, MAGIC_SIZE
+from integration.deduplication import Deduplicator
+from integration.delta import ContentManifest, DeltaFilter, ManifestWriter
+from integration.elasticsearch_backend import ElasticSearchBackend
+from integration.metrics import INGEST_STAGE_SECONDS, ROWS_INGESTED, ROWS_REJECTED
+from integration import profiling
+from integration.parallel_reader import ParallelFileReader
+from integration.query_cache import QueryCache
+from integration.rejected_rows import RejectedRows
+from integration.sliced_reader import SlicedScrollReader
+from integration.storage_backend import create_storage_backend
+
+ColumnPlan = namedtuple('ColumnPlan', ['keys', 'key_indices', 'size', 'content_key', 'content_indices'])
 
 
 class DataProcess:
@@ -14,128 +35,722 @@ class DataProcess:
     update and retrieve data.
     """
 
-    def __init__(self):
+    RENAME_COLUMNS = {'addresszip': 'zip'}
+    KEY_COLUMNS = ('name', 'addresszip')
 
-        try:
-            self._elastic_search = Elasticsearch(
-                [{'host': Config.ELASTICSEARCH_HOST, 'port': Config.ELASTICSEARCH_PORT}])
-            self._document_type = Config.ELASTICSEARCH_DOCUMENT_TYPE
-            self._index = Config.ELASTICSEARCH_INDEX
-            self._elastic_search.indices.create(index=self._index, ignore=400)
-        except Exception as err:
-            raise ConnectionElasticSearchError()
+    def __init__(self, elastic_search=None, query_cache=None, backend=None):
+        """
+        The storage backend is shared by all requests (the instance is an application singleton,
+        see AppModule). No request is sent to the database here, the index is created by bootstrap.
+
+        :param elastic_search: ElasticSearch client (uses the ElasticSearch backend).
+        :param query_cache: Cache of query results (created from the configuration by default).
+        :param backend: Storage backend (created from the configuration by default).
+        """
+        if backend is None:
+            backend = ElasticSearchBackend(elastic_search) if elastic_search else create_storage_backend()
+
+        self._backend = backend
+        self._query_cache = query_cache or QueryCache()
+        self._parse_workers = Config.PARSE_WORKERS
+        self._parse_chunk_bytes = Config.PARSE_CHUNK_BYTES
+        self._sort_field = Config.ELASTICSEARCH_SORT_FIELD
+        self._page_size = Config.PAGE_SIZE
+        self._page_size_max = Config.PAGE_SIZE_MAX
+        self._delta_batch_size = Config.DELTA_BATCH_SIZE
+        self._dedupe_policy = Config.DEDUPE_POLICY
+        self._checkpoints = CheckpointStore()
+        self._lookup_max_items = Config.LOOKUP_MAX_ITEMS
+        self._lookup_size_max = Config.LOOKUP_SIZE_MAX
+        self._export_page_size = Config.EXPORT_PAGE_SIZE
+        self._scan_slices = Config.SCAN_SLICES
+        self._scan_slices_max = Config.SCAN_SLICES_MAX
+        self._lookup_mget_batch_size = Config.LOOKUP_MGET_BATCH_SIZE
+        self._lookup_msearch_batch_size = Config.LOOKUP_MSEARCH_BATCH_SIZE
+        self._manifest = ContentManifest(Config.DELTA_MANIFEST_PATH) if Config.DELTA_MODE == 'manifest' else None
+
+    def bootstrap(self):
+        """
+        Create the index in the database (see StorageBackend.bootstrap).
 
-    def retrieve(self, name, addresszip, scroll_id=None):
+        :return:
+        """
+        self._backend.bootstrap()
+
+    def retrieve(self, name, addresszip, scroll_id=None, cursor=None, size=None, scroll=False, fuzzy=False):
         """
         Retrieve objects from database.
 
+        Pages are read with search_after (no state is kept in the database). The scroll is used only
+        when it's explicitly requested (bulk exports).
+
+        With name and zip the object is read by id first (the id is the hash of name and zip): a realtime get,
+        without scoring. The query is searched when the object is not found, when fuzzy is requested
+        or for the next pages. The response says which path served it (id or search).
+
         :param name: Key for search in name field.
         :param addresszip: Key for search in zip field
-        :param scroll_id: Page (or scroll)
+        :param scroll_id: Next page of a scroll
+        :param cursor: Next page (cursor returned by the previous page)
+        :param size: Page size
+        :param scroll: Start a scroll
+        :param fuzzy: Search the query, even with name and zip
 
         :return: List of objects from the database
 
         """
-        return self._read_database(name, addresszip, scroll_id)
+        self.bootstrap()
+
+        if scroll or scroll_id:
+            return self._scroll_database(name, addresszip, scroll_id, size)
+
+        exact = self.is_exact(name, addresszip, cursor, fuzzy)
+
+        if not self._query_cache.enabled:
+            return self._read_database(name, addresszip, cursor, size, exact)
+
+        key = QueryCache.key(name, addresszip, cursor, size, exact)
+
+        with profiling.stage('cache'):
+            response = self._query_cache.get(key)
+
+        if response is None:
+            generation = self._query_cache.generation
+            response = self._read_database(name, addresszip, cursor, size, exact)
+            self._query_cache.set(key, response, generation)
+
+        return response
+
+    def export(self, name=None, addresszip=None, slices=None, ordered=False):
+        """
+        Read all the objects of a query (or all objects) for an export (see read_all).
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param slices: number of slices read in parallel (SCAN_SLICES by default, SCAN_SLICES_MAX at most).
+        :param ordered: sort the objects by id.
+        :return: generator of objects.
+        """
+        hits = self.read_all(name, addresszip, ['name', 'zip', 'website'], slices=slices, ordered=ordered)
+
+        return (self._format_response(hit) for hit in hits)
 
-    def restore(self, input_file_path):
+    def read_all(self, name=None, addresszip=None, fields=None, slices=None, ordered=False, on_progress=None):
+        """
+        Read all the objects of a query (or all objects), for exports, backups and reindexes.
+
+        The objects are read in pages of EXPORT_PAGE_SIZE, only a few pages are kept in memory. With more than one
+        slice (SCAN_SLICES, e.g. the number of shards, by default on ElasticSearch) the slices are read in parallel
+        (see SlicedScrollReader).
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param fields: fields of the objects (all by default).
+        :param slices: number of slices read in parallel (SCAN_SLICES by default on ElasticSearch, otherwise 1),
+                       from 1 to SCAN_SLICES_MAX (each slice may be read by a thread).
+        :param ordered: sort the objects by id (otherwise they are not sorted).
+        :param on_progress: function called with the progress of a slice (SliceProgress) after each page.
+        :return: generator of hits (_id and _source).
+        """
+        if slices is not None and not 1 <= slices <= self._scan_slices_max:
+            raise InvalidSlicesError()
+
+        self.bootstrap()
+        body = self._get_query_dsl(name, addresszip)
+        slices = slices or (self._scan_slices if self._backend.parallel_scan else 1)
+
+        if fields is None:
+            del body['_source']
+        else:
+            body['_source'] = fields
+
+        if slices == 1 and not ordered:
+            return self._backend.scan(body, self._export_page_size)
+
+        reader = SlicedScrollReader(self._backend, slices, page_size=self._export_page_size, on_progress=on_progress)
+
+        return reader.read(body, ordered)
+
+    def lookup(self, items, fuzzy=True, size=1):
+        """
+        Look up many objects at once, by name and zip (batch enrichment).
+
+        Items with name and zip are read by id (the id is the hash of name and zip, see _create_hash_line),
+        in batches (mget). The other items, and the items not found, are searched (match on name,
+        term on zip, like retrieve) in batches (msearch) when fuzzy is enabled.
+        The batches and the results are built by the public helpers (get_id_batches, set_exact_results,
+        get_search_batches, ...), shared with AsyncDataProcess.
+
+        :param items: list of dicts with name and zip (optional).
+        :param fuzzy: search the items not found by id.
+        :param size: maximum number of objects of each fuzzy match (LOOKUP_SIZE_MAX at most).
+        :return: results in the order of the items (match: exact, fuzzy, miss or error; data: objects) and
+                 the number of results by match.
+        """
+        queries = self.get_lookup_queries(items)
+        size = self.get_lookup_size(size)
+        results = [None] * len(queries)
+
+        self.bootstrap()
+
+        ids = self.get_lookup_ids(queries)
+
+        with profiling.stage('mget'):
+            for batch in self.get_id_batches(ids):
+                self.set_exact_results(ids, self._backend.get_many(batch, ['name', 'zip', 'website']), results)
+
+        if fuzzy:
+            with profiling.stage('msearch'):
+                missing = self.get_lookup_missing(queries, results)
+
+                for keys, bodies in self.get_search_batches(missing):
+                    self.set_fuzzy_results(keys, self._backend.search_many(bodies, size), missing, results)
+
+        return self.get_lookup_response(results)
+
+    def get_lookup_ids(self, queries):
+        """
+        Ids of the items with name and zip (the id is the hash of name and zip).
+
+        :param queries: list of (name, zip).
+        :return: dict of id -> indexes of the items (all the items with the same name and zip).
+        """
+        ids = {}
+
+        for index, (name, addresszip) in enumerate(queries):
+            if addresszip:
+                ids.setdefault(self._create_hash_line([name, addresszip]), []).append(index)
+
+        return ids
+
+    def get_id_batches(self, ids):
+        """
+        Batches of the ids read at once (mget, LOOKUP_MGET_BATCH_SIZE).
+
+        :param ids: dict of id -> indexes of the items (see get_lookup_ids).
+        :return: list of lists of ids.
+        """
+        document_ids = list(ids)
+
+        return [document_ids[start:start + self._lookup_mget_batch_size]
+                for start in range(0, len(document_ids), self._lookup_mget_batch_size)]
+
+    @staticmethod
+    def set_exact_results(ids, found, results):
+        """
+        :param ids: dict of id -> indexes of the items (see get_lookup_ids).
+        :param found: dict of id -> _source (see StorageBackend.get_many).
+        :param results: list of results, updated.
+        """
+        for document_id, source in found.items():
+            # The items with the same name and zip share the result (like set_fuzzy_results)
+            source['id'] = document_id
+            result = {"match": "exact", "data": [source]}
+
+            for index in ids[document_id]:
+                results[index] = result
+
+    @staticmethod
+    def get_lookup_missing(queries, results):
+        """
+        :param queries: list of (name, zip).
+        :param results: list of results (None: not found).
+        :return: dict of (name, zip) -> indexes of the items without result.
+        """
+        missing = {}
+
+        for index, result in enumerate(results):
+            if result is None:
+                missing.setdefault(queries[index], []).append(index)
+
+        return missing
+
+    def get_search_batches(self, missing):
+        """
+        Batches of the searches sent at once (msearch, LOOKUP_MSEARCH_BATCH_SIZE): one search for the items
+        with the same name and zip.
+
+        :param missing: dict of (name, zip) -> indexes of the items (see get_lookup_missing).
+        :return: list of (list of (name, zip), list of queries).
+        """
+        keys = list(missing)
+        batches = []
+
+        for start in range(0, len(keys), self._lookup_msearch_batch_size):
+            batch = keys[start:start + self._lookup_msearch_batch_size]
+            batches.append((batch, [self.get_search_dsl(name, addresszip) for name, addresszip in batch]))
+
+        return batches
+
+    def set_fuzzy_results(self, keys, responses, missing, results):
+        """
+        :param keys: list of (name, zip) searched.
+        :param responses: list of responses, in the order of the keys (see StorageBackend.search_many).
+        :param missing: dict of (name, zip) -> indexes of the items (see get_lookup_missing).
+        :param results: list of results, updated.
+        """
+        for key, response in zip(keys, responses):
+            if 'error' in response:
+                result = {"match": "error", "data": []}
+            elif response['hits']['hits']:
+                result = {"match": "fuzzy", "data": [self._format_response(hit) for hit in response['hits']['hits']]}
+            else:
+                continue
+
+            for index in missing[key]:
+                results[index] = result
+
+    @staticmethod
+    def get_lookup_response(results):
+        """
+        :param results: list of results (None: not found), updated.
+        :return: results and the number of results by match.
+        """
+        count = {"exact": 0, "fuzzy": 0, "miss": 0, "error": 0}
+
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = result = {"match": "miss", "data": []}
+
+            count[result['match']] += 1
+
+        return {"results": results, "count": count}
+
+    def get_lookup_size(self, size):
+        """
+        :param size: maximum number of objects of each fuzzy match (1 by default).
+        :return: size (LOOKUP_SIZE_MAX at most: the objects of all the items are in one response).
+        """
+        if size is not None and size > self._lookup_size_max:
+            raise InvalidLookupSizeError()
+
+        return size if size and size > 0 else 1
+
+    def get_lookup_queries(self, items):
+        """
+        Validate the items of a lookup.
+
+        :param items: list of dicts with name and zip (optional).
+        :return: list of (name, zip).
+        """
+        if not isinstance(items, list) or len(items) > self._lookup_max_items:
+            raise InvalidLookupError()
+
+        queries = []
+
+        for item in items:
+            name = item.get('name') if isinstance(item, dict) else None
+            addresszip = item.get('zip') if isinstance(item, dict) else None
+
+            if not isinstance(name, str) or not name.strip() or not isinstance(addresszip, (str, type(None))):
+                raise InvalidLookupError()
+
+            queries.append((name.strip(), (addresszip or '').strip() or None))
+
+        return queries
+
+    def restore(self, input_file, dedupe=None, import_id=None, resume=False):
         """
         Read a file, process and insert values into the database (initial load).
 
-        :param input_file_path: File path.
-        :return: Operation result.
+        The file is streamed: lines are parsed on demand and sent to the database in chunks,
+        so the memory used does not depend on the file size.
+
+        Rows with the same id (name and zip) are deduplicated before they are sent (see Deduplicator):
+        the first row wins (first), the last row wins (last) or the non-empty fields are merged (merge).
+        The rows sent again at the end (last and merge) are not counted as indexed.
+
+        With an import id, the line of the last acknowledged row is saved periodically (see CheckpointTracker).
+        If the import fails, the same file can be sent again with resume: the database is not required to be
+        empty and the rows up to the checkpoint are not sent again.
+
+        :param input_file: File path or iterable of lines (e.g. the upload stream).
+        :param dedupe: Policy of the duplicated rows: first, last, merge or none (DEDUPE_POLICY by default).
+        :param import_id: Import id (checkpoints are saved only with an id).
+        :param resume: Resume the import from its checkpoint.
+        :return: Operation result (message, indexed, failed, rejected and duplicated rows, checkpoint).
         """
-        is_header = True
-        headers = []
-        data_bulk = []
+        self.bootstrap()
+        checkpoint_tracker = None
+
+        if import_id:
+            checkpoint = self._checkpoints.load(import_id) if resume else None
+            checkpoint_tracker = CheckpointTracker(self._checkpoints, import_id, checkpoint)
+        elif resume:
+            raise CheckpointNotFoundError()
 
-        if self._count_database() > 0:
+        if not resume and self._count_database() > 0:
             raise InitialImportError()
 
+        start = time.perf_counter()
+        rejected = RejectedRows()
+        timings = {'read': 0.0, 'parse': 0.0}
+        manifest_writer = None
+        policy = dedupe or self._dedupe_policy
+        deduplicator = Deduplicator(policy) if policy != 'none' else None
+
+        if self._manifest is not None:
+            # Locked by this import until it ends (a new manifest, unless the import is resumed)
+            self._manifest.open(new=not resume)
+            manifest_writer = ManifestWriter(self._manifest)
+
+        # The checkpoint skips the rows already sent, before they are recorded in the manifest
+        trackers = [tracker for tracker in (checkpoint_tracker, manifest_writer) if tracker]
+        acknowledge = self._acknowledge_all(trackers) if trackers else None
+
         try:
-            # Read largest files
-            with open(input_file_path, 'r') as file_object:
-                for line in file_object:
-                    if is_header:
-                        headers = self._process_header(line)
-                        is_header = False
-                    else:
-                        data = self._process_line(line, headers)
+            with self._open_file(input_file) as file_object, self._backend.bulk_load():
+                if checkpoint_tracker:
+                    file_object = checkpoint_tracker.count_lines(file_object)
 
-                        if data:
-                            data_bulk.append(data)
+                rows = self._read_rows(file_object, rejected, timings)
 
-            self._insert_bulk_database(data_bulk)
+                if deduplicator:
+                    rows = deduplicator.unique_rows(rows)
 
+                indexed, failed = self._insert_bulk_database(self._track_all(rows, trackers), acknowledge)
+
+                if policy == 'last':
+                    # The last rows of the duplicated ids overwrite the first ones (not counted as indexed)
+                    deduplicator.resent, resent_failed = self._insert_bulk_database(
+                        self._track_all(deduplicator.tail(), trackers), acknowledge)
+                    failed += resent_failed
+                elif policy == 'merge':
+                    merged = self._update_bulk_database(self._track_all(deduplicator.tail(), trackers), acknowledge)
+                    deduplicator.resent = merged['updated']
+                    failed += merged['not_found'] + merged['failed']
         except Exception as err:
+            if checkpoint_tracker:
+                checkpoint_tracker.save(CheckpointTracker.FAILED)
+
+            if isinstance(err, UnsupportedCompressionError):
+                raise
+
             raise ProcessFileError()
+        finally:
+            self._query_cache.invalidate()
+
+            if deduplicator:
+                deduplicator.close()
 
-        return "File successfully processed."
+            if self._manifest is not None:
+                self._manifest.close()
 
-    def update(self, input_file_path):
+        self._record_ingest('restore', indexed, rejected, timings, time.perf_counter() - start)
+
+        result = {
+            "message": "File successfully processed.",
+            "indexed": indexed,
+            "failed": failed,
+            "rejected": rejected.to_dict()
+        }
+
+        if deduplicator:
+            result['duplicates'] = deduplicator.to_dict()
+
+        if checkpoint_tracker:
+            checkpoint_tracker.save(CheckpointTracker.COMPLETED)
+            result['checkpoint'] = {
+                "import_id": import_id,
+                "resumed_from_line": checkpoint_tracker.resumed_from,
+                "skipped": checkpoint_tracker.skipped
+            }
+
+        return result
+
+    @staticmethod
+    def _track_all(rows, trackers):
+        """
+        :param rows: iterable of rows.
+        :param trackers: trackers of the rows sent (see ManifestWriter, CheckpointTracker), in order.
+        :return: iterable of rows.
+        """
+        for tracker in trackers:
+            rows = tracker.track(rows)
+
+        return rows
+
+    @staticmethod
+    def _acknowledge_all(trackers):
+        """
+        :param trackers: trackers of the rows sent.
+        :return: function called with the result of each row sent.
+        """
+        def acknowledge(ok):
+            for tracker in trackers:
+                tracker.acknowledge(ok)
+
+        return acknowledge
+
+    def update(self, input_file, delta=False):
         """
         Read a file, process and insert values into the database (database update).
 
-        :param input_file_path: File path.
-        :return: Operation result.
+        Updates are grouped into bulk requests (see StorageBackend.update_documents).
+
+        In delta mode only the changed rows are written: the content hash of each row is compared with the
+        current one, looked up in batches in the database (DELTA_MODE=mget) or in the local manifest of the
+        imports (DELTA_MODE=manifest). The report splits the rows into new (not found, not written), changed,
+        unchanged and missing (objects not in the file).
+
+        :param input_file: File path or iterable of lines (e.g. the upload stream).
+        :param delta: Write only the changed rows.
+        :return: Operation result (message, updated, not found, failed and rejected rows, rows per second,
+                 delta report).
         """
-        is_header = True
-        headers = []
+        self.bootstrap()
+        start = time.perf_counter()
+        rejected = RejectedRows()
+        timings = {'read': 0.0, 'parse': 0.0}
+        manifest_writer = None
+        delta_filter = DeltaFilter(self._current_content_hashes, self._delta_batch_size) if delta else None
+
+        if self._manifest is not None:
+            self._manifest.open()
+            manifest_writer = ManifestWriter(self._manifest)
 
         try:
-            # Read largest files
-            with open(input_file_path, 'r') as file_object:
-                for line in file_object:
-                    if is_header:
-                        headers = self._process_header(line)
-                        is_header = False
-                    else:
-                        self._update_database(self._process_line(line, headers))
+            total = (len(self._manifest) if self._manifest is not None else self._count_database()) if delta else 0
+
+            with self._open_file(input_file) as file_object:
+                rows = self._read_rows(file_object, rejected, timings)
+
+                if delta_filter:
+                    rows = delta_filter.changed_rows(rows)
+
+                if manifest_writer:
+                    rows = manifest_writer.track(rows)
 
+                result = self._update_bulk_database(rows, manifest_writer and manifest_writer.acknowledge)
+        except UnsupportedCompressionError:
+            raise
         except Exception as err:
             raise ProcessFileError()
+        finally:
+            self._query_cache.invalidate()
+
+            if self._manifest is not None:
+                self._manifest.close()
+
+        elapsed = time.perf_counter() - start
+        rows = result['updated'] + result['not_found'] + result['failed']
+        self._record_ingest('update', result['updated'], rejected, timings, elapsed)
+
+        result['message'] = "File successfully processed."
+        result['rejected'] = rejected.to_dict()
+        result['rows_per_second'] = round(rows / elapsed, 2) if elapsed > 0 else float(rows)
+
+        if delta_filter:
+            result['delta'] = delta_filter.finish(total)
 
-        return "File successfully processed."
+        return result
 
-    def _process_header(self, line):
+    def _current_content_hashes(self, document_ids):
         """
-        Process de header read from CSV file.
+        Current content hash of objects (objects written before the content hash existed have an empty hash).
 
-        :param line: header line.
-        :return: values.
+        :param document_ids: list of ids.
+        :return: dict of id -> content hash (only the objects found).
         """
-        return [i.strip().lower() for i in line.split(';')]
+        if self._manifest is not None:
+            return self._manifest.get_many(document_ids)
+
+        documents = self._backend.get_many(document_ids, ['content_hash'])
+
+        return {document_id: source.get('content_hash', '') for document_id, source in documents.items()}
 
-    def _process_line(self, line, headers):
+    @staticmethod
+    def _record_ingest(operation, rows, rejected, timings, elapsed):
         """
-        Process a line read from CSV file.
+        Record the metrics of an import (rows and time by stage, see integration.metrics).
+        The database (bulk) time is the time not spent reading or parsing: the rows are consumed by the bulk.
 
-        :param line: line from CSV file.
-        :param headers: keys for result dict
-        :return: values (dict)
+        :param operation: 'restore' or 'update'.
+        :param rows: rows indexed or updated.
+        :param rejected: report of rejected rows.
+        :param timings: seconds spent reading and parsing lines.
+        :param elapsed: total seconds.
+        """
+        bulk = max(elapsed - timings['read'] - timings['parse'], 0.0)
+
+        ROWS_INGESTED.inc(rows, operation)
+        ROWS_REJECTED.inc(rejected.count, operation)
+        INGEST_STAGE_SECONDS.observe(timings['read'], operation, 'read')
+        INGEST_STAGE_SECONDS.observe(timings['parse'], operation, 'parse')
+        INGEST_STAGE_SECONDS.observe(bulk, operation, 'bulk')
+
+        profiling.record('read', timings['read'])
+        profiling.record('parse', timings['parse'])
+        profiling.record('bulk', bulk)
+
+    @contextmanager
+    def _open_file(self, input_file):
+        """
+        Open the input file. Compressed files (gzip, bz2, zstd) are decompressed while they are read.
+
+        :param input_file: File path or iterable of lines (used as is).
+        :return: iterable of lines.
+        """
+        if not isinstance(input_file, str):
+            yield input_file
+            return
+
+        with open(input_file, 'rb') as file_object:
+            compression = detect_compression(file_object.read(MAGIC_SIZE))
+
+        if compression is None:
+            with open(input_file, 'r', encoding='utf-8') as file_object:
+                yield file_object
+        else:
+            with open(input_file, 'rb') as file_object, open_text(file_object, newline=None) as text:
+                yield text
+
+    def _read_rows(self, file_object, rejected, timings=None):
+        """
+        Read the processed rows of a file. Regular files (a file object or an input with the name of an
+        uncompressed file, e.g. JobInput) are parsed by a pool of processes when more than one worker is
+        configured (the rows are the same, in the same order). Streams are parsed line by line.
+
+        :param file_object: iterable of lines (file, stream).
+        :param rejected: report of rejected rows.
+        :param timings: dict where the seconds spent reading and parsing are added (optional).
+        :return: generator of values (dict).
+        """
+        input_file_path = getattr(file_object, 'name', None)
+
+        if self._parse_workers > 1 and isinstance(input_file_path, str) and os.path.isfile(input_file_path):
+            rows = self._read_file_parallel(input_file_path, rejected, getattr(file_object, 'on_range', None))
+            return self._timed(rows, timings, 'parse') if timings is not None else rows
+
+        return self._read_lines(file_object, rejected, timings=timings)
+
+    @staticmethod
+    def _timed(iterable, timings, stage):
+        """
+        Yield the items of an iterable, adding the time spent producing them to timings[stage].
+
+        :param iterable: iterable.
+        :param timings: dict of seconds by stage.
+        :param stage: stage.
+        :return: generator of items.
+        """
+        clock = time.perf_counter
+        iterator = iter(iterable)
+        elapsed = 0.0
+
+        try:
+            while True:
+                start = clock()
+                item = next(iterator, None)
+                elapsed += clock() - start
+
+                if item is None:
+                    return
+
+                yield item
+        finally:
+            timings[stage] += elapsed
+
+    def _read_file_parallel(self, input_file_path, rejected, on_range=None):
+        """
+        Read the processed rows of a file, parsing newline aligned byte ranges in a pool of processes.
+
+        :param input_file_path: File path.
+        :param rejected: report of rejected rows.
+        :param on_range: function called with the bytes and the lines read after each range (optional).
+        :return: generator of values (dict).
+        """
+        with open(input_file_path, 'rb') as file_object:
+            header = file_object.readline()
+
+        reader = ParallelFileReader(self._parse_workers, self._parse_chunk_bytes)
+
+        return reader.read(input_file_path, self._process_header(header.decode('utf-8')), len(header), rejected,
+                           on_range)
+
+    def _read_lines(self, file_object, rejected, line_number=1, timings=None):
+        """
+        Read lines from a file and yield them processed (the header is skipped, invalid lines are rejected).
+
+        :param file_object: iterable of lines (file, stream).
+        :param rejected: report of rejected rows.
+        :param line_number: number of the first line (the header).
+        :param timings: dict where the seconds spent reading and parsing are added (optional).
+        :return: generator of values (dict).
+        """
+        lines = iter(file_object)
+        plan = self._process_header(next(lines, ''))
+        clock = time.perf_counter
+        read, parse = 0.0, 0.0
+
+        try:
+            start = clock()
+
+            for line_number, line in enumerate(lines, line_number + 1):
+                parsed = clock()
+                data = self._process_line(line, plan)
+                end = clock()
+                read += parsed - start
+                parse += end - parsed
+
+                if data:
+                    yield data
+                else:
+                    rejected.add(line_number, line, plan.size)
+
+                start = clock()
+        finally:
+            if timings is not None:
+                timings['read'] += read
+                timings['parse'] += parse
+
+    @staticmethod
+    def _process_header(line):
         """
-        fields = [i.strip() for i in line.split(';')]
+        Process de header read from CSV file, compiling the column plan used by _process_line.
 
-        if len(headers) == len(fields):
-            result = {}
-            keys = []
+        :param line: header line.
+        :return: column plan (target keys, indices of the key columns, number of columns and the columns
+                 of the content hash, sorted by key).
+        """
+        headers = [i.strip().lower() for i in line.split(';')]
+        keys = tuple(DataProcess.RENAME_COLUMNS.get(name, name) for name in headers)
+        content_indices = tuple(sorted(range(len(keys)), key=lambda item: keys[item]))
 
-            for item, field_name in enumerate(headers):
+        return ColumnPlan(
+            keys=keys,
+            key_indices=tuple(item for item, name in enumerate(headers) if name in DataProcess.KEY_COLUMNS),
+            size=len(headers),
+            content_key=';'.join(keys[item] for item in content_indices),
+            content_indices=content_indices
+        )
 
-                field_name_formatted = field_name.lower() if field_name.lower() != 'addresszip' else 'zip'
-                result[field_name_formatted] = fields[item]
+    @staticmethod
+    def _process_line(line, plan):
+        """
+        Process a line read from CSV file.
+
+        :param line: line from CSV file.
+        :param plan: column plan (see _process_header)
+        :return: values (dict) or None when the number of columns doesn't match the header
+        """
+        fields = line.split(';')
 
-                if field_name.lower() in ['name', 'addresszip']:
-                    keys.append(str(fields[item]))
+        if len(fields) != plan.size:
+            return None
 
-            result['website'] = result['website'] if result.get('website') else None
-            result['hash_object'] = self._create_hash_line(keys)
+        fields = [i.strip() for i in fields]
+        result = dict(zip(plan.keys, fields))
 
-            return result
+        result['website'] = result.get('website') or None
+        result['hash_object'] = DataProcess._create_hash_line([fields[item] for item in plan.key_indices])
+        result['content_hash'] = DataProcess._create_content_hash(plan.content_key,
+                                                                  [fields[item] for item in plan.content_indices])
 
-        return None
+        return result
 
-    def _create_hash_line(self, keys):
+    @staticmethod
+    def _create_hash_line(keys):
         """
         Create a hash code from the line data.
 
@@ -146,78 +761,229 @@ class DataProcess:
         hash = hashlib.sha256(''.join(keys).encode('utf-8'))
         return hash.hexdigest()
 
-    def _insert_bulk_database(self, data):
+    @staticmethod
+    def _create_content_hash(content_key, values):
+        """
+        Create a hash code of the content of a line (all columns, sorted by name).
+
+        :param content_key: names of the columns.
+        :param values: values of the columns.
+        :return: hash code.
+        """
+        content = content_key + '\n' + '\x1f'.join(values)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _insert_bulk_database(self, data, acknowledge=None):
         """
         Insert data bulk into the database.
 
-        :param data: data bulk.
-        :return:
+        :param data: iterable of objects (consumed lazily).
+        :param acknowledge: function called with the result (ok) of each object, in order (optional).
+        :return: number of indexed and failed objects.
         """
-        actions = [
-            {
-                "_index": self._index,
-                "_type": self._document_type,
-                "_source": item,
-                "_id": item['hash_object']
-            }
-            for item in data
-        ]
+        indexed, failed = 0, 0
+
+        for ok, item in self._backend.index_documents(data):
+            if acknowledge:
+                acknowledge(ok)
+
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
 
-        helpers.bulk(self._elastic_search, actions)
-        return
+        return indexed, failed
 
-    def _update_database(self, data):
+    def _update_bulk_database(self, data, acknowledge=None):
         """
-        Update an exists object into the database.
+        Update exists objects into the database (partial update, in bulk).
 
-        :param data: object data.
-        :return:
+        :param data: iterable of objects (consumed lazily).
+        :param acknowledge: function called with the result (ok) of each object, in order (optional).
+        :return: number of updated, not found and failed objects.
         """
-        try:
-            self._elastic_search.update(index=self._index,
-                                        doc_type=self._document_type,
-                                        id=data['hash_object'],
-                                        body={"doc": data})
-        except Exception as err:
-            pass
+        result = {"updated": 0, "not_found": 0, "failed": 0}
+
+        for ok, item in self._backend.update_documents(data):
+            if acknowledge:
+                acknowledge(ok)
 
-        return
+            if ok:
+                result['updated'] += 1
+            elif item.get('update', {}).get('status') == 404:
+                result['not_found'] += 1
+            else:
+                result['failed'] += 1
 
-    def _read_database(self, name, addresszip, scroll_id):
+        return result
+
+    def _read_database(self, name, addresszip, cursor, size, exact=False):
         """
-        Retrieve objects from database.
+        Retrieve objects from database (a page, with search_after).
 
         :param name: Key for search in name field.
         :param addresszip: Key for search in zip field
-        :param scroll_id: Page (or scroll)
+        :param cursor: Next page (cursor returned by the previous page)
+        :param size: Page size
+        :param exact: Read the object by id first (name and zip)
 
-        :return: List of objects from the database
+        :return: List of objects from the database and the cursor of the next page (None on the last page)
         """
+        if exact:
+            response = self._get_database(name, addresszip)
 
-        if not scroll_id:
-            result = self._elastic_search.search(index=self._index,
-                                                 doc_type=self._document_type,
-                                                 body=self._get_query_dsl(name, addresszip),
-                                                 **{"scroll": "1m", "size": 100})
-        else:
-            result = self._elastic_search.scroll(scroll='1m', scroll_id=scroll_id)
+            if response is not None:
+                return response
+
+        size = self.get_page_size(size)
+        body = self.get_search_dsl(name, addresszip, cursor)
+
+        with profiling.stage('query'):
+            result = self._backend.search(body, size)
+
+        with profiling.stage('format'):
+            response = self.format_page(result, size)
+
+        return response
+
+    def format_page(self, result, size):
+        """
+        Format a page of a search.
+
+        :param result: response of the search (hits, total).
+        :param size: Page size
 
-        response = {
-            "data": [self._format_response(result) for result in result['hits']['hits']],
+        :return: List of objects and the cursor of the next page (None on the last page)
+        """
+        hits = result['hits']['hits']
+
+        return {
+            "data": [self._format_response(hit) for hit in hits],
             "count": result['hits']['total'],
-            "scroll": result['_scroll_id']
+            "cursor": self._encode_cursor(hits[-1]['sort']) if hits and len(hits) == size else None,
+            "path": "search"
         }
 
+    def _get_database(self, name, addresszip):
+        """
+        Retrieve an object from database by id (exact name and zip).
+
+        :param name: name.
+        :param addresszip: zip.
+
+        :return: the object (same response of _read_database) or None when it's not found
+        """
+        document_id = self.get_document_id(name, addresszip)
+
+        with profiling.stage('get'):
+            hit = self._backend.get(document_id, ['name', 'zip', 'website'])
+
+        if hit is None:
+            return None
+
+        return self.format_object(hit)
+
+    @staticmethod
+    def get_document_id(name, addresszip):
+        """
+        Id of an object (the hash of name and zip, see _create_hash_line).
+
+        :param name: name.
+        :param addresszip: zip.
+        :return: id
+        """
+        return DataProcess._create_hash_line([name.strip(), addresszip.strip()])
+
+    def format_object(self, hit):
+        """
+        Format an object read by id (same response of format_page).
+
+        :param hit: object (_id and _source).
+        :return: the object
+        """
+        return {"data": [self._format_response(hit)], "count": 1, "cursor": None, "path": "id"}
+
+    def _scroll_database(self, name, addresszip, scroll_id, size):
+        """
+        Retrieve objects from database (with scroll).
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param scroll_id: Page (or scroll)
+        :param size: Page size
+
+        :return: List of objects from the database
+        """
+        with profiling.stage('query'):
+            result = self._backend.scroll(self._get_query_dsl(name, addresszip), self.get_page_size(size), scroll_id)
+
+        with profiling.stage('format'):
+            response = {
+                "data": [self._format_response(result) for result in result['hits']['hits']],
+                "count": result['hits']['total'],
+                "scroll": result['_scroll_id']
+            }
+
         return response
 
+    @staticmethod
+    def is_exact(name, addresszip, cursor, fuzzy):
+        """
+        Check if a query is read by id first (name and zip, first page, not fuzzy), see retrieve.
+
+        :return: boolean
+        """
+        return bool(name and name.strip() and addresszip and addresszip.strip() and not cursor and not fuzzy)
+
+    def get_page_size(self, size):
+        """
+        Page size (default and maximum from the configuration).
+
+        :param size: Page size requested
+        :return: Page size
+        """
+        return min(size, self._page_size_max) if size and size > 0 else self._page_size
+
+    @staticmethod
+    def _encode_cursor(sort_values):
+        """
+        Create an opaque cursor from the sort values of the last object of a page.
+
+        :param sort_values: sort values
+        :return: cursor
+        """
+        return base64.urlsafe_b64encode(json.dumps(sort_values).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        """
+        Read the sort values of a cursor.
+
+        :param cursor: cursor
+        :return: sort values (score and id, see get_search_dsl)
+        """
+        try:
+            sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except Exception as err:
+            raise InvalidCursorError()
+
+        if not isinstance(sort_values, list) or len(sort_values) != 2:
+            raise InvalidCursorError()
+
+        score, document_id = sort_values
+
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not isinstance(document_id, str):
+            raise InvalidCursorError()
+
+        return sort_values
+
     def _count_database(self):
         """
         Count objects in the database.
 
         :return: the number of objects.
         """
-        count = self._elastic_search.count(index=self._index, doc_type=self._document_type)
-        return count["count"]
+        return self._backend.count()
 
     def _get_query_dsl(self, name, addresszip):
         """
@@ -229,30 +995,47 @@ class DataProcess:
         :return: query
         """
         query_dsl = {"_source": ["name", "zip", "website"]}
-        must = []
+        query = {}
 
         if name:
-            must.append({"match": {"name": name}})
+            query['must'] = [{"match": {"name": name}}]
 
         if addresszip:
-            must.append({"match": {"zip": addresszip}})
+            # zip is a keyword: exact value in filter context (not scored, cacheable)
+            query['filter'] = [{"term": {"zip": addresszip.strip()}}]
 
-        if must:
+        if query:
             query_dsl['query'] = {
-                "bool": {
-                    "must": must
-                }
+                "bool": query
             }
 
         return query_dsl
 
+    def get_search_dsl(self, name, addresszip, cursor=None):
+        """
+        Create the query (DSL) of a page, sorted by score and id.
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param cursor: Next page (cursor returned by the previous page)
+
+        :return: query
+        """
+        body = self._get_query_dsl(name, addresszip)
+        body['sort'] = [{"_score": "desc"}, {self._sort_field: "asc"}]
+
+        if cursor:
+            body['search_after'] = self._decode_cursor(cursor)
+
+        return body
+
     def _format_response(self, data):
         """
-        Format response.
+        Format response (the _source of the hit, with the id: the hits are read once, they are not copied).
 
-        :param data: list of objects
-        :return: list of objects formatted.
+        :param data: hit (_id and _source)
+        :return: object formatted.
         """
         response_formatted = data['_source']
-        response_formatted.update({'id': data['_id']})
+        response_formatted['id'] = data['_id']
         return response_formatted
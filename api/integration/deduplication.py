@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+import json
+import math
+import os
+import sqlite3
+import tempfile
+
+from config.default import Config
+
+POLICIES = ('first', 'last', 'merge', 'none')
+
+
+class BloomFilter:
+    """
+    Bloom filter of hash codes (hex SHA256): the bit positions are read from the hash code itself.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = min(max(int(round(self.size / capacity * math.log(2))), 1), 8)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, hash_code):
+        return [int(hash_code[item * 8:item * 8 + 8], 16) % self.size for item in range(self.hashes)]
+
+    def __contains__(self, hash_code):
+        return all(self._bits[position >> 3] & 1 << (position & 7) for position in self._positions(hash_code))
+
+    def add(self, hash_code):
+        """
+        :param hash_code: hash code.
+        :return: the hash code was (probably) already added.
+        """
+        found = True
+
+        for position in self._positions(hash_code):
+            mask = 1 << (position & 7)
+
+            if not self._bits[position >> 3] & mask:
+                found = False
+                self._bits[position >> 3] |= mask
+
+        return found
+
+
+class TemporaryTable:
+    """
+    Table of a temporary sqlite database (on disk), created on the first use and removed by close.
+
+    The rows are read by the threads of the bulk helpers (parallel_bulk) and the table is closed by the request
+    thread: the connection is not bound to a thread (the access is sequential).
+    """
+
+    def __init__(self, schema, directory=None):
+        self._schema = schema
+        self._directory = directory or tempfile.gettempdir()
+        self._connection = None
+        self._path = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            file_descriptor, self._path = tempfile.mkstemp(dir=self._directory, suffix='.dedupe.db')
+            os.close(file_descriptor)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode = OFF')
+            self._connection.execute('PRAGMA synchronous = OFF')
+            self._connection.execute(self._schema)
+
+        return self._connection
+
+    def close(self):
+        """
+        Remove the temporary database.
+        """
+        try:
+            if self._connection is not None:
+                self._connection.close()
+        finally:
+            self._connection = None
+
+            if self._path is not None:
+                os.remove(self._path)
+                self._path = None
+
+
+class SeenIds:
+    """
+    Memory bounded set of ids: an exact set up to a limit, then a Bloom filter whose positives are checked
+    in a temporary table (sqlite, on disk).
+
+    The filter is allocated once the exact limit is passed: about 1.2 bytes per id of capacity at 1% of false
+    positives (DEDUPE_BLOOM_CAPACITY of 10M: 12 MB). Over its capacity the false positives grow: the result is
+    still exact (each positive is checked in the table) but more ids are looked up on disk.
+    """
+
+    def __init__(self, exact_limit=None, capacity=None, error_rate=None, directory=None):
+        self._exact_limit = exact_limit if exact_limit is not None else Config.DEDUPE_EXACT_LIMIT
+        self._capacity = capacity or Config.DEDUPE_BLOOM_CAPACITY
+        self._error_rate = error_rate or Config.DEDUPE_BLOOM_ERROR_RATE
+        self._exact = set()
+        self._bloom = None
+        self._table = TemporaryTable('CREATE TABLE seen (id TEXT PRIMARY KEY) WITHOUT ROWID', directory)
+        self.checks = 0
+
+    def add(self, document_id):
+        """
+        Add an id.
+
+        :param document_id: id (hex SHA256).
+        :return: the id was already added.
+        """
+        if document_id in self._exact:
+            return True
+
+        if len(self._exact) < self._exact_limit:
+            self._exact.add(document_id)
+            return False
+
+        if self._bloom is None:
+            self._bloom = BloomFilter(self._capacity, self._error_rate)
+
+        connection = self._table.connection
+
+        if not self._bloom.add(document_id):
+            connection.execute('INSERT INTO seen VALUES (?)', (document_id,))
+            return False
+
+        # Probably seen: second check
+        self.checks += 1
+
+        if connection.execute('SELECT 1 FROM seen WHERE id = ?', (document_id,)).fetchone():
+            return True
+
+        connection.execute('INSERT INTO seen VALUES (?)', (document_id,))
+        return False
+
+    def close(self):
+        """
+        Remove the temporary table.
+        """
+        self._table.close()
+
+
+class PendingRows:
+    """
+    Rows by id: in memory up to a limit, then in a temporary table (sqlite, on disk).
+    """
+
+    def __init__(self, memory_limit=None, directory=None):
+        self._memory_limit = memory_limit if memory_limit is not None else Config.DEDUPE_PENDING_LIMIT
+        self._rows = {}
+        self._table = TemporaryTable('CREATE TABLE pending (id TEXT PRIMARY KEY, row TEXT) WITHOUT ROWID',
+                                     directory)
+        self._spilled = False
+
+    def get(self, document_id):
+        """
+        :param document_id: id.
+        :return: row or None.
+        """
+        row = self._rows.get(document_id)
+
+        if row is None and self._spilled:
+            found = self._table.connection.execute('SELECT row FROM pending WHERE id = ?',
+                                                   (document_id,)).fetchone()
+            row = json.loads(found[0]) if found else None
+
+        return row
+
+    def set(self, document_id, row):
+        """
+        :param document_id: id.
+        :param row: row (replaces the row of the id).
+        """
+        if document_id in self._rows or len(self._rows) < self._memory_limit:
+            self._rows[document_id] = row
+            return
+
+        self._spilled = True
+        self._table.connection.execute('INSERT OR REPLACE INTO pending VALUES (?, ?)',
+                                       (document_id, json.dumps(row)))
+
+    def pop_all(self):
+        """
+        :return: generator of the rows (the rows are removed).
+        """
+        while self._rows:
+            yield self._rows.popitem()[1]
+
+        if self._spilled:
+            cursor = self._table.connection.execute('SELECT row FROM pending')
+
+            for (row,) in iter(cursor.fetchone, None):
+                yield json.loads(row)
+
+            self._table.close()
+            self._spilled = False
+
+    def close(self):
+        self._table.close()
+
+
+class Deduplicator:
+    """
+    Remove the rows of a file with the same id (hash_object) before they are sent to the database.
+
+    - first: the first row wins, the others are skipped;
+    - last: the last row wins. The first row is sent when it's read (a later duplicate is not known yet), the last
+      row of each duplicated id is sent again at the end (see tail). It doesn't reduce the rows sent for an id
+      read twice (two writes, like none), only for the ids read three times or more (two writes at most);
+    - merge: the non-empty fields of the duplicates are merged over the first row: they are sent at the end,
+      as a partial update.
+
+    Only the rows of the duplicated ids are kept (last and merge), in memory up to DEDUPE_PENDING_LIMIT ids and
+    then on disk. The duplicated ids are counted with a second SeenIds (bounded as well).
+    """
+
+    def __init__(self, policy, seen=None, duplicated=None, pending=None):
+        self.policy = policy
+        self._seen = seen or SeenIds()
+        self._duplicated = duplicated or SeenIds()
+        self._pending = pending or PendingRows()
+        self.duplicates = 0
+        self.ids = 0
+        self.resent = 0
+
+    def unique_rows(self, rows):
+        """
+        :param rows: iterable of rows.
+        :return: generator of the first row of each id.
+        """
+        for row in rows:
+            document_id = row['hash_object']
+
+            if not self._seen.add(document_id):
+                yield row
+                continue
+
+            self.duplicates += 1
+
+            if not self._duplicated.add(document_id):
+                self.ids += 1
+
+            if self.policy == 'last':
+                self._pending.set(document_id, row)
+            elif self.policy == 'merge':
+                merged = self._pending.get(document_id) or {'hash_object': document_id}
+                merged.update((key, value) for key, value in row.items() if value)
+                # The content of the merged object is unknown (compared as changed by a delta update)
+                merged['content_hash'] = ''
+                self._pending.set(document_id, merged)
+
+    def tail(self):
+        """
+        Rows sent at the end (last: the rows to index again, merge: the partial updates). The rows written are
+        counted as resent by the caller.
+
+        :return: generator of rows.
+        """
+        return self._pending.pop_all()
+
+    def close(self):
+        try:
+            self._seen.close()
+            self._duplicated.close()
+        finally:
+            self._pending.close()
+
+    def to_dict(self):
+        """
+        :return: policy, number of duplicated rows, of duplicated ids and of rows written again at the end.
+        """
+        return {
+            "policy": self.policy,
+            "rows": self.duplicates,
+            "ids": self.ids,
+            "resent": self.resent
+        }
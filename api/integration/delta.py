@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+import dbm
+import fcntl
+import threading
+
+from collections import deque
+from itertools import islice
+
+from controller.custom.custom_api_error import ManifestLockedError
+
+
+class ContentManifest:
+    """
+    Content hash of each object written by the imports (hash_object -> content_hash), persisted in a dbm file.
+    It's local to the host: use it only when the imports of the index are executed by this host.
+
+    The file is open only during an import (see open), by a single writer: the workers and the processes of the
+    host take an exclusive lock (path.lock) and an import started while another one holds it fails
+    (ManifestLockedError). dbm.dumb, the fallback of dbm, keeps its index in memory while the file is open.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._lock_file = None
+
+    def open(self, new=False):
+        """
+        Lock and open the manifest.
+
+        :param new: remove all objects (the database is loaded again, see DataProcess.restore).
+        """
+        lock_file = open(self._path + '.lock', 'a')
+
+        try:
+            # Not blocking: the lock is held for a whole import
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise ManifestLockedError()
+
+        try:
+            db = dbm.open(self._path, 'n' if new else 'c')
+        except Exception:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            raise
+
+        with self._lock:
+            self._db = db
+            self._lock_file = lock_file
+
+    def __len__(self):
+        with self._lock:
+            return len(self._db)
+
+    def get_many(self, document_ids):
+        """
+        :param document_ids: list of ids.
+        :return: dict of id -> content hash (only the ids in the manifest).
+        """
+        with self._lock:
+            found = {}
+
+            for document_id in document_ids:
+                content_hash = self._db.get(document_id.encode('ascii'))
+
+                if content_hash is not None:
+                    found[document_id] = content_hash.decode('ascii')
+
+            return found
+
+    def set(self, document_id, content_hash):
+        with self._lock:
+            self._db[document_id.encode('ascii')] = content_hash.encode('ascii')
+
+    def close(self):
+        """
+        Write, close and unlock the manifest.
+        """
+        with self._lock:
+            if self._db is None:
+                return
+
+            try:
+                self._db.close()
+            finally:
+                self._db = None
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+
+
+class ManifestWriter:
+    """
+    Record in the manifest the objects written to the database: the rows sent to the bulk are paired
+    with the bulk results, that are returned in the same order.
+    """
+
+    def __init__(self, manifest):
+        self._manifest = manifest
+        self._pending = deque()
+
+    def track(self, rows):
+        """
+        :param rows: iterable of rows (sent to the bulk).
+        :return: generator of rows.
+        """
+        for row in rows:
+            self._pending.append((row['hash_object'], row['content_hash']))
+            yield row
+
+    def acknowledge(self, ok):
+        """
+        Result of the next row sent.
+
+        :param ok: the row was written.
+        """
+        document_id, content_hash = self._pending.popleft()
+
+        if ok:
+            self._manifest.set(document_id, content_hash)
+
+
+class DeltaFilter:
+    """
+    Skip the rows whose content has not changed, comparing their content hash with the current one
+    (looked up in batches). Rows not found are new: they are not sent (an update doesn't insert objects).
+    """
+
+    def __init__(self, lookup, batch_size):
+        """
+        :param lookup: function of a list of ids -> dict of id -> current content hash ('' when unknown).
+        :param batch_size: number of rows looked up at once.
+        """
+        self._lookup = lookup
+        self._batch_size = batch_size
+        self.report = {"new": 0, "changed": 0, "unchanged": 0, "missing": 0}
+
+    def changed_rows(self, rows):
+        """
+        :param rows: iterable of rows.
+        :return: generator of the changed rows.
+        """
+        rows = iter(rows)
+
+        while True:
+            batch = list(islice(rows, self._batch_size))
+
+            if not batch:
+                return
+
+            current = self._lookup([row['hash_object'] for row in batch])
+
+            for row in batch:
+                content_hash = current.get(row['hash_object'])
+
+                if content_hash is None:
+                    self.report['new'] += 1
+                elif content_hash == row['content_hash']:
+                    self.report['unchanged'] += 1
+                else:
+                    self.report['changed'] += 1
+                    yield row
+
+    def finish(self, total):
+        """
+        Count the objects missing from the file.
+
+        :param total: number of objects before the import.
+        :return: report (new, changed, unchanged and missing rows).
+        """
+        self.report['missing'] = max(total - self.report['changed'] - self.report['unchanged'], 0)
+        return self.report
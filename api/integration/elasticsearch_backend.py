@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+from elasticsearch import helpers
+
+from config.default import Config
+from controller.custom.custom_api_error import ConnectionElasticSearchError
+from integration.connection import create_elasticsearch_client
+from integration.index_definition import get_index_definition, get_bulk_load_settings, get_serving_settings
+from integration.storage_backend import StorageBackend
+
+
+class ElasticSearchBackend(StorageBackend):
+    """
+    Objects stored in an ElasticSearch index.
+    """
+
+    parallel_scan = True
+
+    def __init__(self, elastic_search=None):
+        """
+        The ElasticSearch client is shared by all requests (the instance is an application singleton,
+        see AppModule). No request is sent to ElasticSearch here, the index is created by bootstrap.
+
+        :param elastic_search: ElasticSearch client (created from the configuration by default).
+        """
+        try:
+            self._elastic_search = elastic_search or create_elasticsearch_client()
+        except Exception as err:
+            raise ConnectionElasticSearchError()
+
+        self._document_type = Config.ELASTICSEARCH_DOCUMENT_TYPE
+        self._index = Config.ELASTICSEARCH_INDEX
+        self._sort_field = Config.ELASTICSEARCH_SORT_FIELD
+        self._bulk_chunk_size = Config.ELASTICSEARCH_BULK_CHUNK_SIZE
+        self._bulk_max_chunk_bytes = Config.ELASTICSEARCH_BULK_MAX_CHUNK_BYTES
+        self._bulk_thread_count = Config.ELASTICSEARCH_BULK_THREAD_COUNT
+        self._bulk_queue_size = Config.ELASTICSEARCH_BULK_QUEUE_SIZE
+        self._bulk_load_settings_enabled = Config.ELASTICSEARCH_BULK_LOAD_SETTINGS
+        self._index_ready = False
+
+    def bootstrap(self):
+        """
+        Create the index in the database. Only the first successful call sends a request.
+
+        :return:
+        """
+        if self._index_ready:
+            return
+
+        try:
+            self._elastic_search.indices.create(index=self._index,
+                                                body=get_index_definition(self._document_type),
+                                                ignore=400)
+        except Exception as err:
+            raise ConnectionElasticSearchError()
+
+        self._index_ready = True
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Switch the index to bulk load settings (no refresh, no replicas) while the block runs.
+        Then restore the settings of the index definition and refresh the index.
+
+        The settings restored are not read from the index: after a failed import (e.g. ElasticSearch was down)
+        the index may still have the bulk load settings, they would be kept by the resumed import.
+
+        :return:
+        """
+        if not self._bulk_load_settings_enabled:
+            yield
+            return
+
+        self._elastic_search.indices.put_settings(index=self._index, body={"index": get_bulk_load_settings()})
+
+        try:
+            yield
+        finally:
+            self._elastic_search.indices.put_settings(index=self._index, body={"index": get_serving_settings()})
+            self._elastic_search.indices.refresh(index=self._index)
+
+    def count(self):
+        count = self._elastic_search.count(index=self._index, doc_type=self._document_type)
+        return count["count"]
+
+    def get(self, document_id, fields=None):
+        options = {"_source": fields} if fields is not None else {}
+        result = self._elastic_search.get(index=self._index, doc_type=self._document_type, id=document_id,
+                                          ignore=404, **options)
+
+        return result if result.get('found') else None
+
+    def get_many(self, document_ids, fields=None):
+        if not document_ids:
+            return {}
+
+        options = {"_source": fields} if fields is not None else {}
+        result = self._elastic_search.mget(body={"ids": document_ids}, index=self._index,
+                                           doc_type=self._document_type, **options)
+
+        return {document['_id']: document.get('_source', {}) for document in result['docs'] if document.get('found')}
+
+    def search(self, body, size):
+        return self._elastic_search.search(index=self._index,
+                                           doc_type=self._document_type,
+                                           body=body,
+                                           size=size)
+
+    def search_many(self, bodies, size):
+        if not bodies:
+            return []
+
+        lines = []
+
+        for body in bodies:
+            # The index is in the URL: empty header
+            lines.append({})
+            lines.append(dict(body, size=size))
+
+        result = self._elastic_search.msearch(body=lines, index=self._index, doc_type=self._document_type)
+
+        return result['responses']
+
+    def scroll(self, body, size, scroll_id=None):
+        if scroll_id:
+            return self._elastic_search.scroll(scroll='1m', scroll_id=scroll_id)
+
+        return self._elastic_search.search(index=self._index,
+                                           doc_type=self._document_type,
+                                           body=body,
+                                           **{"scroll": "1m", "size": size})
+
+    def scan(self, body, size):
+        # Sorted by _doc (the cheapest scroll), the scroll is cleared at the end
+        return helpers.scan(self._elastic_search, query=body, index=self._index, doc_type=self._document_type,
+                            size=size, scroll='1m', clear_scroll=True)
+
+    def scan_slice(self, body, size, slice_id, max_slices, ordered=False):
+        body = dict(body)
+
+        if max_slices > 1:
+            body['slice'] = {"id": slice_id, "max": max_slices}
+
+        if ordered:
+            # hash_object (the sort field of the pages, e.g. hash_object.keyword on a dynamic mapping) is the id
+            body['sort'] = [{self._sort_field: "asc"}]
+
+        return helpers.scan(self._elastic_search, query=body, index=self._index, doc_type=self._document_type,
+                            size=size, scroll='1m', clear_scroll=True, preserve_order=ordered)
+
+    def index_documents(self, documents):
+        actions = (
+            {
+                "_index": self._index,
+                "_type": self._document_type,
+                "_source": item,
+                "_id": item['hash_object']
+            }
+            for item in documents
+        )
+
+        return self._execute_bulk(actions)
+
+    def update_documents(self, documents):
+        actions = (
+            {
+                "_op_type": "update",
+                "_index": self._index,
+                "_type": self._document_type,
+                "_id": item['hash_object'],
+                "doc": item
+            }
+            for item in documents
+        )
+
+        return self._execute_bulk(actions)
+
+    def _execute_bulk(self, actions):
+        """
+        Send actions to the database in chunks (by number of documents and by bytes).
+
+        When more than one thread is configured, chunks are sent concurrently. Results are
+        yielded in the same order of the actions.
+
+        :param actions: iterable of bulk actions.
+        :return: generator of (ok, item) for each action.
+        """
+        options = {
+            "chunk_size": self._bulk_chunk_size,
+            "max_chunk_bytes": self._bulk_max_chunk_bytes,
+            "raise_on_error": False
+        }
+
+        if self._bulk_thread_count > 1:
+            return helpers.parallel_bulk(self._elastic_search, actions,
+                                         thread_count=self._bulk_thread_count,
+                                         queue_size=self._bulk_queue_size,
+                                         **options)
+
+        return helpers.streaming_bulk(self._elastic_search, actions, **options)
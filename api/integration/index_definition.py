@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from config.default import Config
+
+
+def get_index_definition(document_type):
+    """
+    Settings and mappings of the index.
+
+    - name: full text, analysed for company names (case and accents are ignored);
+    - zip: exact value (filter context, no scoring);
+    - website, hash_object and content_hash: stored only (hash_object keeps doc values, it's the sort tiebreaker).
+
+    :param document_type: document type.
+    :return: index definition (body of the create index request).
+    """
+    return {
+        "settings": {
+            "number_of_shards": Config.ELASTICSEARCH_NUMBER_OF_SHARDS,
+            "number_of_replicas": Config.ELASTICSEARCH_NUMBER_OF_REPLICAS,
+            "analysis": {
+                "analyzer": {
+                    "company_name": {
+                        "type": "custom",
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "asciifolding"]
+                    }
+                }
+            }
+        },
+        "mappings": {
+            document_type: {
+                "properties": {
+                    "name": {"type": "text", "analyzer": "company_name"},
+                    "zip": {"type": "keyword"},
+                    "website": {"type": "keyword", "index": False},
+                    "hash_object": {"type": "keyword", "index": False},
+                    "content_hash": {"type": "keyword", "index": False, "doc_values": False}
+                }
+            }
+        }
+    }
+
+
+def get_serving_settings():
+    """
+    Index settings restored after the initial load: the ones of the index definition (the refresh interval is
+    not set, it's reset to the default).
+
+    :return: index settings.
+    """
+    return {"refresh_interval": None, "number_of_replicas": Config.ELASTICSEARCH_NUMBER_OF_REPLICAS}
+
+
+def get_bulk_load_settings():
+    """
+    Index settings used while the initial load runs (no refresh, no replicas).
+
+    :return: index settings.
+    """
+    return {"refresh_interval": "-1", "number_of_replicas": 0}
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config.default import Config
+from controller.custom.custom_api_error import JobNotFoundError, JobQueueFullError, custom_errors
+from integration.compression import ChunkStream, detect_compression, open_text, MAGIC_SIZE
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class Job:
+    """
+    Ingestion job (restore or update of a file) executed in background.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, operation, input_file_path, options=None):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.options = options or {}
+        self.state = Job.PENDING
+        self.input_file_path = input_file_path
+        self.total_bytes = os.path.getsize(input_file_path)
+        self.bytes_read = 0
+        self.lines = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state in (Job.SUCCEEDED, Job.FAILED, Job.CANCELLED)
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Request the cancellation of the job (checked before each line, or each range parsed in parallel, is read).
+        """
+        self._cancel_event.set()
+
+    def input(self):
+        """
+        :return: input of the operation (see JobInput).
+        """
+        return JobInput(self)
+
+    def read_range(self, bytes_read, lines):
+        """
+        Progress of an input parsed in parallel (see ParallelFileReader), checking the cancellation.
+
+        :param bytes_read: bytes read (up to the end of the last range).
+        :param lines: lines read (header included).
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelledError()
+
+        self.bytes_read = bytes_read
+        self.lines = lines
+
+    def read_lines(self, encoding='utf-8'):
+        """
+        Read the lines of the input file (decompressed when it's compressed), updating the job progress.
+
+        :param encoding: file encoding.
+        :return: generator of lines.
+        """
+        with open(self.input_file_path, 'rb') as file_object:
+            for line in open_text(ChunkStream(self._read_chunks(file_object)), encoding):
+                if self._cancel_event.is_set():
+                    raise JobCancelledError()
+
+                self.lines += 1
+
+                yield line
+
+    def _read_chunks(self, file_object, size=65536):
+        """
+        Read the input file (bytes as stored, compressed or not), counting the bytes read.
+        """
+        for chunk in iter(lambda: file_object.read(size), b''):
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def to_dict(self):
+        """
+        Job status.
+
+        :return: dict with state, progress and result.
+        """
+        now = self.finished_at or time.time()
+        elapsed = now - self.started_at if self.started_at else 0
+        rows = max(self.lines - 1, 0)
+        eta = None
+
+        if self.state == Job.RUNNING and elapsed > 0 and self.bytes_read > 0:
+            eta = round((self.total_bytes - self.bytes_read) / (self.bytes_read / elapsed), 2)
+
+        return {
+            "id": self.id,
+            "operation": self.operation,
+            "options": self.options,
+            "state": self.state,
+            "rows": rows,
+            "rows_per_second": round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "eta_seconds": eta,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobInput:
+    """
+    Input of a job: the lines of the input file (see Job.read_lines). An uncompressed file is also named, so it can
+    be parsed in parallel by byte ranges (PARSE_WORKERS, see DataProcess._read_rows): the progress and the
+    cancellation are then checked after each range (see Job.read_range).
+    """
+
+    def __init__(self, job):
+        self._job = job
+
+        with open(job.input_file_path, 'rb') as file_object:
+            compressed = detect_compression(file_object.read(MAGIC_SIZE)) is not None
+
+        self.name = None if compressed else job.input_file_path
+
+    def __iter__(self):
+        return self._job.read_lines()
+
+    def on_range(self, bytes_read, lines):
+        self._job.read_range(bytes_read, lines)
+
+
+class JobManager:
+    """
+    Execute ingestion jobs in a bounded pool of background workers and keep their status.
+    Finished jobs are kept for the retention time.
+    """
+
+    OPERATIONS = ('restore', 'update')
+
+    def __init__(self, data_process, workers=None, max_pending=None, retention_seconds=None):
+        self._data_process = data_process
+        self._max_pending = max_pending if max_pending is not None else Config.JOB_MAX_PENDING
+        self._retention_seconds = retention_seconds if retention_seconds is not None else Config.JOB_RETENTION_SECONDS
+        self._executor = ThreadPoolExecutor(max_workers=workers or Config.JOB_WORKERS)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_capacity(self):
+        """
+        Check that a job can be submitted (before its input file is saved).
+        """
+        with self._lock:
+            self._purge()
+
+            if self.count(Job.PENDING) >= self._max_pending:
+                raise JobQueueFullError()
+
+    def submit(self, operation, input_file_path, **options):
+        """
+        Submit a job. The input file is removed when the job finishes.
+
+        :param operation: 'restore' or 'update'.
+        :param input_file_path: File path.
+        :param options: options of the operation (e.g. delta).
+        :return: job.
+        """
+        if operation not in JobManager.OPERATIONS:
+            raise ValueError(operation)
+
+        with self._lock:
+            self._purge()
+
+            if self.count(Job.PENDING) >= self._max_pending:
+                os.remove(input_file_path)
+                raise JobQueueFullError()
+
+            job = Job(operation, input_file_path, options)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+
+        return job
+
+    def get(self, job_id):
+        """
+        Get a job.
+
+        :param job_id: job id.
+        :return: job.
+        """
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+
+        if not job:
+            raise JobNotFoundError()
+
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Pending jobs are not executed, running jobs stop on the next line (or range) read.
+
+        :param job_id: job id.
+        :return: job.
+        """
+        job = self.get(job_id)
+
+        if job.finished:
+            return job
+
+        job.cancel()
+
+        if job.future.cancel():
+            self._finish(job, Job.CANCELLED)
+            os.remove(job.input_file_path)
+
+        return job
+
+    def count(self, state):
+        """
+        Count jobs by state.
+
+        :param state: job state.
+        :return: number of jobs.
+        """
+        return sum(1 for job in list(self._jobs.values()) if job.state == state)
+
+    def _run(self, job):
+        """
+        Execute a job (in a worker).
+
+        :param job: job.
+        """
+        job.state = Job.RUNNING
+        job.started_at = time.time()
+
+        try:
+            job.result = getattr(self._data_process, job.operation)(job.input(), **job.options)
+            self._finish(job, Job.SUCCEEDED)
+        except Exception as err:
+            if job.cancel_requested:
+                self._finish(job, Job.CANCELLED)
+            else:
+                job.error = custom_errors.get(type(err).__name__, {}).get('message', str(err))
+                self._finish(job, Job.FAILED)
+        finally:
+            os.remove(job.input_file_path)
+
+    def _finish(self, job, state):
+        job.finished_at = time.time()
+        job.state = state
+
+    def _purge(self):
+        """
+        Remove finished jobs older than the retention time.
+        """
+        limit = time.time() - self._retention_seconds
+
+        for job_id in [job.id for job in self._jobs.values() if job.finished and job.finished_at < limit]:
+            del self._jobs[job_id]
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import heapq
+import json
+import math
+import re
+import threading
+import unicodedata
+
+from collections import Counter, defaultdict
+
+from integration.storage_backend import StorageBackend
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def analyze(text):
+    """
+    Split a name into terms, like the company_name analyzer (see index_definition):
+    lower case, without accents.
+
+    :param text: name.
+    :return: list of terms.
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    return TOKEN_PATTERN.findall(text)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Objects stored in memory (local development, tests, benchmarks and small datasets), no ElasticSearch needed.
+
+    Names are searched in an inverted index (term -> {id: term frequency}) and scored with BM25,
+    zip codes in a hash index (zip -> ids). Only the DSL created by DataProcess._get_query_dsl is supported
+    (match on name, term on zip); hits are sorted by score and id, like the ElasticSearch index.
+    Nothing is persisted.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._documents = {}
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._zips = defaultdict(set)
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def count(self):
+        return len(self._documents)
+
+    def get(self, document_id, fields=None):
+        document = self._documents.get(document_id)
+
+        return {"_id": document_id, "_source": self._project(document, fields)} if document is not None else None
+
+    def get_many(self, document_ids, fields=None):
+        with self._lock:
+            documents = self._documents
+
+            return {document_id: self._project(documents[document_id], fields)
+                    for document_id in document_ids if document_id in documents}
+
+    def search(self, body, size):
+        with self._lock:
+            scores = self._query(body.get('query'))
+            total = len(scores)
+
+            keys = ((-score, document_id) for document_id, score in scores.items())
+
+            if body.get('search_after'):
+                score, document_id = body['search_after']
+                after = (-score, document_id)
+                keys = (key for key in keys if key > after)
+
+            page = heapq.nsmallest(size, keys)
+            fields = body.get('_source')
+
+            hits = [
+                {
+                    "_id": document_id,
+                    "_score": -score,
+                    "_source": self._project(self._documents[document_id], fields),
+                    "sort": [-score, document_id]
+                }
+                for score, document_id in page
+            ]
+
+        return {"hits": {"total": total, "hits": hits}}
+
+    def search_many(self, bodies, size):
+        return [self.search(body, size) for body in bodies]
+
+    def scroll(self, body, size, scroll_id=None):
+        # Stateless scroll: the id keeps the query and the sort values of the last hit
+        if scroll_id:
+            body, size = json.loads(base64.urlsafe_b64decode(scroll_id.encode('ascii')).decode('utf-8'))
+
+        result = self.search(body, size)
+        hits = result['hits']['hits']
+
+        if hits:
+            body = dict(body, search_after=hits[-1]['sort'])
+
+        result['_scroll_id'] = base64.urlsafe_b64encode(json.dumps([body, size]).encode('utf-8')).decode('ascii')
+
+        return result
+
+    def scan(self, body, size):
+        return self.scan_slice(body, size, 0, 1)
+
+    def scan_slice(self, body, size, slice_id, max_slices, ordered=False):
+        with self._lock:
+            document_ids = [document_id for document_id in self._query(body.get('query'))
+                            if max_slices == 1 or int(document_id[:8], 16) % max_slices == slice_id]
+
+        if ordered:
+            document_ids.sort()
+
+        fields = body.get('_source')
+
+        for start in range(0, len(document_ids), size):
+            with self._lock:
+                documents = self._documents
+                hits = [{"_id": document_id, "_source": self._project(documents[document_id], fields)}
+                        for document_id in document_ids[start:start + size] if document_id in documents]
+
+            for hit in hits:
+                yield hit
+
+    def index_documents(self, documents):
+        for document in documents:
+            document_id = document['hash_object']
+
+            with self._lock:
+                self._add(document_id, dict(document))
+
+            yield True, {"index": {"_id": document_id, "status": 201}}
+
+    def update_documents(self, documents):
+        for document in documents:
+            document_id = document['hash_object']
+
+            with self._lock:
+                current = self._documents.get(document_id)
+
+                if current is not None:
+                    self._add(document_id, dict(current, **document))
+
+            if current is None:
+                yield False, {"update": {"_id": document_id, "status": 404}}
+            else:
+                yield True, {"update": {"_id": document_id, "status": 200}}
+
+    def _query(self, query):
+        """
+        Execute a query.
+
+        :param query: query (bool with must match on name and filter term on zip) or None (all objects).
+        :return: dict of id -> score.
+        """
+        query = (query or {}).get('bool', {})
+        terms = []
+        candidates = None
+
+        for clause in query.get('must', []):
+            terms.extend(analyze(clause['match']['name']))
+
+        for clause in query.get('filter', []):
+            ids = self._zips.get(clause['term']['zip'], set())
+            candidates = ids if candidates is None else candidates & ids
+
+        if query.get('must'):
+            return self._score(terms, candidates)
+
+        return {document_id: 1.0 for document_id in (self._documents if candidates is None else candidates)}
+
+    def _score(self, terms, candidates):
+        """
+        Score the objects with any of the terms (BM25).
+
+        :param terms: list of terms.
+        :param candidates: set of ids (filter) or None.
+        :return: dict of id -> score.
+        """
+        scores = {}
+        documents = len(self._documents)
+        average_length = self._total_length / documents if documents else 0
+
+        for term in terms:
+            postings = self._postings.get(term)
+
+            if not postings:
+                continue
+
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+
+            for document_id, frequency in postings.items():
+                if candidates is not None and document_id not in candidates:
+                    continue
+
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[document_id] / average_length)
+                scores[document_id] = scores.get(document_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+
+        return scores
+
+    @staticmethod
+    def _project(document, fields):
+        if fields is None:
+            return dict(document)
+
+        return {field: document.get(field) for field in fields if field in document}
+
+    def _add(self, document_id, document):
+        if document_id in self._documents:
+            self._remove(document_id)
+
+        terms = analyze(document.get('name') or '')
+
+        for term, frequency in Counter(terms).items():
+            self._postings[term][document_id] = frequency
+
+        self._documents[document_id] = document
+        self._lengths[document_id] = len(terms)
+        self._total_length += len(terms)
+
+        if document.get('zip') is not None:
+            self._zips[document['zip']].add(document_id)
+
+    def _remove(self, document_id):
+        document = self._documents.pop(document_id)
+
+        for term in set(analyze(document.get('name') or '')):
+            postings = self._postings[term]
+            postings.pop(document_id, None)
+
+            if not postings:
+                del self._postings[term]
+
+        self._total_length -= self._lengths.pop(document_id)
+
+        if document.get('zip') is not None:
+            ids = self._zips[document['zip']]
+            ids.discard(document_id)
+
+            if not ids:
+                del self._zips[document['zip']]
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGE_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+BATCH_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+
+    if not pairs:
+        return ''
+
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join('{}="{}"'.format(name, value) for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Metric with labels, exposed in the Prometheus text format. Updates are thread safe.
+    """
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """
+        :return: list of (name, label values, value, extra label).
+        """
+        raise NotImplementedError()
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} {}'.format(self.name, self.TYPE)]
+
+        for name, values, value, extra in self.samples():
+            lines.append('{}{} {}'.format(name, _format_labels(self.labels, values, extra), _format_value(value)))
+
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value, None) for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """
+    Gauge set by the application or read (at collection time) from a function returning {label values: value}.
+    """
+
+    TYPE = 'gauge'
+
+    def __init__(self, name, documentation, labels=(), function=None):
+        super(Gauge, self).__init__(name, documentation, labels)
+        self._function = function
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+    def samples(self):
+        if self._function:
+            values = self._function()
+        else:
+            with self._lock:
+                values = dict(self._values)
+
+        return [(self.name, labels, value, None) for labels, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            counts = self._values.get(labels)
+
+            if counts is None:
+                # Counts by bucket (the last one is +Inf), sum
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """
+        Observe the duration (seconds) of the block.
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((labels, list(counts)) for labels, counts in self._values.items())
+
+        samples = []
+
+        for labels, counts in values:
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((self.name + '_bucket', labels, cumulative, ('le', _format_value(bound))))
+
+            samples.append((self.name + '_sum', labels, counts[-1], None))
+            samples.append((self.name + '_count', labels, cumulative, None))
+
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metrics of the process, rendered in the Prometheus text format (version 0.0.4).
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        """
+        Register a metric (a metric with the same name is replaced).
+
+        :param metric: metric.
+        :return: metric.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        return '\n'.join(metric.render() for _, metric in sorted(self._metrics.items())) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'data_integration_request_seconds', 'HTTP request latency.', ['method', 'status']))
+ELASTICSEARCH_SECONDS = REGISTRY.register(Histogram(
+    'data_integration_elasticsearch_seconds', 'ElasticSearch request latency.', ['operation']))
+BULK_BATCH_DOCUMENTS = REGISTRY.register(Histogram(
+    'data_integration_bulk_batch_documents', 'Documents per bulk request.', ['operation'], BATCH_BUCKETS))
+INGEST_STAGE_SECONDS = REGISTRY.register(Histogram(
+    'data_integration_ingest_stage_seconds', 'Time of each import by stage (read, parse, bulk).',
+    ['operation', 'stage'], STAGE_BUCKETS))
+ROWS_INGESTED = REGISTRY.register(Counter(
+    'data_integration_rows_ingested_total', 'Rows indexed (restore) or updated (update).', ['operation']))
+ROWS_REJECTED = REGISTRY.register(Counter(
+    'data_integration_rows_rejected_total', 'Rows rejected by the parser.', ['operation']))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+
+from collections import deque
+from multiprocessing import Pool
+
+from config.default import Config
+from integration.rejected_rows import RejectedRows
+
+
+def split_ranges(input_file_path, start, chunk_bytes):
+    """
+    Split a file into byte ranges aligned on line breaks.
+
+    :param input_file_path: File path.
+    :param start: offset of the first range (after the header).
+    :param chunk_bytes: approximate size of each range.
+    :return: generator of (start, end) offsets.
+    """
+    size = os.path.getsize(input_file_path)
+
+    with open(input_file_path, 'rb') as file_object:
+        while start < size:
+            file_object.seek(min(start + chunk_bytes, size))
+            file_object.readline()
+            end = min(file_object.tell(), size)
+
+            yield start, end
+            start = end
+
+
+def parse_range(input_file_path, start, end, plan):
+    """
+    Parse and hash the lines of a byte range (executed in a worker process).
+
+    :param input_file_path: File path.
+    :param start: first byte.
+    :param end: last byte (exclusive).
+    :param plan: column plan (see DataProcess._process_header).
+    :return: values (list of dict), rejected rows (line numbers relative to the range) and number of lines.
+    """
+    from integration.data_process import DataProcess
+
+    with open(input_file_path, 'rb') as file_object:
+        file_object.seek(start)
+        chunk = file_object.read(end - start)
+
+    rows = []
+    rejected = RejectedRows()
+    line_number = 0
+
+    # Same line splitting (universal newlines) of a file opened in text mode
+    for line_number, line in enumerate(io.TextIOWrapper(io.BytesIO(chunk), encoding='utf-8'), 1):
+        data = DataProcess._process_line(line, plan)
+
+        if data:
+            rows.append(data)
+        else:
+            rejected.add(line_number, line, plan.size)
+
+    return rows, rejected, line_number
+
+
+class ParallelFileReader:
+    """
+    Read a file parsing newline aligned byte ranges in a pool of processes.
+    Rows are yielded in the same order of the file, and at most two ranges per worker are kept in memory.
+    """
+
+    def __init__(self, workers=None, chunk_bytes=None):
+        self._workers = workers or Config.PARSE_WORKERS
+        self._chunk_bytes = chunk_bytes or Config.PARSE_CHUNK_BYTES
+
+    def read(self, input_file_path, plan, start, rejected, on_range=None):
+        """
+        Read the rows of a file.
+
+        :param input_file_path: File path.
+        :param plan: column plan (computed once from the header, by the caller).
+        :param start: offset of the first line after the header.
+        :param rejected: report of rejected rows.
+        :param on_range: function called with the bytes and the lines (header included) read up to the end of
+                         each range, before its rows are yielded (optional, e.g. the progress of a job).
+        :return: generator of values (dict).
+        """
+        pool = Pool(self._workers)
+        pending = deque()
+        line_offset = 1
+
+        try:
+            for byte_range in split_ranges(input_file_path, start, self._chunk_bytes):
+                pending.append((pool.apply_async(parse_range, (input_file_path,) + byte_range + (plan,)),
+                                byte_range[1]))
+
+                if len(pending) >= self._workers * 2:
+                    line_offset = yield from self._collect(pending.popleft(), rejected, line_offset, on_range)
+
+            while pending:
+                line_offset = yield from self._collect(pending.popleft(), rejected, line_offset, on_range)
+        finally:
+            pool.terminate()
+
+    @staticmethod
+    def _collect(pending, rejected, line_offset, on_range=None):
+        """
+        Wait the parse of a range and yield its rows.
+
+        :param pending: async result of parse_range and end of the range.
+        :param rejected: report of rejected rows.
+        :param line_offset: number of lines before the range.
+        :param on_range: function called with the bytes and the lines read (optional).
+        :return: number of lines up to the end of the range.
+        """
+        result, end = pending
+        rows, range_rejected, lines = result.get()
+        rejected.merge(range_rejected, line_offset)
+
+        if on_range is not None:
+            on_range(end, line_offset + lines)
+
+        yield from rows
+
+        return line_offset + lines
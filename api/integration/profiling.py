@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from collections import OrderedDict
+
+_local = threading.local()
+
+
+class _NullStage:
+    """
+    Stage of a request that is not profiled (nothing is measured).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class _Stage:
+
+    def __init__(self, profile, name):
+        self._profile = profile
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._profile.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class RequestProfile:
+    """
+    Time of the stages of a request (in the order they start), rendered as a Server-Timing header.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def record(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self):
+        """
+        :return: Server-Timing header value (durations in milliseconds).
+        """
+        return ', '.join('{};dur={:.3f}'.format(name, seconds * 1000) for name, seconds in self.stages.items())
+
+
+def start_profile():
+    """
+    Start profiling the requests of the current thread.
+
+    :return: profile.
+    """
+    _local.profile = RequestProfile()
+    return _local.profile
+
+
+def stop_profile():
+    _local.profile = None
+
+
+def stage(name):
+    """
+    Measure a stage of the current request (context manager). Does nothing when the request is not profiled.
+
+    :param name: stage name.
+    :return: context manager.
+    """
+    profile = getattr(_local, 'profile', None)
+
+    return _Stage(profile, name) if profile is not None else _NULL_STAGE
+
+
+def record(name, seconds):
+    """
+    Add the time of a stage measured by the caller (ignored when the request is not profiled).
+
+    :param name: stage name.
+    :param seconds: seconds.
+    """
+    profile = getattr(_local, 'profile', None)
+
+    if profile is not None:
+        profile.record(name, seconds)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from config.default import Config
+from integration.serialization import dumps
+
+
+class QueryCache:
+    """
+    In-process LRU cache (with TTL) of query results, bounded in entries and bytes.
+
+    Writes to the database bump the generation (invalidate): entries of older generations are dropped,
+    and results read before the invalidation are not stored.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl_seconds=None):
+        self._max_entries = max_entries if max_entries is not None else Config.QUERY_CACHE_MAX_ENTRIES
+        self._max_bytes = max_bytes if max_bytes is not None else Config.QUERY_CACHE_MAX_BYTES
+        self._ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.QUERY_CACHE_TTL_SECONDS
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self._max_entries > 0 and self._max_bytes > 0 and self._ttl_seconds > 0
+
+    @staticmethod
+    def key(name, addresszip, cursor=None, size=None, exact=False):
+        """
+        Normalised key of a query.
+
+        :param name: Key for search in name field.
+        :param addresszip: Key for search in zip field
+        :param cursor: Page
+        :param size: Page size
+        :param exact: Exact lookup (by id, see DataProcess.retrieve): the name is compared as is.
+        :return: key (tuple). The zip is compared as is (a keyword, case sensitive).
+        """
+        name = (name or '').strip()
+
+        return (name if exact else name.lower(), (addresszip or '').strip(), cursor or '', size or 0, exact)
+
+    def get(self, key):
+        """
+        Get a result.
+
+        :param key: query key.
+        :return: result or None (miss).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[2]
+
+    def set(self, key, value, generation):
+        """
+        Store a result, evicting the least recently used entries to keep the limits.
+
+        :param key: query key.
+        :param value: result.
+        :param generation: generation read before the query (see invalidate).
+        """
+        size = len(dumps(value))
+
+        with self._lock:
+            if generation != self.generation or size > self._max_bytes:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self):
+        """
+        Drop all results (the database has changed).
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Cache counters.
+
+        :return: dict with entries, bytes, generation, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[1]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from config.default import Config
+
+
+class RejectedRows:
+    """
+    Report of the rows rejected by the line parser. All rows are counted, only the first ones
+    (up to the limit) are kept, truncated.
+    """
+
+    CONTENT_SIZE = 200
+
+    def __init__(self, limit=None):
+        self._limit = limit if limit is not None else Config.REJECTED_ROWS_LIMIT
+        self.count = 0
+        self.rows = []
+
+    def add(self, line_number, line, expected_columns):
+        """
+        Add a rejected row.
+
+        :param line_number: line number in the file (the header is the line 1).
+        :param line: line content.
+        :param expected_columns: number of columns of the header.
+        """
+        self.count += 1
+
+        if len(self.rows) < self._limit:
+            self.rows.append({
+                "line": line_number,
+                "reason": "Expected {} columns, found {}.".format(expected_columns, line.count(';') + 1),
+                "content": line.rstrip('\r\n')[:RejectedRows.CONTENT_SIZE]
+            })
+
+    def merge(self, other, line_offset=0):
+        """
+        Add the rows of other report (e.g. from a part of the file).
+
+        :param other: rejected rows report.
+        :param line_offset: number of lines before the part of the file.
+        """
+        for row in other.rows[:max(self._limit - len(self.rows), 0)]:
+            self.rows.append(dict(row, line=row['line'] + line_offset))
+
+        self.count += other.count
+
+    def to_dict(self):
+        return {"count": self.count, "rows": self.rows}
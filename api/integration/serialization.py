@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from config.default import Config
+
+
+def _json_dumps(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def create_dumps(library=None):
+    """
+    Create the JSON serializer of the responses: orjson when it's installed (optional package, several times
+    faster), the standard json module otherwise.
+
+    :param library: 'auto', 'orjson' or 'json' (JSON_LIBRARY by default).
+    :return: library used and function (object -> JSON bytes).
+    """
+    library = library or Config.JSON_LIBRARY
+
+    if library not in ('auto', 'orjson', 'json'):
+        raise ValueError("Unknown JSON library: {}".format(library))
+
+    if library != 'json':
+        try:
+            import orjson
+        except ImportError:
+            if library == 'orjson':
+                raise
+
+            return 'json', _json_dumps
+
+        def orjson_dumps(data):
+            try:
+                return orjson.dumps(data)
+            except TypeError:
+                # Not supported by orjson (e.g. keys that are not str, integers larger than 64 bits)
+                return _json_dumps(data)
+
+        return 'orjson', orjson_dumps
+
+    return 'json', _json_dumps
+
+
+JSON_LIBRARY, dumps = create_dumps()
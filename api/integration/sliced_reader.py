@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+
+from config.default import Config
+
+# End of a slice (queued after its last page)
+_DONE = object()
+
+
+class SliceProgress:
+    """
+    Progress of a slice: hits and pages read, state and rate.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, slice_id):
+        self.slice_id = slice_id
+        self.state = SliceProgress.PENDING
+        self.hits = 0
+        self.pages = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+
+        return {
+            "slice": self.slice_id,
+            "state": self.state,
+            "hits": self.hits,
+            "pages": self.pages,
+            "hits_per_second": round(self.hits / elapsed, 2) if elapsed > 0 else None,
+            "error": self.error
+        }
+
+
+class SlicedScrollReader:
+    """
+    Read all the objects of a query with a sliced scroll: each slice is read by a thread of a pool, the slices are
+    merged into one stream (see StorageBackend.scan_slice).
+
+    - unordered: the pages are returned as they are read, from any slice (the fastest);
+    - ordered: each slice is read sorted by id and the slices are merged (k-way), the objects are sorted by id.
+      All the slices are read at the same time (one thread per slice).
+
+    The pages read and not consumed are kept in a bounded queue (queue_size pages per slice), so the memory used
+    doesn't depend on the index size. If the consumer stops, the slices are stopped.
+    """
+
+    def __init__(self, backend, slices=None, workers=None, page_size=None, queue_size=None, on_progress=None):
+        """
+        :param backend: storage backend.
+        :param slices: number of slices (SCAN_SLICES by default, the number of shards is a good value), at most
+                       SCAN_SLICES_MAX.
+        :param workers: number of threads (SCAN_WORKERS by default).
+        :param page_size: page size of each slice (EXPORT_PAGE_SIZE by default).
+        :param queue_size: pages kept per slice (SCAN_QUEUE_SIZE by default).
+        :param on_progress: function called with the SliceProgress of a slice after each page (optional).
+        """
+        self._backend = backend
+        self._slices = min(max(slices or Config.SCAN_SLICES, 1), Config.SCAN_SLICES_MAX)
+        self._workers = max(workers or Config.SCAN_WORKERS, 1)
+        self._page_size = page_size or Config.EXPORT_PAGE_SIZE
+        self._queue_size = queue_size or Config.SCAN_QUEUE_SIZE
+        self._on_progress = on_progress
+        self.progress = [SliceProgress(slice_id) for slice_id in range(self._slices)]
+
+    def read(self, body, ordered=False):
+        """
+        :param body: query (DSL).
+        :param ordered: sort the objects by id.
+        :return: generator of hits (_id and _source).
+        """
+        stop = threading.Event()
+        workers = self._slices if ordered else min(self._workers, self._slices)
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+        if ordered:
+            queues = [Queue(self._queue_size) for _ in range(self._slices)]
+        else:
+            queues = [Queue(self._queue_size * self._slices)] * self._slices
+
+        try:
+            for progress, output in zip(self.progress, queues):
+                executor.submit(self._read_slice, body, ordered, progress, output, stop)
+
+            if ordered:
+                hits = heapq.merge(*[self._drain(output) for output in queues], key=lambda hit: hit['_id'])
+            else:
+                hits = self._drain(queues[0], self._slices)
+
+            for hit in hits:
+                yield hit
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _read_slice(self, body, ordered, progress, output, stop):
+        """
+        Read a slice, page by page, into the queue (executed by the thread pool).
+        """
+        progress.state = SliceProgress.RUNNING
+        progress.started_at = time.time()
+        page = []
+
+        try:
+            hits = self._backend.scan_slice(body, self._page_size, progress.slice_id, self._slices, ordered)
+
+            for hit in hits:
+                page.append(hit)
+
+                if len(page) >= self._page_size:
+                    if not self._put(output, page, stop):
+                        return
+
+                    self._add_page(progress, page)
+                    page = []
+
+            if page:
+                if not self._put(output, page, stop):
+                    return
+
+                self._add_page(progress, page)
+
+            progress.state = SliceProgress.DONE
+        except Exception as err:
+            progress.state = SliceProgress.FAILED
+            progress.error = str(err)
+            self._put(output, err, stop)
+        finally:
+            progress.finished_at = time.time()
+            self._put(output, _DONE, stop)
+
+    def _add_page(self, progress, page):
+        progress.hits += len(page)
+        progress.pages += 1
+
+        if self._on_progress:
+            self._on_progress(progress)
+
+    @staticmethod
+    def _put(output, item, stop):
+        """
+        Queue an item, waiting while the queue is full (until the reader is stopped).
+
+        :return: the item was queued.
+        """
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    @staticmethod
+    def _drain(output, slices=1):
+        """
+        Read the hits of the queue until the end of the slices.
+
+        :param output: queue.
+        :param slices: number of slices of the queue.
+        :return: generator of hits.
+        """
+        while slices:
+            item = output.get()
+
+            if item is _DONE:
+                slices -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                for hit in item:
+                    yield hit
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+
+from config.default import Config
+
+
+class StorageBackend:
+    """
+    Database used by DataProcess.
+
+    Queries are written in the DSL created by DataProcess._get_query_dsl, and results have the shape of the
+    ElasticSearch responses (hits with _id, _source and sort values). Bulk operations yield (ok, item) for each
+    document, in the same order of the documents, like elasticsearch.helpers.streaming_bulk.
+    """
+
+    # Slices of a scan are faster when read in parallel (e.g. one per shard), see SlicedScrollReader
+    parallel_scan = False
+
+    def bootstrap(self):
+        """
+        Create the index (if it doesn't exist).
+        """
+        pass
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Prepare the index for a large load while the block runs (initial load).
+        """
+        yield
+
+    def count(self):
+        """
+        Count objects.
+
+        :return: the number of objects.
+        """
+        raise NotImplementedError()
+
+    def get(self, document_id, fields=None):
+        """
+        Get an object by id (realtime: the objects written are found before the index is refreshed).
+
+        :param document_id: object id (hash_object).
+        :param fields: fields of the object (all by default).
+        :return: hit (_id and _source) or None.
+        """
+        raise NotImplementedError()
+
+    def get_many(self, document_ids, fields=None):
+        """
+        Get objects by id.
+
+        :param document_ids: list of ids.
+        :param fields: fields of the objects (all by default).
+        :return: dict of id -> _source (only the objects found).
+        """
+        raise NotImplementedError()
+
+    def search(self, body, size):
+        """
+        Search objects (a page, sorted by score and id, after body['search_after'] when present).
+
+        :param body: query (DSL).
+        :param size: page size.
+        :return: response (hits, total).
+        """
+        raise NotImplementedError()
+
+    def search_many(self, bodies, size):
+        """
+        Execute many searches at once (first page of each query).
+
+        :param bodies: list of queries (DSL).
+        :param size: page size.
+        :return: list of responses (hits, total) in the order of the queries, a response with 'error' when
+                 the query failed.
+        """
+        raise NotImplementedError()
+
+    def scroll(self, body, size, scroll_id=None):
+        """
+        Read the pages of a query with a scroll.
+
+        :param body: query (DSL), used by the first page.
+        :param size: page size.
+        :param scroll_id: next page.
+        :return: response (hits, total and _scroll_id).
+        """
+        raise NotImplementedError()
+
+    def scan(self, body, size):
+        """
+        Read all the objects of a query, page by page (not sorted).
+
+        :param body: query (DSL).
+        :param size: page size.
+        :return: generator of hits (_id and _source).
+        """
+        result = self.scroll(body, size)
+
+        while result['hits']['hits']:
+            for hit in result['hits']['hits']:
+                yield hit
+
+            result = self.scroll(body, size, result['_scroll_id'])
+
+    def scan_slice(self, body, size, slice_id, max_slices, ordered=False):
+        """
+        Read a slice of the objects of a query, page by page (see SlicedScrollReader). The slices split the
+        objects: each object is read by one slice.
+
+        :param body: query (DSL).
+        :param size: page size.
+        :param slice_id: slice (0 to max_slices - 1).
+        :param max_slices: number of slices.
+        :param ordered: sort the objects by id.
+        :return: generator of hits (_id and _source).
+        """
+        raise NotImplementedError()
+
+    def index_documents(self, documents):
+        """
+        Insert (or replace) objects, the id is the hash_object.
+
+        :param documents: iterable of objects (consumed lazily).
+        :return: generator of (ok, item).
+        """
+        raise NotImplementedError()
+
+    def update_documents(self, documents):
+        """
+        Update exists objects (partial update), the id is the hash_object. Not found objects fail with status 404.
+
+        :param documents: iterable of objects (consumed lazily).
+        :return: generator of (ok, item).
+        """
+        raise NotImplementedError()
+
+
+def create_storage_backend(name=None):
+    """
+    Create the storage backend from the configuration.
+
+    :param name: 'elasticsearch' or 'memory' (STORAGE_BACKEND by default).
+    :return: storage backend.
+    """
+    name = name or Config.STORAGE_BACKEND
+
+    if name == 'elasticsearch':
+        from integration.elasticsearch_backend import ElasticSearchBackend
+        return ElasticSearchBackend()
+
+    if name == 'memory':
+        from integration.memory_backend import MemoryBackend
+        return MemoryBackend()
+
+    raise ValueError("Unknown storage backend: {}".format(name))
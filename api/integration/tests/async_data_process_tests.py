@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""Test asyncio Data Process"""
+
+import asyncio
+import time
+
+from unittest import TestCase
+
+from controller.custom.custom_api_error import InvalidCursorError, InvalidLookupError
+from integration.async_backend import AsyncElasticSearchBackend, AsyncMemoryBackend
+from integration.async_data_process import AsyncDataProcess
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+RESTORE = ["name;addressZip;website\n"] + ["company {};{:05d};\n".format(item, item) for item in range(10)]
+
+
+class SlowAsyncMemoryBackend(AsyncMemoryBackend):
+    """ Waits before each query (e.g. the round trip to ElasticSearch). """
+
+    def __init__(self, backend, latency):
+        super(SlowAsyncMemoryBackend, self).__init__(backend)
+        self.latency = latency
+
+    async def search(self, body, size):
+        await asyncio.sleep(self.latency)
+        return await super(SlowAsyncMemoryBackend, self).search(body, size)
+
+
+class StartedRequestsClient:
+    """ Like the asyncio ElasticSearch client, a request is started when the method is called. """
+
+    def __init__(self):
+        self.started = 0
+        self.max_started = 0
+
+    def search(self, **kwargs):
+        self.started += 1
+        self.max_started = max(self.max_started, self.started)
+
+        return asyncio.ensure_future(self._response())
+
+    async def _response(self):
+        await asyncio.sleep(0.01)
+        self.started -= 1
+
+        return {"hits": {"total": 0, "hits": []}}
+
+
+class AsyncDataProcessTest(TestCase):
+    """Test asyncio Data Process"""
+
+    @classmethod
+    def setUpClass(cls):
+        backend = MemoryBackend()
+        cls._data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=backend)
+        cls._data_process.restore(RESTORE)
+        cls._backend = backend
+
+    def setUp(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self.addCleanup(self._loop.close)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self._async_data_process = AsyncDataProcess(query_cache=QueryCache(max_entries=0),
+                                                    backend=AsyncMemoryBackend(self._backend))
+
+    def _run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def test_retrieve(self):
+        """ Same responses of DataProcess. """
+
+        for name, addresszip, fuzzy in (('company', None, False), (None, '00003', False),
+                                        ('company 3', '00003', False), ('company 3', '00003', True),
+                                        ('company 3', '00004', False)):
+            self.assertEqual(self._data_process.retrieve(name, addresszip, size=4, fuzzy=fuzzy),
+                             self._run(self._async_data_process.retrieve(name, addresszip, size=4, fuzzy=fuzzy)))
+
+    def test_retrieve_pages(self):
+        first = self._run(self._async_data_process.retrieve('company', None, size=4))
+        second = self._run(self._async_data_process.retrieve('company', None, cursor=first['cursor'], size=4))
+
+        self.assertEqual(self._data_process.retrieve('company', None, cursor=first['cursor'], size=4), second)
+
+        with self.assertRaises(InvalidCursorError):
+            self._run(self._async_data_process.retrieve('company', None, cursor='invalid'))
+
+    def test_retrieve_cache(self):
+        async_data_process = AsyncDataProcess(query_cache=QueryCache(max_entries=10),
+                                              backend=AsyncMemoryBackend(self._backend))
+
+        first = self._run(async_data_process.retrieve('company 3', '00003'))
+        second = self._run(async_data_process.retrieve('company 3', '00003'))
+
+        self.assertEqual('id', first['path'])
+        self.assertEqual(first, second)
+        self.assertEqual(1, async_data_process._query_cache.stats()['hits'])
+
+    def test_retrieve_after_load(self):
+        """ The query cache is disabled by default: the loads of DataProcess (another process) are read at once. """
+
+        backend = MemoryBackend()
+        data_process = DataProcess(query_cache=QueryCache(max_entries=10), backend=backend)
+        async_data_process = AsyncDataProcess(backend=AsyncMemoryBackend(backend))
+        data_process.restore(RESTORE)
+
+        self.assertIsNone(self._run(async_data_process.retrieve('company 3', '00003'))['data'][0]['website'])
+
+        data_process.update(["name;addressZip;website\n", "company 3;00003;http://www.company3.com\n"])
+
+        self.assertEqual('http://www.company3.com',
+                         self._run(async_data_process.retrieve('company 3', '00003'))['data'][0]['website'])
+        self.assertFalse(async_data_process._query_cache.enabled)
+
+    def test_lookup(self):
+        """ Same responses of DataProcess. """
+
+        items = [{"name": "company 1", "zip": "00001"}, {"name": "company 2"}, {"name": "company 2", "zip": "99999"},
+                 {"name": "unknown"}]
+
+        for fuzzy in (True, False):
+            self.assertEqual(self._data_process.lookup(items, fuzzy=fuzzy),
+                             self._run(self._async_data_process.lookup(items, fuzzy=fuzzy)))
+
+        with self.assertRaises(InvalidLookupError):
+            self._run(self._async_data_process.lookup([{"zip": "00001"}]))
+
+    def test_concurrent_requests(self):
+        """ The requests waiting on the database don't block the others. """
+
+        async_data_process = AsyncDataProcess(query_cache=QueryCache(max_entries=0),
+                                              backend=SlowAsyncMemoryBackend(self._backend, latency=0.05))
+
+        start = time.perf_counter()
+        results = self._run(asyncio.gather(*[async_data_process.retrieve('company', None) for _ in range(20)]))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(20, len(results))
+        self.assertTrue(all(result['count'] == 10 for result in results))
+        # 20 sequential requests take 1 second
+        self.assertLess(elapsed, 0.5)
+
+    def test_elasticsearch_backend_maxsize(self):
+        """ At most ELASTICSEARCH_MAXSIZE requests are started at the same time. """
+
+        client = StartedRequestsClient()
+        backend = AsyncElasticSearchBackend(elastic_search=client)
+        backend._maxsize = 2
+
+        self._run(asyncio.gather(*[backend.search({}, 10) for _ in range(10)]))
+
+        self.assertEqual(0, client.started)
+        self.assertEqual(2, client.max_started)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""Test Checkpoints"""
+
+import tempfile
+
+from unittest import TestCase, mock
+
+from config.default import Config
+from controller.custom.custom_api_error import CheckpointNotFoundError, InitialImportError, InvalidImportIdError, \
+    ProcessFileError
+from integration.checkpoint import CheckpointStore
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+RESTORE = ["name;addressZip;website\n"] + ["company {};{:05d};\n".format(item, item) for item in range(10)]
+
+
+class FailingMemoryBackend(MemoryBackend):
+    """ Fails after a number of objects is indexed (e.g. ElasticSearch timeout). """
+
+    def __init__(self, fail_after):
+        super(FailingMemoryBackend, self).__init__()
+        self.fail_after = fail_after
+        self.indexed = []
+
+    def index_documents(self, documents):
+        for ok, item in super(FailingMemoryBackend, self).index_documents(documents):
+            if self.fail_after is not None and len(self.indexed) >= self.fail_after:
+                raise TimeoutError()
+
+            self.indexed.append(item['index']['_id'])
+            yield ok, item
+
+
+class RejectingMemoryBackend(MemoryBackend):
+    """ Rejects the objects of a name once (e.g. bulk queue full, 429), without raising. """
+
+    def __init__(self, rejected_name):
+        super(RejectingMemoryBackend, self).__init__()
+        self.rejected_name = rejected_name
+
+    def index_documents(self, documents):
+        for document in documents:
+            if document['name'] == self.rejected_name:
+                self.rejected_name = None
+                yield False, {"index": {"_id": document['hash_object'], "status": 429}}
+            else:
+                yield from super(RejectingMemoryBackend, self).index_documents([document])
+
+
+class CheckpointTest(TestCase):
+    """Test Checkpoints"""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Config, CHECKPOINT_DIRECTORY=tempfile.mkdtemp(), CHECKPOINT_INTERVAL_ROWS=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self._backend = FailingMemoryBackend(fail_after=5)
+        self._data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=self._backend)
+
+    def test_resume(self):
+        """ The rows after the checkpoint are sent again. """
+
+        with self.assertRaises(ProcessFileError):
+            self._data_process.restore(RESTORE, import_id='catalog')
+
+        checkpoint = CheckpointStore().load('catalog')
+        self.assertEqual('failed', checkpoint['state'])
+        self.assertEqual(6, checkpoint['line'])
+        self.assertEqual(5, checkpoint['indexed'])
+
+        # The database is not empty
+        with self.assertRaises(InitialImportError):
+            self._data_process.restore(RESTORE, import_id='catalog')
+
+        self._backend.fail_after = None
+        result = self._data_process.restore(RESTORE, import_id='catalog', resume=True)
+
+        self.assertEqual(5, result['indexed'])
+        self.assertEqual({"import_id": "catalog", "resumed_from_line": 6, "skipped": 5}, result['checkpoint'])
+        self.assertEqual(10, len(set(self._backend.indexed)))
+        self.assertEqual(10, len(self._backend.indexed))
+
+        checkpoint = CheckpointStore().load('catalog')
+        self.assertEqual('completed', checkpoint['state'])
+        self.assertEqual(11, checkpoint['line'])
+        self.assertEqual(10, checkpoint['indexed'])
+
+    def test_resume_last_policy(self):
+        """ The rows written at the end (last policy) are numbered after the last line. """
+
+        self._backend.fail_after = 11
+        lines = RESTORE + ["company 1;00001;http://company.com\n", "company 2;00002;http://company.com\n"]
+
+        with self.assertRaises(ProcessFileError):
+            self._data_process.restore(lines, dedupe='last', import_id='catalog')
+
+        self.assertEqual(14, CheckpointStore().load('catalog')['line'])
+
+        self._backend.fail_after = None
+        result = self._data_process.restore(lines, dedupe='last', import_id='catalog', resume=True)
+
+        # Only the last row of company 2 was not written: written again, not indexed
+        self.assertEqual(0, result['indexed'])
+        self.assertEqual(1, result['duplicates']['resent'])
+        websites = [item['website'] for item in self._data_process.retrieve('company', None, size=20)['data']]
+        self.assertEqual(['http://company.com'] * 2, [website for website in websites if website])
+
+    def test_checkpoint_stops_at_failed_row(self):
+        """ A row not written (without error of the import) is sent again by a resume. """
+
+        backend = RejectingMemoryBackend('company 3')
+        data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=backend)
+
+        result = data_process.restore(RESTORE, import_id='catalog')
+        self.assertEqual(9, result['indexed'])
+        self.assertEqual(1, result['failed'])
+
+        checkpoint = CheckpointStore().load('catalog')
+        self.assertEqual('completed', checkpoint['state'])
+        self.assertEqual(4, checkpoint['line'])
+        self.assertEqual(3, checkpoint['indexed'])
+
+        result = data_process.restore(RESTORE, import_id='catalog', resume=True)
+        self.assertEqual(7, result['indexed'])
+        self.assertEqual({"import_id": "catalog", "resumed_from_line": 4, "skipped": 3}, result['checkpoint'])
+        self.assertEqual(1, data_process.retrieve('company 3', '00003')['count'])
+        self.assertEqual(11, CheckpointStore().load('catalog')['line'])
+
+    def test_resume_without_checkpoint(self):
+        with self.assertRaises(CheckpointNotFoundError):
+            self._data_process.restore(RESTORE, import_id='unknown', resume=True)
+
+        with self.assertRaises(CheckpointNotFoundError):
+            self._data_process.restore(RESTORE, resume=True)
+
+    def test_invalid_import_id(self):
+        with self.assertRaises(InvalidImportIdError):
+            self._data_process.restore(RESTORE, import_id='../catalog')
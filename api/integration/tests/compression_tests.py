@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Test Compression"""
+
+import bz2
+import gzip
+import os
+import sys
+import tempfile
+
+from io import BytesIO
+from unittest import TestCase, mock
+
+from controller.custom.custom_api_error import UnsupportedCompressionError
+from integration.compression import detect_compression, open_text
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+CONTENT = b'name;addressZip\r\ngroup;78229\nyawoen group;30078\n'
+
+
+class CompressionTest(TestCase):
+    """Test Compression"""
+
+    def test_detect_compression(self):
+        self.assertEqual('gzip', detect_compression(gzip.compress(CONTENT)[:4]))
+        self.assertEqual('bz2', detect_compression(bz2.compress(CONTENT)[:4]))
+        self.assertEqual('zstd', detect_compression(b'\x28\xb5\x2f\xfd'))
+        self.assertIsNone(detect_compression(CONTENT[:4]))
+        self.assertIsNone(detect_compression(b''))
+
+    def test_open_text(self):
+        """ The lines are the same, compressed or not. """
+
+        lines = ['name;addressZip\r\n', 'group;78229\n', 'yawoen group;30078\n']
+
+        for content in (CONTENT, gzip.compress(CONTENT), bz2.compress(CONTENT)):
+            self.assertEqual(lines, list(open_text(BytesIO(content))))
+
+    def test_open_text_short_file(self):
+        self.assertEqual(['a'], list(open_text(BytesIO(b'a'))))
+        self.assertEqual([], list(open_text(BytesIO(b''))))
+
+    def test_zstd_unavailable(self):
+        with mock.patch.dict(sys.modules, {'zstandard': None}):
+            with self.assertRaises(UnsupportedCompressionError):
+                open_text(BytesIO(b'\x28\xb5\x2f\xfd' + b'\x00' * 8))
+
+    def test_restore_compressed_file(self):
+        """ A compressed file is decompressed while it's read (not parsed in parallel). """
+
+        path = os.path.join(tempfile.mkdtemp(), 'catalog.csv.gz')
+
+        with open(path, 'wb') as file_object:
+            file_object.write(gzip.compress(CONTENT))
+
+        data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+        data_process._parse_workers = 2
+        result = data_process.restore(path)
+
+        self.assertEqual(2, result['indexed'])
+        self.assertEqual(0, result['rejected']['count'])
+        self.assertEqual(['group', 'yawoen group'],
+                         sorted(item['name'] for item in data_process.retrieve(None, None)['data']))
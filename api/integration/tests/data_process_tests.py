@@ -5,8 +5,14 @@
 from unittest import TestCase, mock
 
 from config.default import Config
-from controller.custom.custom_api_error import ConnectionElasticSearchError, ProcessFileError, InitialImportError
+from controller.custom.custom_api_error import ConnectionElasticSearchError, ProcessFileError, InitialImportError, \
+    InvalidCursorError, InvalidLookupError, InvalidLookupSizeError
 from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+from integration.rejected_rows import RejectedRows
+
+WEBSITE = "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738"
 
 
 class DataProcessTest(TestCase):
@@ -14,192 +20,298 @@ class DataProcessTest(TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls._data_process = DataProcess()
+        # In memory database (no query cache, some tests mock the database)
+        cls._data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+        cls._data_process.restore(["name;addressZip;website\n",
+                                   "yawoen;11111;{}\n".format(WEBSITE),
+                                   "group;22222;{}\n".format(WEBSITE)])
 
     def test_retrieve_success(self):
         """ Tests success of the process retrieves all data. """
 
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 2,
-                "hits": [
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "11111",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "yawoen"
-                        }
-                    },
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "22222",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "group"
-                        }
-                    }
-
-                ]
-            }
-        }
-
-        self._data_process._elastic_search.search = mock.MagicMock(return_value=elastic_mock_result)
-
         result = self._data_process.retrieve(name=None, addresszip=None)
 
-        self.assertEqual(3, len(result.keys()))
-        self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
+        self.assertEqual(4, len(result.keys()))
+        self.assertEqual(['count', 'cursor', 'data', 'path'], sorted(result.keys()))
         self.assertEqual(2, result['count'])
-        self.assertEqual("11111", result['data'][0]['zip'])
-        self.assertEqual("http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                         result['data'][0]['website'])
-        self.assertEqual("yawoen", result['data'][0]['name'])
+        self.assertEqual(['group', 'yawoen'], sorted(item['name'] for item in result['data']))
+        self.assertEqual(WEBSITE, result['data'][0]['website'])
 
     def test_retrieve_success_by_name(self):
         """ Tests success of the process retrieves data (search by name). """
 
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 1,
-                "hits": [
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "11111",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "yawoen"
-                        }
-                    }
-                ]
-            }
-        }
-
-        self._data_process._elastic_search.search = mock.MagicMock(return_value=elastic_mock_result)
-
-        result = self._data_process.retrieve(name='yawoen', addresszip=None)
+        result = self._data_process.retrieve(name='Yawoen', addresszip=None)
 
-        self.assertEqual(3, len(result.keys()))
-        self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
+        self.assertEqual(4, len(result.keys()))
+        self.assertEqual(['count', 'cursor', 'data', 'path'], sorted(result.keys()))
+        self.assertEqual(1, result['count'])
         self.assertEqual("11111", result['data'][0]['zip'])
-        self.assertEqual("http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                         result['data'][0]['website'])
+        self.assertEqual(WEBSITE, result['data'][0]['website'])
         self.assertEqual("yawoen", result['data'][0]['name'])
+        self.assertEqual(DataProcess._create_hash_line(['yawoen', '11111']), result['data'][0]['id'])
 
     def test_retrieve_success_by_zip(self):
         """ Tests success of the process retrieves data (search by zip). """
 
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 1,
-                "hits": [
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "11111",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "yawoen"
-                        }
-                    }
-                ]
-            }
-        }
-
-        self._data_process._elastic_search.search = mock.MagicMock(return_value=elastic_mock_result)
+        result = self._data_process.retrieve(name=None, addresszip='11111')
 
-        result = self._data_process.retrieve(name=None, addresszip='1111')
-
-        self.assertEqual(3, len(result.keys()))
-        self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
+        self.assertEqual(1, result['count'])
         self.assertEqual("11111", result['data'][0]['zip'])
-        self.assertEqual("http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                         result['data'][0]['website'])
         self.assertEqual("yawoen", result['data'][0]['name'])
 
+        # zip is an exact value
+        self.assertEqual(0, self._data_process.retrieve(name=None, addresszip='1111')['count'])
+
     def test_retrieve_success_by_name_and_zip(self):
         """ Tests success of the process retrieves data (search by name and zip). """
 
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 1,
-                "hits": [
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "11111",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "yawoen"
-                        }
-                    }
-                ]
-            }
-        }
+        result = self._data_process.retrieve(name='yawoen group', addresszip='22222')
 
-        self._data_process._elastic_search.search = mock.MagicMock(return_value=elastic_mock_result)
+        self.assertEqual(1, result['count'])
+        self.assertEqual("22222", result['data'][0]['zip'])
+        self.assertEqual("group", result['data'][0]['name'])
 
-        result = self._data_process.retrieve(name='yawoen', addresszip='11111')
+    def test_retrieve_by_id(self):
+        """ With name and zip the object is read by id, the search is the fallback. """
 
-        self.assertEqual(3, len(result.keys()))
-        self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
-        self.assertEqual("11111", result['data'][0]['zip'])
-        self.assertEqual("http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                         result['data'][0]['website'])
-        self.assertEqual("yawoen", result['data'][0]['name'])
+        result = self._data_process.retrieve(name='yawoen', addresszip=' 11111')
 
-    def test_retrieve_success_next_by_name_and_zip(self):
-        """ Tests success of the process retrieves next page (search by name and zip). """
-
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 1,
-                "hits": [
-                    {
-                        "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
-                        "_source": {
-                            "zip": "22222",
-                            "website": "http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                            "name": "yawoen"
-                        }
-                    }
-                ]
-            }
-        }
+        self.assertEqual('id', result['path'])
+        self.assertEqual(1, result['count'])
+        self.assertIsNone(result['cursor'])
+        self.assertEqual({"id": DataProcess._create_hash_line(['yawoen', '11111']), "name": "yawoen",
+                          "zip": "11111", "website": WEBSITE}, result['data'][0])
+
+        # Not found by id (the name is not exact), fuzzy requested
+        for name, fuzzy in (('Yawoen', False), ('yawoen', True)):
+            result = self._data_process.retrieve(name=name, addresszip='11111', fuzzy=fuzzy)
+
+            self.assertEqual('search', result['path'])
+            self.assertEqual('yawoen', result['data'][0]['name'])
 
-        self._data_process._elastic_search.scroll = mock.MagicMock(return_value=elastic_mock_result)
+    def test_retrieve_by_id_cache(self):
+        """ The exact lookups are cached by the name as is. """
 
-        result = self._data_process.retrieve(name='yawoen', addresszip='22222', scroll_id='next_page_hash')
+        elastic_search = mock.MagicMock()
+        elastic_search.get.return_value = {"_id": "1", "found": True, "_source": {"name": "yawoen", "zip": "11111"}}
+        elastic_search.search.return_value = {"hits": {"total": 0, "hits": []}}
+        _data_process = DataProcess(elastic_search, QueryCache(max_entries=10, max_bytes=1024, ttl_seconds=60))
+
+        self.assertEqual('id', _data_process.retrieve(name='yawoen', addresszip='11111')['path'])
+        self.assertEqual('id', _data_process.retrieve(name='yawoen', addresszip='11111')['path'])
+        self.assertEqual(1, elastic_search.get.call_count)
+        self.assertEqual(['name', 'zip', 'website'], elastic_search.get.call_args[1]['_source'])
+
+        elastic_search.get.return_value = {"_id": "2", "found": False}
+        self.assertEqual('search', _data_process.retrieve(name='Yawoen', addresszip='11111')['path'])
+        self.assertEqual(1, elastic_search.search.call_count)
+
+    def test_retrieve_success_next_by_name_and_zip(self):
+        """ Tests success of the process retrieves next page (scroll, search by name and zip). """
+
+        result = self._data_process.retrieve(name='yawoen group', addresszip=None, scroll=True, size=1)
 
-        self.assertEqual(3, len(result.keys()))
         self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
-        self.assertEqual("22222", result['data'][0]['zip'])
-        self.assertEqual("http://www.yawoen.com/locations/pennsylvania/lancaster/17602/16738",
-                         result['data'][0]['website'])
-        self.assertEqual("yawoen", result['data'][0]['name'])
+        self.assertEqual(2, result['count'])
+        first = result['data'][0]['name']
+
+        result = self._data_process.retrieve(name='yawoen group', addresszip=None, scroll_id=result['scroll'])
+
+        self.assertEqual(1, len(result['data']))
+        self.assertEqual({'group', 'yawoen'}, {first, result['data'][0]['name']})
+
+        result = self._data_process.retrieve(name='yawoen group', addresszip=None, scroll_id=result['scroll'])
+        self.assertEqual(0, len(result['data']))
 
     def test_retrieve_not_found_by_name_and_zip(self):
         """ Not found data test. """
 
-        elastic_mock_result = {
-            "_scroll_id": "next_page_hash",
-            "hits": {
-                "total": 0,
-                "hits": []
-            }
+        result = self._data_process.retrieve(name='yawoen', addresszip='22222')
+
+        self.assertEqual(4, len(result.keys()))
+        self.assertEqual(['count', 'cursor', 'data', 'path'], sorted(result.keys()))
+        self.assertEqual(0, len(result['data']))
+        self.assertEqual(0, result['count'])
+
+    def test_retrieve_cursor_pages(self):
+        """ Tests the cursor of the next page (search_after). """
+
+        result = self._data_process.retrieve(name=None, addresszip=None, size=1)
+        self.assertIsNotNone(result['cursor'])
+        self.assertEqual(1, len(result['data']))
+        first = result['data'][0]['name']
+
+        result = self._data_process.retrieve(name=None, addresszip=None, cursor=result['cursor'], size=1)
+        self.assertEqual(1, len(result['data']))
+        self.assertNotEqual(first, result['data'][0]['name'])
+
+        result = self._data_process.retrieve(name=None, addresszip=None, cursor=result['cursor'], size=1)
+        self.assertIsNone(result['cursor'])
+        self.assertEqual(0, len(result['data']))
+
+    def test_retrieve_cursor_query_dsl(self):
+        """ Tests the sort and search_after sent to ElasticSearch. """
+
+        hit = {
+            "_id": "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9",
+            "_source": {"zip": "11111", "website": None, "name": "yawoen"},
+            "sort": [1.5, "b3a5f3b3f59aae1c92a99c0b57964c9b8324c6abbc66edb8ba6bc1dfdbdf7de9"]
         }
+        elastic_search = mock.MagicMock()
+        elastic_search.search.return_value = {"hits": {"total": 2, "hits": [hit]}}
+        _data_process = DataProcess(elastic_search, QueryCache(max_entries=0))
 
-        self._data_process._elastic_search.search = mock.MagicMock(return_value=elastic_mock_result)
+        result = _data_process.retrieve(name='yawoen', addresszip=None, size=1)
+        self.assertIsNotNone(result['cursor'])
+        self.assertEqual(1, elastic_search.search.call_args[1]['size'])
 
-        result = self._data_process.retrieve(name='yawoen', addresszip='22222')
+        elastic_search.search.return_value = {"hits": {"total": 2, "hits": []}}
+        result = _data_process.retrieve(name='yawoen', addresszip=None, cursor=result['cursor'], size=1)
 
-        self.assertEqual(3, len(result.keys()))
-        self.assertEqual(['count', 'data', 'scroll'], sorted(result.keys()))
+        body = elastic_search.search.call_args[1]['body']
+        self.assertEqual(hit['sort'], body['search_after'])
+        self.assertEqual([{"_score": "desc"}, {Config.ELASTICSEARCH_SORT_FIELD: "asc"}], body['sort'])
+        self.assertIsNone(result['cursor'])
         self.assertEqual(0, len(result['data']))
-        self.assertEqual(0, result['count'])
+
+    def test_retrieve_invalid_cursor(self):
+        """ Invalid cursor test. """
+
+        with self.assertRaises(InvalidCursorError):
+            self._data_process.retrieve(name='yawoen', addresszip=None, cursor='invalid')
+
+        # Well-formed cursors (base64 of JSON) without the sort values of a page
+        for sort_values in ([], [1.5], [1.5, "id", 1], ["1.5", "id"], [True, "id"], [1.5, 2], {"a": 1}, None):
+            with self.assertRaises(InvalidCursorError):
+                self._data_process.retrieve(name='yawoen', addresszip=None,
+                                            cursor=DataProcess._encode_cursor(sort_values))
+
+    def test_retrieve_cache(self):
+        """ Results are cached until the database is updated. """
+
+        elastic_mock_result = {"hits": {"total": 0, "hits": []}}
+        elastic_search = mock.MagicMock()
+        elastic_search.search.return_value = elastic_mock_result
+        _data_process = DataProcess(elastic_search, QueryCache(max_entries=10, max_bytes=1024, ttl_seconds=60))
+        _data_process._update_bulk_database = mock.MagicMock(return_value={"updated": 0, "not_found": 0, "failed": 0})
+
+        _data_process.retrieve(name='Yawoen ', addresszip=None)
+        _data_process.retrieve(name='yawoen', addresszip=None)
+        self.assertEqual(1, elastic_search.search.call_count)
+
+        _data_process.update([])
+        _data_process.retrieve(name='yawoen', addresszip=None)
+        self.assertEqual(2, elastic_search.search.call_count)
+
+    def test_retrieve_cache_zip_case(self):
+        """ The zip is case sensitive: the lowercase and uppercase queries are cached apart. """
+
+        _data_process = DataProcess(query_cache=QueryCache(max_entries=10, max_bytes=4096, ttl_seconds=60),
+                                    backend=MemoryBackend())
+        _data_process.restore(["name;addressZip\n", "yawoen;AB12\n"])
+
+        self.assertEqual(0, _data_process.retrieve(None, 'ab12')['count'])
+        self.assertEqual(1, _data_process.retrieve(None, 'AB12')['count'])
+        self.assertEqual(1, _data_process.retrieve(None, ' AB12 ')['count'])
+
+    def test_export(self):
+        """ All objects, or the objects of a search, read page by page. """
+
+        with mock.patch.object(self._data_process, '_export_page_size', 1):
+            objects = list(self._data_process.export(slices=1))
+
+        self.assertEqual(['group', 'yawoen'], sorted(item['name'] for item in objects))
+        self.assertEqual(['id', 'name', 'website', 'zip'], sorted(objects[0].keys()))
+        self.assertEqual(['yawoen'], [item['name'] for item in self._data_process.export(addresszip='11111')])
+
+    @mock.patch("integration.elasticsearch_backend.helpers.scan")
+    def test_export_scan(self, mock_scan):
+        """ ElasticSearch objects are read with a sliced scan (scroll sorted by _doc). """
+
+        mock_scan.side_effect = lambda client, query, **kwargs: iter([
+            {"_id": str(query['slice']['id']), "_source": {"name": "yawoen", "zip": "11111", "website": None}}
+        ])
+        elastic_search = mock.MagicMock()
+        _data_process = DataProcess(elastic_search, QueryCache(max_entries=0))
+
+        self.assertEqual([{"id": "0", "name": "yawoen", "zip": "11111", "website": None},
+                          {"id": "1", "name": "yawoen", "zip": "11111", "website": None}],
+                         list(_data_process.export(name='yawoen', slices=2, ordered=True)))
+        self.assertEqual(2, mock_scan.call_count)
+
+        kwargs = mock_scan.call_args[1]
+        self.assertEqual(Config.EXPORT_PAGE_SIZE, kwargs['size'])
+        self.assertEqual(True, kwargs['preserve_order'])
+        self.assertEqual({"id": 1, "max": 2}, kwargs['query']['slice'])
+        self.assertEqual([{Config.ELASTICSEARCH_SORT_FIELD: "asc"}], kwargs['query']['sort'])
+        self.assertEqual({"match": {"name": "yawoen"}}, kwargs['query']['query']['bool']['must'][0])
+
+        # Legacy index (dynamic mapping): the sort field is configured
+        with mock.patch.object(Config, 'ELASTICSEARCH_SORT_FIELD', 'hash_object.keyword'):
+            _data_process = DataProcess(elastic_search, QueryCache(max_entries=0))
+
+        list(_data_process.export(name='yawoen', slices=2, ordered=True))
+        self.assertEqual([{"hash_object.keyword": "asc"}], mock_scan.call_args[1]['query']['sort'])
+
+    def test_lookup(self):
+        """ Results in the order of the items: by id, by search or not found. """
+
+        result = self._data_process.lookup([{"name": "group", "zip": "22222"},
+                                            {"name": "Yawoen", "zip": "11111"},
+                                            {"name": "unknown", "zip": "33333"},
+                                            {"name": "group ", "zip": " 22222"},
+                                            {"name": "yawoen group"}])
+
+        self.assertEqual(['exact', 'fuzzy', 'miss', 'exact', 'fuzzy'],
+                         [item['match'] for item in result['results']])
+        self.assertEqual({"exact": 2, "fuzzy": 2, "miss": 1, "error": 0}, result['count'])
+        self.assertEqual(DataProcess._create_hash_line(['group', '22222']), result['results'][0]['data'][0]['id'])
+        self.assertEqual('yawoen', result['results'][1]['data'][0]['name'])
+        self.assertEqual([], result['results'][2]['data'])
+        self.assertEqual(1, len(result['results'][4]['data']))
+
+        result = self._data_process.lookup([{"name": "Yawoen", "zip": "11111"}], fuzzy=False)
+        self.assertEqual('miss', result['results'][0]['match'])
+
+    def test_lookup_invalid(self):
+        for items in (None, [{"zip": "11111"}], [{"name": "group", "zip": 22222}], ["group"]):
+            with self.assertRaises(InvalidLookupError):
+                self._data_process.lookup(items)
+
+        with mock.patch.object(self._data_process, '_lookup_max_items', 1):
+            with self.assertRaises(InvalidLookupError):
+                self._data_process.lookup([{"name": "group"}, {"name": "yawoen"}])
+
+        with self.assertRaises(InvalidLookupSizeError):
+            self._data_process.lookup([{"name": "group"}], size=Config.LOOKUP_SIZE_MAX + 1)
+
+    def test_lookup_batches(self):
+        """ Ids read with mget, the other items searched with msearch (in batches). """
+
+        document_id = DataProcess._create_hash_line(['yawoen', '11111'])
+        elastic_search = mock.MagicMock()
+        elastic_search.mget.return_value = {"docs": [
+            {"_id": document_id, "found": True, "_source": {"name": "yawoen", "zip": "11111", "website": None}},
+            {"_id": DataProcess._create_hash_line(['group', '11111']), "found": False}
+        ]}
+        elastic_search.msearch.side_effect = lambda body, **kwargs: {"responses": [
+            {"hits": {"total": 0, "hits": []}}, {"error": {"type": "search_phase_execution_exception"}}
+        ][:len(body) // 2]}
+        _data_process = DataProcess(elastic_search, QueryCache(max_entries=0))
+        _data_process._lookup_msearch_batch_size = 1
+
+        result = _data_process.lookup([{"name": "yawoen", "zip": "11111"}, {"name": "group", "zip": "11111"},
+                                       {"name": "group"}])
+
+        self.assertEqual(['exact', 'miss', 'miss'], [item['match'] for item in result['results']])
+        self.assertEqual(1, elastic_search.mget.call_count)
+        self.assertEqual(2, len(elastic_search.mget.call_args[1]['body']['ids']))
+        self.assertEqual(2, elastic_search.msearch.call_count)
+
+        body = elastic_search.msearch.call_args[1]['body']
+        self.assertEqual({}, body[0])
+        self.assertEqual(1, body[1]['size'])
+        self.assertEqual({"match": {"name": "group"}}, body[1]['query']['bool']['must'][0])
 
     def test_connection_error(self):
         """ Connection error test. """
@@ -208,9 +320,70 @@ class DataProcessTest(TestCase):
 
         try:
             _data_process = DataProcess()
+            _data_process.bootstrap()
         except Exception as err:
             self.assertEqual(True, isinstance(err, ConnectionElasticSearchError))
 
+    def test_bootstrap_once(self):
+        """ The index is created only on the first bootstrap. """
+
+        elastic_search = mock.MagicMock()
+        _data_process = DataProcess(elastic_search)
+
+        _data_process.bootstrap()
+        _data_process.bootstrap()
+
+        self.assertEqual(1, elastic_search.indices.create.call_count)
+
+    def test_bootstrap_index_definition(self):
+        """ The index is created with explicit mappings. """
+
+        elastic_search = mock.MagicMock()
+        _data_process = DataProcess(elastic_search)
+
+        _data_process.bootstrap()
+
+        body = elastic_search.indices.create.call_args[1]['body']
+        properties = body['mappings'][Config.ELASTICSEARCH_DOCUMENT_TYPE]['properties']
+        self.assertEqual('company_name', properties['name']['analyzer'])
+        self.assertEqual('keyword', properties['zip']['type'])
+        self.assertEqual(False, properties['website']['index'])
+        self.assertEqual('keyword', properties['hash_object']['type'])
+
+    def test_query_dsl(self):
+        """ Name is a scored match, zip an exact filter. """
+
+        query_dsl = self._data_process._get_query_dsl('yawoen', ' 78229 ')
+
+        self.assertEqual([{"match": {"name": "yawoen"}}], query_dsl['query']['bool']['must'])
+        self.assertEqual([{"term": {"zip": "78229"}}], query_dsl['query']['bool']['filter'])
+        self.assertEqual(False, 'query' in self._data_process._get_query_dsl(None, None))
+
+    def test_restore_bulk_load_settings(self):
+        """ Refresh and replicas are disabled during the restore, then restored from the index definition. """
+
+        f = open('/tmp/inputDataSettings.csv', 'w')
+        f.write("name;addressZip\n")
+        f.write("group;78229\n")
+        f.close()
+
+        elastic_search = mock.MagicMock()
+        # Left by a failed import
+        elastic_search.indices.get_settings.return_value = {
+            Config.ELASTICSEARCH_INDEX: {"settings": {"index": {"refresh_interval": "-1", "number_of_replicas": "0"}}}}
+        _data_process = DataProcess(elastic_search)
+        _data_process._backend._bulk_load_settings_enabled = True
+        _data_process._count_database = mock.MagicMock(return_value=0)
+        _data_process._insert_bulk_database = mock.MagicMock(return_value=(1, 0))
+
+        _data_process.restore('/tmp/inputDataSettings.csv')
+
+        calls = [call[1]['body'] for call in elastic_search.indices.put_settings.call_args_list]
+        self.assertEqual([{"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+                          {"index": {"refresh_interval": None,
+                                     "number_of_replicas": Config.ELASTICSEARCH_NUMBER_OF_REPLICAS}}], calls)
+        self.assertEqual(1, elastic_search.indices.refresh.call_count)
+
     def test_success_restore(self):
         """ Tests file recovery successfully. """
 
@@ -222,10 +395,12 @@ class DataProcessTest(TestCase):
         f.close()
 
         self._data_process._count_database = mock.MagicMock(return_value=0)
-        self._data_process._insert_bulk_database = mock.MagicMock(return_value=None)
+        self._data_process._insert_bulk_database = mock.MagicMock(return_value=(3, 0))
 
         result = self._data_process.restore('/tmp/inputData.csv')
-        self.assertEqual("File successfully processed.", result)
+        self.assertEqual("File successfully processed.", result['message'])
+        self.assertEqual(3, result['indexed'])
+        self.assertEqual(0, result['failed'])
 
     def test_ignored_invalid_lines_restore(self):
         """ Tests file recovery successfully (ignored invalid lines). """
@@ -238,17 +413,89 @@ class DataProcessTest(TestCase):
         f.close()
 
         self._data_process._count_database = mock.MagicMock(return_value=0)
-        self._data_process._insert_bulk_database = mock.MagicMock(return_value=None)
+        self._data_process._insert_bulk_database = mock.MagicMock(return_value=(2, 0))
 
         # Ignored invalid lines
         result = self._data_process.restore('/tmp/inputData.csv')
-        self.assertEqual("File successfully processed.", result)
+        self.assertEqual("File successfully processed.", result['message'])
+
+        rejected = RejectedRows()
+
+        with open('/tmp/inputData.csv') as file_object:
+            data = list(self._data_process._read_lines(file_object, rejected))
+
+        self.assertEqual(2, len(data))
+        self.assertEqual(['group', 'yawoen group'], [item['name'] for item in data])
+        self.assertEqual(1, rejected.count)
+        self.assertEqual(3, rejected.rows[0]['line'])
+        self.assertEqual("foundation", rejected.rows[0]['content'])
+
+    def test_rejected_rows_report(self):
+        """ Rejected rows are counted, only the first ones are kept. """
+
+        f = open('/tmp/inputData.csv', 'w')
+        f.write("name;addressZip\n")
+        f.write("group;78229;http://group.com\n")
+        f.write("foundation\n")
+        f.write("yawoen group;30078\n")
+        f.close()
+
+        self._data_process._count_database = mock.MagicMock(return_value=0)
+        self._data_process._insert_bulk_database = mock.MagicMock(
+            side_effect=lambda data, acknowledge=None: (len(list(data)), 0))
+
+        with mock.patch.object(Config, 'REJECTED_ROWS_LIMIT', 1):
+            result = self._data_process.restore('/tmp/inputData.csv')
+
+        self.assertEqual(1, result['indexed'])
+        self.assertEqual(2, result['rejected']['count'])
+        self.assertEqual([{"line": 2, "reason": "Expected 2 columns, found 3.", "content": "group;78229;http://group.com"}],
+                         result['rejected']['rows'])
+
+    def test_process_line(self):
+        """ Process a line with the column plan of the header. """
+
+        plan = DataProcess._process_header("Name; addressZip ;Website\n")
+        result = DataProcess._process_line(" yawoen group ;30078;\n", plan)
+
+        self.assertEqual(('name', 'zip', 'website'), plan.keys)
+        self.assertEqual({"name": "yawoen group", "zip": "30078", "website": None,
+                          "hash_object": DataProcess._create_hash_line(["yawoen group", "30078"]),
+                          "content_hash": DataProcess._create_content_hash("name;website;zip",
+                                                                           ["yawoen group", "", "30078"])}, result)
+        self.assertIsNone(DataProcess._process_line("yawoen group;30078\n", plan))
+
+    def test_content_hash(self):
+        """ The content hash doesn't depend on the order of the columns. """
+
+        plan = DataProcess._process_header("name;addressZip;website\n")
+        reordered = DataProcess._process_header("website;name;addressZip\n")
+
+        self.assertEqual(DataProcess._process_line("yawoen;30078;http://yawoen.com\n", plan)['content_hash'],
+                         DataProcess._process_line("http://yawoen.com;yawoen;30078\n", reordered)['content_hash'])
+        self.assertNotEqual(DataProcess._process_line("yawoen;30078;http://yawoen.com\n", plan)['content_hash'],
+                            DataProcess._process_line("yawoen;30078;http://yawoen.com.br\n", plan)['content_hash'])
+
+    @mock.patch("integration.elasticsearch_backend.helpers.streaming_bulk")
+    @mock.patch("integration.elasticsearch_backend.helpers.parallel_bulk")
+    def test_insert_bulk_database_counts(self, mock_parallel_bulk, mock_streaming_bulk):
+        """ Tests the count of indexed and failed objects on bulk insert. """
+
+        bulk_result = [(True, {}), (False, {}), (True, {})]
+        mock_parallel_bulk.return_value = iter(bulk_result)
+        mock_streaming_bulk.return_value = iter(bulk_result)
+
+        data = ({'name': 'group', 'zip': '78229', 'hash_object': str(i)} for i in range(3))
+        indexed, failed = DataProcess()._insert_bulk_database(data)
+
+        self.assertEqual(2, indexed)
+        self.assertEqual(1, failed)
 
     def test_fail_process_restore(self):
         """File recovery fail test. """
 
         self._data_process._count_database = mock.MagicMock(return_value=0)
-        self._data_process._insert_bulk_database = mock.MagicMock(return_value=None)
+        self._data_process._insert_bulk_database = mock.MagicMock(return_value=(0, 0))
 
         try:
             result = self._data_process.restore('/tmp/inputDataNotFound.csv')
@@ -275,15 +522,39 @@ class DataProcessTest(TestCase):
         f.write("yawoen group;30078;http://yawoen.com\n")
         f.close()
 
-        self._data_process._update_database = mock.MagicMock(return_value=None)
+        self._data_process._update_bulk_database = mock.MagicMock(
+            return_value={"updated": 2, "not_found": 1, "failed": 0})
 
         result = self._data_process.update('/tmp/inputDataUpdate.csv')
-        self.assertEqual("File successfully processed.", result)
+        self.assertEqual("File successfully processed.", result['message'])
+        self.assertEqual(2, result['updated'])
+        self.assertEqual(1, result['not_found'])
+        self.assertEqual(0, result['failed'])
+        self.assertTrue(result['rows_per_second'] > 0)
+
+    @mock.patch("integration.elasticsearch_backend.helpers.streaming_bulk")
+    @mock.patch("integration.elasticsearch_backend.helpers.parallel_bulk")
+    def test_update_bulk_database_report(self, mock_parallel_bulk, mock_streaming_bulk):
+        """ Tests the report of updated, not found and failed objects on bulk update. """
+
+        bulk_result = [
+            (True, {"update": {"status": 200}}),
+            (False, {"update": {"status": 404}}),
+            (False, {"update": {"status": 400}}),
+            (True, {"update": {"status": 200}})
+        ]
+        mock_parallel_bulk.return_value = iter(bulk_result)
+        mock_streaming_bulk.return_value = iter(bulk_result)
+
+        data = ({'name': 'group', 'zip': '78229', 'hash_object': str(i)} for i in range(4))
+        result = DataProcess()._update_bulk_database(data)
+
+        self.assertEqual({"updated": 2, "not_found": 1, "failed": 1}, result)
 
     def test_fail_process_update(self):
         """Update database fail test. """
 
-        self._data_process._update_database = mock.MagicMock(return_value=None)
+        self._data_process._update_bulk_database = mock.MagicMock(return_value=None)
 
         try:
             result = self._data_process.update('/tmp/inputDataNotFound.csv')
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""Test Deduplication"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from unittest import TestCase
+
+from integration.data_process import DataProcess
+from integration.deduplication import BloomFilter, Deduplicator, PendingRows, SeenIds
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+RESTORE = ["name;addressZip;website\n",
+           "yawoen;11111;http://yawoen.com\n",
+           "group;22222;\n",
+           "yawoen;11111;\n",
+           "group;22222;http://group.com\n",
+           "foundation;33333;\n"]
+
+
+class DeduplicationTest(TestCase):
+    """Test Deduplication"""
+
+    def _restore(self, policy):
+        data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+        result = data_process.restore(RESTORE, dedupe=policy)
+
+        websites = {item['name']: item['website'] for item in data_process.retrieve(None, None, size=10)['data']}
+
+        return result, websites
+
+    def test_first(self):
+        """ The first row wins. """
+
+        result, websites = self._restore('first')
+
+        self.assertEqual(3, result['indexed'])
+        self.assertEqual({"policy": "first", "rows": 2, "ids": 2, "resent": 0}, result['duplicates'])
+        self.assertEqual({'yawoen': 'http://yawoen.com', 'group': None, 'foundation': None}, websites)
+
+    def test_last(self):
+        """ The last row wins (written again at the end). """
+
+        result, websites = self._restore('last')
+
+        self.assertEqual(3, result['indexed'])
+        self.assertEqual({"policy": "last", "rows": 2, "ids": 2, "resent": 2}, result['duplicates'])
+        self.assertEqual({'yawoen': None, 'group': 'http://group.com', 'foundation': None}, websites)
+
+    def test_merge(self):
+        """ The non-empty fields of the duplicates are merged. """
+
+        result, websites = self._restore('merge')
+
+        self.assertEqual(3, result['indexed'])
+        self.assertEqual(0, result['failed'])
+        self.assertEqual({"policy": "merge", "rows": 2, "ids": 2, "resent": 2}, result['duplicates'])
+        self.assertEqual({'yawoen': 'http://yawoen.com', 'group': 'http://group.com', 'foundation': None}, websites)
+
+    def test_none(self):
+        """ No deduplication. """
+
+        result, websites = self._restore('none')
+
+        self.assertEqual(5, result['indexed'])
+        self.assertNotIn('duplicates', result)
+
+    def test_seen_ids_over_exact_limit(self):
+        """ Over the exact limit, the ids are checked in the Bloom filter and in the temporary table. """
+
+        ids = [hashlib.sha256(str(item).encode('ascii')).hexdigest() for item in range(2000)]
+        seen = SeenIds(exact_limit=100, capacity=1000, error_rate=0.01, directory=tempfile.mkdtemp())
+
+        self.assertFalse(any(seen.add(document_id) for document_id in ids))
+        self.assertTrue(all(seen.add(document_id) for document_id in ids))
+        self.assertGreaterEqual(seen.checks, 1900)
+
+        seen.close()
+
+    def test_deduplicator_over_limits_in_thread(self):
+        """ The temporary tables are used by a worker thread (e.g. parallel_bulk) and closed by the request thread. """
+
+        directory = tempfile.mkdtemp()
+        ids = [hashlib.sha256(str(item).encode('ascii')).hexdigest() for item in range(500)]
+        rows = [{'hash_object': document_id, 'website': None} for document_id in ids]
+        rows += [{'hash_object': document_id, 'website': document_id[:8]} for document_id in ids]
+        deduplicator = Deduplicator('merge',
+                                    seen=SeenIds(exact_limit=10, capacity=1000, error_rate=0.01, directory=directory),
+                                    duplicated=SeenIds(exact_limit=10, capacity=1000, error_rate=0.01,
+                                                       directory=directory),
+                                    pending=PendingRows(memory_limit=10, directory=directory))
+        result = {}
+
+        def consume():
+            result['unique'] = list(deduplicator.unique_rows(rows))
+            result['tail'] = list(deduplicator.tail())
+
+        worker = threading.Thread(target=consume)
+        worker.start()
+        worker.join()
+
+        self.assertEqual(500, len(result['unique']))
+        self.assertEqual({document_id: document_id[:8] for document_id in ids},
+                         {row['hash_object']: row['website'] for row in result['tail']})
+        self.assertEqual({"policy": "merge", "rows": 500, "ids": 500, "resent": 0}, deduplicator.to_dict())
+
+        deduplicator.close()
+
+        self.assertEqual([], os.listdir(directory))
+
+    def test_pending_rows_spilled(self):
+        """ Over the memory limit, the rows are kept in the temporary table. """
+
+        pending = PendingRows(memory_limit=2, directory=tempfile.mkdtemp())
+
+        for item in range(5):
+            pending.set(str(item), {'value': item})
+
+        pending.set('4', {'value': 40})
+
+        self.assertEqual({'value': 40}, pending.get('4'))
+        self.assertIsNone(pending.get('5'))
+        self.assertEqual([0, 1, 2, 3, 40], sorted(row['value'] for row in pending.pop_all()))
+        self.assertEqual([], list(pending.pop_all()))
+
+        pending.close()
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        ids = [hashlib.sha256(str(item).encode('ascii')).hexdigest() for item in range(2000)]
+
+        self.assertEqual(7, bloom.hashes)
+        self.assertLess(sum(bloom.add(document_id) for document_id in ids[:1000]), 20)
+        self.assertTrue(all(document_id in bloom for document_id in ids[:1000]))
+        self.assertLess(sum(document_id in bloom for document_id in ids[1000:]), 30)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Test Delta Ingestion"""
+
+import os
+import tempfile
+
+from unittest import TestCase, mock
+
+from config.default import Config
+from controller.custom.custom_api_error import ManifestLockedError
+from integration.data_process import DataProcess
+from integration.delta import ContentManifest
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+RESTORE = ["name;addressZip;website\n",
+           "yawoen;11111;http://yawoen.com\n",
+           "group;22222;http://group.com\n",
+           "foundation;33333;\n"]
+
+UPDATE = ["name;addressZip;website\n",
+          "yawoen;11111;http://yawoen.com\n",
+          "group;22222;http://group.com.br\n",
+          "new company;44444;\n"]
+
+
+class DeltaTest(TestCase):
+    """Test Delta Ingestion"""
+
+    def _create_data_process(self, delta_mode):
+        directory = tempfile.mkdtemp()
+
+        with mock.patch.multiple(Config, DELTA_MODE=delta_mode,
+                                 DELTA_MANIFEST_PATH=os.path.join(directory, 'manifest')):
+            data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+
+        data_process.restore(RESTORE)
+
+        # Record the rows written by the updates
+        self._written = []
+        update_documents = data_process._backend.update_documents
+        data_process._backend.update_documents = lambda documents: update_documents(
+            self._written.append(document['name']) or document for document in documents)
+
+        return data_process
+
+    def _assert_delta(self, data_process):
+        result = data_process.update(UPDATE, delta=True)
+
+        self.assertEqual({"new": 1, "changed": 1, "unchanged": 1, "missing": 1}, result['delta'])
+        self.assertEqual(1, result['updated'])
+        self.assertEqual(0, result['not_found'])
+
+        self.assertEqual(['group'], self._written)
+
+        website = data_process.retrieve(name='group', addresszip='22222')['data'][0]['website']
+        self.assertEqual('http://group.com.br', website)
+
+        # The same file again: nothing changed
+        result = data_process.update(UPDATE, delta=True)
+        self.assertEqual({"new": 1, "changed": 0, "unchanged": 2, "missing": 1}, result['delta'])
+        self.assertEqual(0, result['updated'])
+        self.assertEqual(['group'], self._written)
+
+    def test_delta_mget(self):
+        """ Current content hashes read from the database. """
+
+        self._assert_delta(self._create_data_process('mget'))
+
+    def test_delta_manifest(self):
+        """ Current content hashes read from the manifest of the imports. """
+
+        data_process = self._create_data_process('manifest')
+
+        data_process._manifest.open()
+        self.assertEqual(3, len(data_process._manifest))
+        data_process._manifest.close()
+
+        self._assert_delta(data_process)
+
+    def test_delta_manifest_locked(self):
+        """ A single import writes the manifest at a time. """
+
+        data_process = self._create_data_process('manifest')
+        other = ContentManifest(data_process._manifest._path)
+        other.open()
+
+        with self.assertRaises(ManifestLockedError):
+            data_process.update(UPDATE, delta=True)
+
+        other.close()
+
+        self.assertEqual(1, data_process.update(UPDATE, delta=True)['updated'])
+
+    def test_update_without_delta(self):
+        """ All rows are written. """
+
+        data_process = self._create_data_process('mget')
+        result = data_process.update(UPDATE)
+
+        self.assertEqual(2, result['updated'])
+        self.assertEqual(1, result['not_found'])
+        self.assertNotIn('delta', result)
+
+    def test_manifest(self):
+        """ The manifest is persisted. """
+
+        path = os.path.join(tempfile.mkdtemp(), 'manifest')
+        manifest = ContentManifest(path)
+        manifest.open()
+        manifest.set('a', '1')
+        manifest.close()
+
+        manifest.open()
+        self.assertEqual({'a': '1'}, manifest.get_many(['a', 'b']))
+        manifest.close()
+
+        manifest.open(new=True)
+        self.assertEqual(0, len(manifest))
+        manifest.close()
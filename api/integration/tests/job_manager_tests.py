@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Test Job Manager"""
+
+import os
+import tempfile
+import threading
+
+from unittest import TestCase, mock
+
+from controller.custom.custom_api_error import JobNotFoundError, JobQueueFullError, ProcessFileError
+from integration.data_process import DataProcess
+from integration.job_manager import Job, JobManager
+from integration.memory_backend import MemoryBackend
+from integration.query_cache import QueryCache
+
+
+class JobManagerTest(TestCase):
+    """Test Job Manager Class"""
+
+    def _input_file(self):
+        file_descriptor, path = tempfile.mkstemp(suffix='.csv')
+
+        with os.fdopen(file_descriptor, 'w') as file_object:
+            file_object.write("name;addressZip\n")
+            file_object.write("group;78229\n")
+            file_object.write("yawoen group;30078\n")
+
+        return path
+
+    def test_success_job(self):
+        """ Job executed successfully. """
+
+        data_process = mock.MagicMock()
+        data_process.restore.side_effect = lambda lines: {"indexed": len(list(lines)) - 1, "failed": 0}
+        job_manager = JobManager(data_process, workers=1)
+
+        path = self._input_file()
+        job = job_manager.submit('restore', path)
+        job.future.result()
+
+        status = job_manager.get(job.id).to_dict()
+        self.assertEqual(Job.SUCCEEDED, status['state'])
+        self.assertEqual(2, status['rows'])
+        self.assertEqual(status['total_bytes'], status['bytes_read'])
+        self.assertEqual({"indexed": 2, "failed": 0}, status['result'])
+        self.assertFalse(os.path.exists(path))
+
+    def test_failed_job(self):
+        """ Job with error. """
+
+        data_process = mock.MagicMock()
+        data_process.update.side_effect = ProcessFileError()
+        job_manager = JobManager(data_process, workers=1)
+
+        job = job_manager.submit('update', self._input_file())
+        job.future.result()
+
+        self.assertEqual(Job.FAILED, job.state)
+        self.assertEqual("Failed to process file.", job.error)
+
+    def test_cancel_jobs(self):
+        """ Cancel running and pending jobs. """
+
+        started, release = threading.Event(), threading.Event()
+
+        def restore(lines):
+            for _ in lines:
+                started.set()
+                release.wait(5)
+
+        data_process = mock.MagicMock()
+        data_process.restore.side_effect = restore
+        job_manager = JobManager(data_process, workers=1)
+
+        running = job_manager.submit('restore', self._input_file())
+        pending = job_manager.submit('restore', self._input_file())
+        started.wait(5)
+
+        job_manager.cancel(pending.id)
+        job_manager.cancel(running.id)
+        release.set()
+        running.future.result()
+
+        self.assertEqual(Job.CANCELLED, pending.state)
+        self.assertEqual(Job.CANCELLED, running.state)
+
+    def test_max_pending_jobs(self):
+        """ Too many pending jobs. """
+
+        release = threading.Event()
+        data_process = mock.MagicMock()
+        data_process.restore.side_effect = lambda lines: release.wait(5)
+        job_manager = JobManager(data_process, workers=1, max_pending=1)
+
+        job_manager.submit('restore', self._input_file())
+        job_manager.submit('restore', self._input_file())
+
+        try:
+            with self.assertRaises(JobQueueFullError):
+                job_manager.check_capacity()
+
+            with self.assertRaises(JobQueueFullError):
+                job_manager.submit('restore', self._input_file())
+        finally:
+            release.set()
+
+    def test_retention(self):
+        """ Finished jobs are removed after the retention time. """
+
+        job_manager = JobManager(mock.MagicMock(), workers=1, retention_seconds=0)
+
+        job = job_manager.submit('restore', self._input_file())
+        job.future.result()
+        job.finished_at -= 1
+
+        with self.assertRaises(JobNotFoundError):
+            job_manager.get(job.id)
+
+    def test_parallel_parse_job(self):
+        """ The input file of a job is parsed in parallel (PARSE_WORKERS), the progress is updated by range. """
+
+        data_process = DataProcess(query_cache=QueryCache(max_entries=0), backend=MemoryBackend())
+        data_process._parse_workers = 2
+        data_process._parse_chunk_bytes = 10
+        job_manager = JobManager(data_process, workers=1)
+
+        with mock.patch.object(data_process, '_read_lines', side_effect=AssertionError("parsed line by line")):
+            job = job_manager.submit('restore', self._input_file())
+            job.future.result()
+
+        status = job.to_dict()
+        self.assertEqual(Job.SUCCEEDED, status['state'])
+        self.assertEqual(2, status['result']['indexed'])
+        self.assertEqual(2, status['rows'])
+        self.assertEqual(status['total_bytes'], status['bytes_read'])
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""Test Memory Backend"""
+
+from unittest import TestCase
+
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend, analyze
+from integration.storage_backend import create_storage_backend
+
+
+def document(name, addresszip, website=None):
+    return {"name": name, "zip": addresszip, "website": website,
+            "hash_object": DataProcess._create_hash_line([name, addresszip])}
+
+
+class MemoryBackendTest(TestCase):
+    """Test Memory Backend Class"""
+
+    def setUp(self):
+        self._backend = MemoryBackend()
+        list(self._backend.index_documents([document('yawoen group', '11111'),
+                                            document('Yawoen', '22222'),
+                                            document('foundation', '11111')]))
+
+    def test_analyze(self):
+        """ Names are split in lower case terms, without accents. """
+
+        self.assertEqual(['cafe', 'sao', 'paulo'], analyze('Café São-Paulo'))
+
+    def test_search_by_name(self):
+        """ Objects with any term are found, the best match first. """
+
+        result = self._backend.search({"query": {"bool": {"must": [{"match": {"name": "YAWOEN"}}]}}}, 10)
+
+        self.assertEqual(2, result['hits']['total'])
+        self.assertEqual(['Yawoen', 'yawoen group'], [hit['_source']['name'] for hit in result['hits']['hits']])
+
+    def test_search_by_name_and_zip(self):
+        """ zip is an exact filter. """
+
+        body = {"query": {"bool": {"must": [{"match": {"name": "yawoen foundation"}}],
+                                   "filter": [{"term": {"zip": "11111"}}]}}}
+        result = self._backend.search(body, 10)
+
+        self.assertEqual(2, result['hits']['total'])
+        self.assertEqual({'yawoen group', 'foundation'}, {hit['_source']['name'] for hit in result['hits']['hits']})
+
+    def test_search_after(self):
+        """ Pages after the sort values of the last hit. """
+
+        names = []
+        body = {"_source": ["name"]}
+
+        while True:
+            hits = self._backend.search(body, 2)['hits']['hits']
+
+            if not hits:
+                break
+
+            names.extend(hit['_source']['name'] for hit in hits)
+            body['search_after'] = hits[-1]['sort']
+
+        self.assertEqual(['Yawoen', 'foundation', 'yawoen group'], sorted(names))
+        self.assertEqual(3, len(set(names)))
+
+    def test_update_documents(self):
+        """ Partial update of exists objects, not found objects fail with status 404. """
+
+        results = list(self._backend.update_documents([document('foundation', '11111', 'http://foundation.com'),
+                                                       document('foundation', '33333')]))
+
+        self.assertEqual([True, False], [ok for ok, item in results])
+        self.assertEqual(404, results[1][1]['update']['status'])
+        self.assertEqual('http://foundation.com',
+                         self._backend.get(DataProcess._create_hash_line(['foundation', '11111']))['_source']['website'])
+        self.assertEqual(3, self._backend.count())
+
+    def test_replace_document(self):
+        """ Indexing an existing id replaces the object (and its terms). """
+
+        replaced = dict(document('yawoen group', '11111'), name='other')
+        list(self._backend.index_documents([replaced]))
+
+        body = {"query": {"bool": {"must": [{"match": {"name": "group"}}]}}}
+        self.assertEqual(0, self._backend.search(body, 10)['hits']['total'])
+        self.assertEqual(3, self._backend.count())
+
+    def test_create_storage_backend(self):
+        """ Backend created by name. """
+
+        self.assertTrue(isinstance(create_storage_backend('memory'), MemoryBackend))
+
+        with self.assertRaises(ValueError):
+            create_storage_backend('unknown')
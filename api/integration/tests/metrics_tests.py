@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Test Metrics"""
+
+from unittest import TestCase, mock
+
+from integration.connection import InstrumentedElasticsearch
+from integration.metrics import Counter, Gauge, Histogram, MetricsRegistry, BULK_BATCH_DOCUMENTS, \
+    ELASTICSEARCH_SECONDS
+
+
+class MetricsTest(TestCase):
+    """Test Metrics Classes"""
+
+    def test_histogram(self):
+        """ Buckets are cumulative, +Inf is the count. """
+
+        histogram = Histogram('latency_seconds', 'Latency.', ['method'], buckets=(0.1, 1.0))
+        histogram.observe(0.05, 'GET')
+        histogram.observe(0.5, 'GET')
+        histogram.observe(5, 'GET')
+
+        text = histogram.render()
+
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{method="GET",le="0.1"} 1.0', text)
+        self.assertIn('latency_seconds_bucket{method="GET",le="1.0"} 2.0', text)
+        self.assertIn('latency_seconds_bucket{method="GET",le="+Inf"} 3.0', text)
+        self.assertIn('latency_seconds_sum{method="GET"} 5.55', text)
+        self.assertIn('latency_seconds_count{method="GET"} 3.0', text)
+
+    def test_counter_and_gauge(self):
+        """ Counters by labels, gauges read from a function. """
+
+        registry = MetricsRegistry()
+        counter = registry.register(Counter('rows_total', 'Rows.', ['operation']))
+        registry.register(Gauge('jobs', 'Jobs.', ['state'], function=lambda: {('running',): 2}))
+
+        counter.inc(3, 'restore')
+        counter.inc(2, 'restore')
+
+        text = registry.render()
+
+        self.assertIn('rows_total{operation="restore"} 5.0', text)
+        self.assertIn('jobs{state="running"} 2.0', text)
+
+    def test_label_escape(self):
+        """ Label values are escaped. """
+
+        counter = Counter('errors_total', 'Errors.', ['message'])
+        counter.inc(1, 'a "quoted"\nvalue')
+
+        self.assertIn('errors_total{message="a \\"quoted\\"\\nvalue"} 1.0', counter.render())
+
+    def test_instrumented_elasticsearch_bulk(self):
+        """ Bulk requests are measured by operation, with the number of documents. """
+
+        client = InstrumentedElasticsearch()
+        client.transport.perform_request = mock.MagicMock(return_value={"items": []})
+        body = '{"update": {"_id": "1"}}\n{"doc": {}}\n{"update": {"_id": "2"}}\n{"doc": {}}\n'
+
+        before = dict((labels, list(counts)) for labels, counts in BULK_BATCH_DOCUMENTS._values.items())
+        client.bulk(body)
+
+        counts = BULK_BATCH_DOCUMENTS._values[('update',)]
+        previous = before.get(('update',), [0] * len(counts))
+        # The sum is the number of documents
+        self.assertEqual(2, counts[-1] - previous[-1])
+        self.assertIn(('update',), ELASTICSEARCH_SECONDS._values)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Test Parallel Reader"""
+
+import os
+import tempfile
+
+from unittest import TestCase, mock
+
+from integration.data_process import DataProcess
+from integration.parallel_reader import split_ranges
+from integration.rejected_rows import RejectedRows
+
+
+class ParallelReaderTest(TestCase):
+    """Test Parallel File Reader"""
+
+    @classmethod
+    def setUpClass(cls):
+        file_descriptor, cls._path = tempfile.mkstemp(suffix='.csv')
+
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8', newline='') as file_object:
+            file_object.write("name;addressZip;website\n")
+
+            for i in range(1000):
+                if i % 97 == 0:
+                    file_object.write("invalid line {}\n".format(i))
+                elif i % 3 == 0:
+                    file_object.write("group {};{};\r\n".format(i, 10000 + i))
+                else:
+                    file_object.write("são paulo {};{};http://{}.com\n".format(i, 10000 + i, i))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls._path)
+
+    def test_split_ranges(self):
+        """ Ranges are contiguous and aligned on line breaks. """
+
+        with open(self._path, 'rb') as file_object:
+            content = file_object.read()
+
+        ranges = list(split_ranges(self._path, 0, 1000))
+
+        self.assertEqual(0, ranges[0][0])
+        self.assertEqual(len(content), ranges[-1][1])
+
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(b'\n', content[end - 1:end])
+
+    def test_same_rows_single_process(self):
+        """ Parallel parse produces the same rows (and order) of the single process parse. """
+
+        data_process = DataProcess(mock.MagicMock())
+        expected_rejected, rejected = RejectedRows(), RejectedRows()
+
+        with open(self._path, 'r', encoding='utf-8') as file_object:
+            expected = list(data_process._read_lines(file_object, expected_rejected))
+
+        data_process._parse_workers = 3
+        data_process._parse_chunk_bytes = 1000
+
+        with open(self._path, 'r', encoding='utf-8') as file_object:
+            result = list(data_process._read_rows(file_object, rejected))
+
+        self.assertEqual(len(expected), len(result))
+        self.assertEqual(expected, result)
+        self.assertEqual(expected_rejected.to_dict(), rejected.to_dict())
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Test Query Cache"""
+
+from unittest import TestCase, mock
+
+from integration.query_cache import QueryCache
+
+
+class QueryCacheTest(TestCase):
+    """Test Query Cache Class"""
+
+    def test_hit_and_miss(self):
+        """ Hit and miss counters. """
+
+        cache = QueryCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+        key = QueryCache.key(' Yawoen', '11111')
+
+        self.assertIsNone(cache.get(key))
+        cache.set(key, {"count": 0, "data": []}, cache.generation)
+
+        self.assertEqual({"count": 0, "data": []}, cache.get(QueryCache.key('yawoen ', '11111')))
+        self.assertEqual(1, cache.stats()['hits'])
+        self.assertEqual(1, cache.stats()['misses'])
+
+    def test_lru_eviction(self):
+        """ The least recently used entries are evicted (entries and bytes limits). """
+
+        cache = QueryCache(max_entries=2, max_bytes=1024, ttl_seconds=60)
+
+        cache.set('a', 1, cache.generation)
+        cache.set('b', 2, cache.generation)
+        cache.get('a')
+        cache.set('c', 3, cache.generation)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+        cache = QueryCache(max_entries=10, max_bytes=10, ttl_seconds=60)
+
+        cache.set('a', 'aaaa', cache.generation)
+        cache.set('b', 'bbbb', cache.generation)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(6, cache.stats()['bytes'])
+
+    def test_ttl(self):
+        """ Expired entries are not returned. """
+
+        cache = QueryCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+        cache.set('a', 1, cache.generation)
+
+        with mock.patch('integration.query_cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(cache.get('a'))
+
+        self.assertEqual(0, cache.stats()['entries'])
+
+    def test_invalidate(self):
+        """ Invalidation drops entries and results read before it. """
+
+        cache = QueryCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+        generation = cache.generation
+
+        cache.set('a', 1, generation)
+        cache.invalidate()
+        cache.set('b', 2, generation)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.stats()['generation'])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Test JSON serialization"""
+
+import json
+
+from unittest import TestCase
+
+from integration.serialization import create_dumps
+
+PAGE = {"count": 1, "cursor": None, "path": "search",
+        "data": [{"id": "ffa4a5e5", "name": "dwight harrison vw", "zip": "30078", "website": None}]}
+
+
+class SerializationTest(TestCase):
+    """Test JSON serialization"""
+
+    def test_json(self):
+        library, dumps = create_dumps('json')
+
+        self.assertEqual('json', library)
+        self.assertEqual(PAGE, json.loads(dumps(PAGE).decode('utf-8')))
+        self.assertNotIn(b' ', dumps({"count": 1, "cursor": None}))
+
+    def test_auto(self):
+        """ orjson when it's installed, json otherwise: same documents. """
+
+        library, dumps = create_dumps('auto')
+
+        self.assertIn(library, ('orjson', 'json'))
+        self.assertEqual(PAGE, json.loads(dumps(PAGE).decode('utf-8')))
+        # Not supported by orjson
+        self.assertEqual({"1": "a", "b": 2 ** 70}, json.loads(dumps({1: "a", "b": 2 ** 70}).decode('utf-8')))
+
+    def test_unknown_library(self):
+        with self.assertRaises(ValueError):
+            create_dumps('simplejson')
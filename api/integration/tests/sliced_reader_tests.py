@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""Test Sliced Scroll Reader"""
+
+import threading
+import time
+
+from unittest import TestCase, mock
+
+from config.default import Config
+from integration.data_process import DataProcess
+from integration.memory_backend import MemoryBackend
+from integration.sliced_reader import SlicedScrollReader, SliceProgress
+
+BODY = {"_source": ["name"]}
+
+
+class SlowMemoryBackend(MemoryBackend):
+    """ Records the number of slices read at the same time. """
+
+    def __init__(self, fail_slice=None):
+        super(SlowMemoryBackend, self).__init__()
+        self.fail_slice = fail_slice
+        self.running = 0
+        self.max_running = 0
+        self._running_lock = threading.Lock()
+
+    def scan_slice(self, body, size, slice_id, max_slices, ordered=False):
+        with self._running_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        try:
+            for hit in super(SlowMemoryBackend, self).scan_slice(body, size, slice_id, max_slices, ordered):
+                if slice_id == self.fail_slice:
+                    raise TimeoutError()
+
+                time.sleep(0.001)
+                yield hit
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+
+class SlicedScrollReaderTest(TestCase):
+    """Test Sliced Scroll Reader"""
+
+    def setUp(self):
+        self._backend = SlowMemoryBackend()
+        self._ids = sorted(DataProcess._create_hash_line(['company {}'.format(item), '{:05d}'.format(item)])
+                           for item in range(200))
+        list(self._backend.index_documents({"hash_object": document_id, "name": document_id}
+                                           for document_id in self._ids))
+
+    def test_unordered(self):
+        """ Each object is read once, the slices are read in parallel. """
+
+        progress = []
+        reader = SlicedScrollReader(self._backend, slices=4, workers=4, page_size=10, on_progress=progress.append)
+        hits = list(reader.read(BODY))
+
+        self.assertEqual(self._ids, sorted(hit['_id'] for hit in hits))
+        self.assertEqual({"name": hits[0]['_id']}, hits[0]['_source'])
+        self.assertGreater(self._backend.max_running, 1)
+
+        states = [item.to_dict() for item in reader.progress]
+        self.assertEqual([SliceProgress.DONE] * 4, [item['state'] for item in states])
+        self.assertEqual(200, sum(item['hits'] for item in states))
+        self.assertEqual(sum(item['pages'] for item in states), len(progress))
+
+    def test_ordered(self):
+        """ The slices are merged by id. """
+
+        reader = SlicedScrollReader(self._backend, slices=3, workers=1, page_size=7, queue_size=1)
+
+        self.assertEqual(self._ids, [hit['_id'] for hit in reader.read(BODY, ordered=True)])
+        self.assertEqual(3, self._backend.max_running)
+
+    def test_failed_slice(self):
+        self._backend.fail_slice = 1
+        reader = SlicedScrollReader(self._backend, slices=2, workers=2, page_size=10)
+
+        with self.assertRaises(TimeoutError):
+            list(reader.read(BODY))
+
+        self.assertEqual(SliceProgress.FAILED, reader.progress[1].state)
+
+    def test_stop(self):
+        """ The slices are stopped when the consumer stops. """
+
+        reader = SlicedScrollReader(self._backend, slices=2, workers=2, page_size=5, queue_size=1)
+        hits = reader.read(BODY)
+        next(hits)
+        hits.close()
+
+        for _ in range(50):
+            if not self._backend.running:
+                break
+
+            time.sleep(0.05)
+
+        self.assertEqual(0, self._backend.running)
+        self.assertLess(sum(item.hits for item in reader.progress), 200)
+
+    def test_slices_max(self):
+        """ At most SCAN_SLICES_MAX slices (one thread per slice when ordered). """
+
+        with mock.patch.object(Config, 'SCAN_SLICES_MAX', 3):
+            reader = SlicedScrollReader(self._backend, slices=5000, workers=2, page_size=50)
+
+        self.assertEqual(3, len(reader.progress))
+        self.assertEqual(200, len(list(reader.read(BODY, ordered=True))))
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Startup da application asyncio (read path, see AsyncDataProcess).
+"""
+
+from aiohttp import web
+
+from config import create_async_app
+from config.default import Config
+
+application = create_async_app()
+
+if __name__ == "__main__":
+    web.run_app(application, host='0.0.0.0', port=Config.ASYNC_PORT)